@@ -15,41 +15,101 @@
 
 from __future__ import print_function
 
-from collections import Mapping
+import base64
+import errno
+from bisect import bisect_left
+from collections import Mapping, deque, namedtuple
+import io
+from itertools import islice
 import inspect
+import json
 import os
 import re
 import select
 import signal
+import socket
+import stat
 import sys
+import tempfile
 import threading
+import time
 import traceback
+import types
+import zlib
 
 if sys.version_info < (3,):
-    from SimpleXMLRPCServer import SimpleXMLRPCServer
-    from StringIO import StringIO
-    from xmlrpclib import Binary, ServerProxy
+    # Python 2 raises `BadStatusLine` when the server closes the connection.
+    from httplib import (BadStatusLine as RemoteDisconnected, HTTPConnection,
+                         HTTPException, HTTPSConnection,
+                         responses as HTTP_RESPONSES)
+    from SimpleXMLRPCServer import (SimpleXMLRPCDispatcher,
+                                    SimpleXMLRPCRequestHandler,
+                                    SimpleXMLRPCServer)
+    from urlparse import urlsplit
+    from xmlrpclib import Binary, Fault, ProtocolError, dumps, loads
+    try:
+        from xmlrpclib import gzip_decode, gzip_encode
+    except ImportError:     # Python 2.6
+        gzip_decode = gzip_encode = None
     PY2, PY3 = True, False
 else:
-    from io import StringIO
-    from xmlrpc.client import Binary, ServerProxy
-    from xmlrpc.server import SimpleXMLRPCServer
+    from http.client import (HTTPConnection, HTTPException, HTTPSConnection,
+                             responses as HTTP_RESPONSES)
+    try:
+        from http.client import RemoteDisconnected
+    except ImportError:     # Python < 3.5
+        from http.client import BadStatusLine as RemoteDisconnected
+    from urllib.parse import urlsplit
+    from xmlrpc.client import (Binary, Fault, ProtocolError, dumps,
+                               gzip_decode, gzip_encode, loads)
+    from xmlrpc.server import (SimpleXMLRPCDispatcher,
+                               SimpleXMLRPCRequestHandler, SimpleXMLRPCServer)
     PY2, PY3 = False, True
     unicode = str
     long = int
 
-
-__all__ = ['RobotRemoteServer', 'stop_remote_server', 'test_remote_server']
+try:
+    import asyncio
+    from concurrent.futures import ThreadPoolExecutor
+except ImportError:     # Python 2
+    asyncio = None
+try:
+    import contextvars
+except ImportError:     # Python 2 and Python 3 < 3.7
+    contextvars = None
+try:
+    import cProfile
+    import pstats
+except ImportError:     # Jython and IronPython
+    cProfile = pstats = None
+
+
+__all__ = ['RobotRemoteServer', 'JsonRpcProxy', 'RemoteClient',
+           'stop_remote_server', 'test_remote_server']
 __version__ = 'devel'
 
 BINARY = re.compile('[\x00-\x08\x0B\x0C\x0E-\x1F]')
-NON_ASCII = re.compile('[\x80-\xff]')
+CONTROL_CHARS = ''.join(chr(i) for i in range(32) if chr(i) not in '\t\n\r')
+BINARY_BYTES = CONTROL_CHARS + ''.join(chr(i) for i in range(128, 256))
 
 
 class RobotRemoteServer(object):
+    _metrics = None
+    _profiler = None
+    _slow_calls = None
+    _workers = None
 
     def __init__(self, library, host='127.0.0.1', port=8270, port_file=None,
-                 allow_stop='DEPRECATED', serve=True, allow_remote_stop=True):
+                 allow_stop='DEPRECATED', serve=True, allow_remote_stop=True,
+                 threads=0, processes=0, use_asyncio=False,
+                 lazy_introspection=False, introspection_cache=None,
+                 keep_alive_timeout=0, keep_alive_max_requests=100,
+                 unix_socket=None, compression_threshold=1400,
+                 max_output_size=None, output_spill_dir=None,
+                 max_return_depth=None, max_return_items=None,
+                 buffer_conversion=None, metrics=False, profile_dir=None,
+                 slow_call_threshold=None, slow_call_log_size=100,
+                 drain_timeout=None, keyword_timeout=None):
         """Configure and start-up remote server.
 
         :param library:     Test library instance or module to host.
@@ -69,26 +129,164 @@ class RobotRemoteServer(object):
         :param allow_remote_stop:  Allow/disallow stopping the server using
                             ``Stop Remote Server`` keyword and
                             ``stop_remote_server`` XML-RPC method.
+        :param threads:     Maximum number of requests to handle concurrently,
+                            each in its own thread. ``0`` means handling
+                            requests one by one in the serving thread.
+        :param processes:   Number of worker processes to fork for handling
+                            requests. Workers share the listening socket and
+                            are restarted automatically if they die. ``0``
+                            means handling requests in the current process.
+        :param use_asyncio: If ``True``, handle requests in an asyncio event
+                            loop. Keywords implemented as coroutine functions
+                            are run in the loop and other keywords in a thread
+                            pool having ``threads`` threads. Requires Python
+                            3.7 or newer.
+        :param lazy_introspection:  If ``True``, collect information about
+                            keywords when they are used for the first time
+                            instead of when the server is initialized.
+        :param introspection_cache:  File where to cache information about
+                            keywords between server restarts. ``None`` means
+                            no caching. The cache is updated automatically
+                            if the library module or version changes.
+        :param keep_alive_timeout:  Seconds to keep idle HTTP/1.1 persistent
+                            connections open. ``0`` disables persistent
+                            connections and each request uses a new one.
+        :param keep_alive_max_requests:  Maximum number of requests to handle
+                            using one persistent connection.
+        :param unix_socket: Path of a Unix domain socket to listen instead of
+                            ``host`` and ``port``. If ``port_file`` is used,
+                            this path is written into it.
+        :param compression_threshold:  Responses larger than this many bytes
+                            are compressed with gzip if the client accepts
+                            it. ``None`` disables compressing responses.
+                            Requests compressed with gzip or deflate are
+                            always accepted.
+        :param max_output_size:  Maximum number of characters of standard
+                            output and standard error to return from a
+                            keyword. The beginning and the end of longer
+                            output are returned and the middle is removed.
+                            ``None`` means no limit.
+        :param output_spill_dir:  Directory where to write the full output
+                            of keywords exceeding ``max_output_size``.
+                            ``None`` means that the full output is not
+                            preserved.
+        :param max_return_depth:  Maximum nesting depth of lists and
+                            dictionaries returned by keywords. Keywords
+                            returning deeper structures fail. ``None``
+                            means no limit.
+        :param max_return_items:  Maximum total number of items in lists
+                            and dictionaries returned by keywords. Keywords
+                            returning more items fail. ``None`` means no
+                            limit.
+        :param buffer_conversion:  How to convert ``bytearray``,
+                            ``memoryview``, NumPy arrays and other objects
+                            supporting the buffer protocol returned by
+                            keywords. ``'binary'`` returns their contents
+                            as binary data and ``'list'`` converts objects
+                            having a ``tolist`` method to lists. ``None``
+                            handles them like other iterables.
+        :param metrics:     If ``True``, collect metrics about keywords and
+                            expose them in Prometheus text format at
+                            ``GET /metrics``. Not supported with worker
+                            processes.
+        :param profile_dir:  Directory where to write profiling results.
+                            Defaults to the system temporary directory.
+        :param slow_call_threshold:  Record calls taking longer than this
+                            many seconds into the slow call log. ``None``
+                            disables the log.
+        :param slow_call_log_size:  Maximum number of calls to keep in the
+                            slow call log.
+        :param drain_timeout:  Seconds to wait for calls in progress to
+                            finish when the server is stopped before
+                            closing their connections forcefully. ``None``
+                            means waiting as long as needed.
+        :param keyword_timeout:  Default maximum execution time of keywords
+                            in seconds. Keywords can override it with the
+                            ``robot_timeout`` attribute. ``None`` means no
+                            timeout.
         """
-        self._library = RemoteLibraryFactory(library)
-        self._server = StoppableXMLRPCServer(host, int(port))
+        if buffer_conversion and sys.version_info < (2, 7):
+            raise RuntimeError('Converting buffers requires Python 2.7 or '
+                               'newer.')
+        if unix_socket and not hasattr(socket, 'AF_UNIX'):
+            raise RuntimeError('Unix domain sockets are not supported on '
+                               'this platform.')
+        if processes and not hasattr(os, 'fork'):
+            raise RuntimeError('Using worker processes requires os.fork.')
+        if slow_call_threshold is not None and use_asyncio:
+            raise RuntimeError('Slow call log is not supported with asyncio.')
+        # Each worker process would have its own metrics and a scrape would
+        # get metrics of a random worker, making counters jump backwards.
+        if metrics and int(processes):
+            raise RuntimeError('Metrics are not supported with worker '
+                               'processes.')
+        self._library_source = library
+        self._lazy_introspection = lazy_introspection
+        self._introspection_cache = introspection_cache
+        self._limits = ResultLimits(max_output_size, output_spill_dir,
+                                    max_return_depth, max_return_items,
+                                    buffer_conversion, keyword_timeout)
+        self._library = self._create_library()
+        self._metrics = KeywordMetrics() if metrics else None
+        self._profiler = KeywordProfiler(profile_dir)
+        self._slow_calls = SlowCallLog(slow_call_threshold,
+                                       slow_call_log_size) \
+                if slow_call_threshold is not None else None
+        server = AsyncioXMLRPCServer if use_asyncio else StoppableXMLRPCServer
+        self._server = server(host, int(port), int(threads),
+                              float(keep_alive_timeout),
+                              int(keep_alive_max_requests), unix_socket,
+                              compression_threshold, self._metrics,
+                              self._profiler, self._slow_calls)
+        self._unix_socket = unix_socket
+        self._serial = not use_asyncio and not int(threads)
         self._register_functions(self._server)
+        self._processes = int(processes)
+        self._workers = None
+        self._drain_timeout = drain_timeout
+        self._stop_signaled = False
         self._port_file = port_file
         self._allow_remote_stop = allow_remote_stop \
                 if allow_stop == 'DEPRECATED' else allow_stop
+        profile = os.environ.get('ROBOT_REMOTE_SERVER_PROFILE')
+        if profile:
+            names = [name.strip() for name in profile.split(',')]
+            self.start_profiling(names if '*' not in names else None)
         if serve:
             self.serve()
 
+    def _create_library(self):
+        library = self._library_source
+        cache = self._introspection_cache
+        if cache:
+            cache = IntrospectionCache(cache, library)
+        return RemoteLibraryFactory(library, self._lazy_introspection, cache,
+                                    self._limits)
+
     def _register_functions(self, server):
         server.register_function(self.get_keyword_names)
-        server.register_function(self.run_keyword)
+        if isinstance(server, AsyncioXMLRPCServer):
+            server.register_function(self._run_keyword_async, 'run_keyword')
+        else:
+            server.register_function(self.run_keyword)
         server.register_function(self.get_keyword_arguments)
         server.register_function(self.get_keyword_documentation)
+        server.register_function(self.get_keyword_tags)
+        server.register_function(self.get_library_information)
         server.register_function(self.stop_remote_server)
+        server.register_function(self.start_profiling)
+        server.register_function(self.stop_profiling)
+        server.register_function(self.get_slow_calls)
+        server.register_function(self.ping)
+        server.register_multicall_functions()
+        server.register_introspection_functions()
 
     @property
     def server_address(self):
-        """Server address as a tuple ``(host, port)``."""
+        """Server address as a tuple ``(host, port)``.
+
+        If the server uses a Unix domain socket, the address is its path.
+        """
         return self._server.server_address
 
     @property
@@ -96,8 +294,11 @@ class RobotRemoteServer(object):
         """Server port as an integer.
 
         If the initial given port is 0, also this property returns 0 until
-        the server is activated.
+        the server is activated. If the server uses a Unix domain socket,
+        this property returns ``None``.
         """
+        if self._unix_socket:
+            return None
         return self._server.server_address[1]
 
     def activate(self):
@@ -105,6 +306,7 @@ class RobotRemoteServer(object):
 
         :return  Port number that the server is going to use. This is the
                  actual port to use, even if the initially given port is 0.
+                 With Unix domain sockets returns the socket path.
         """
         return self._server.activate()
 
@@ -117,7 +319,10 @@ class RobotRemoteServer(object):
         Automatically activates the server if it is not activated already.
 
         If this method is executed in the main thread, automatically registers
-        signals SIGINT, SIGTERM and SIGHUP to stop the server.
+        signals SIGINT, SIGTERM and SIGHUP to stop the server. The server
+        stops like when using :meth:`stop` without a timeout. If a second
+        signal is received while waiting for calls in progress to finish,
+        their connections are closed immediately.
 
         Using this method requires using ``serve=False`` when initializing the
         server. Using ``serve=True`` is equal to first using ``serve=False``
@@ -128,18 +333,46 @@ class RobotRemoteServer(object):
         unless they are disabled when the server is initialized. If this method
         is executed in a thread, then it is also possible to stop the server
         using the :meth:`stop` method.
+
+        If the server has been configured to use worker processes, this method
+        starts them and supervises them until the server is stopped.
         """
         self._server.activate()
         self._announce_start(log, self._port_file)
-        with SignalHandler(self.stop):
-            self._server.serve()
+        toggle_profiling = lambda: self._toggle_profiling(log)
+        with SignalHandler(self._stop_by_signal):
+            with SignalHandler(toggle_profiling, ['SIGUSR1']):
+                with StandardStreamCapture(shared=self._serial):
+                    self._serve(log)
         self._announce_stop(log, self._port_file)
 
+    def _serve(self, log=True):
+        if self._processes:
+            log_exit = lambda pid, rc: self._log_worker_exit(pid, rc, log)
+            self._workers = WorkerProcesses(self._processes,
+                                            self._serve_worker, log_exit)
+            try:
+                self._workers.serve()
+            finally:
+                # Connections not accepted by workers are refused.
+                self._server.server_close()
+        else:
+            self._server.serve()
+
+    def _serve_worker(self):
+        self._library = self._create_library()
+        with SignalHandler(lambda: self._server.stop(self._drain_timeout)):
+            self._server.serve(shared=True)
+
+    def _log_worker_exit(self, pid, rc, log=True):
+        self._log('restarted worker process %d that exited with return '
+                  'code %d' % (pid, rc), log, warn=True)
+
     def _announce_start(self, log, port_file):
         self._log('started', log)
         if port_file:
             with open(port_file, 'w') as pf:
-                pf.write(str(self.server_port))
+                pf.write(self._unix_socket or str(self.server_port))
 
     def _announce_stop(self, log, port_file):
         self._log('stopped', log)
@@ -148,14 +381,60 @@ class RobotRemoteServer(object):
 
     def _log(self, action, log=True, warn=False):
         if log:
-            address = '%s:%s' % self.server_address
+            if self._unix_socket:
+                address = 'unix://%s' % self._unix_socket
+            else:
+                address = '%s:%s' % self.server_address
             if warn:
                 print('*WARN*', end=' ')
-            print('Robot Framework remote server at %s %s.' % (address, action))
+            print('Robot Framework remote server at %s %s.'
+                  % (address, action))
 
-    def stop(self):
-        """Stop server."""
-        self._server.stop()
+    def stop(self, timeout=None):
+        """Stop server.
+
+        :param timeout:  Seconds to wait for calls in progress to finish
+                         before closing their connections forcefully.
+                         Defaults to ``drain_timeout`` given when the
+                         server was initialized.
+
+        New connections are not accepted after this method has been called,
+        but calls in progress are allowed to finish. Keywords still running
+        after the timeout are not interrupted, but the server stops serving
+        without waiting for them. With a single-threaded server the running
+        keyword must anyway finish before :meth:`serve` can return.
+
+        When using worker processes, stops all of them. Workers still running
+        after the timeout are killed.
+        """
+        if timeout is None:
+            timeout = self._drain_timeout
+        if self._workers:
+            self._workers.stop(timeout)
+        else:
+            self._server.stop(timeout)
+
+    def _stop_by_signal(self):
+        self.stop(0 if self._stop_signaled else None)
+        self._stop_signaled = True
+
+    def _toggle_profiling(self, log=True):
+        # Called in a signal handler. The main process forwards the signal
+        # to worker processes that have their own profilers.
+        if self._workers and self._workers.send_signal(signal.SIGUSR1):
+            return
+        thread = threading.Thread(target=self._toggle_profiling_in_thread,
+                                  args=(log,))
+        thread.daemon = True
+        thread.start()
+
+    def _toggle_profiling_in_thread(self, log):
+        if not self._profiler.enabled:
+            self.start_profiling()
+            self._log('started profiling', log)
+        else:
+            for path in self.stop_profiling():
+                self._log('wrote profiling results to %s' % path, log)
 
     # Exposed XML-RPC methods. Should they be moved to own class?
 
@@ -166,13 +445,87 @@ class RobotRemoteServer(object):
         self.stop()
         return True
 
+    def start_profiling(self, names=None):
+        """Start profiling keywords with the given names.
+
+        By default all keywords are profiled.
+        """
+        if isinstance(self._server, AsyncioXMLRPCServer):
+            raise RuntimeError('Profiling is not supported with asyncio.')
+        self._profiler.start(names)
+        return True
+
+    def stop_profiling(self):
+        """Stop profiling and write results. Returns written files."""
+        return self._profiler.stop()
+
+    def get_slow_calls(self):
+        """Return calls recorded into the slow call log, oldest first."""
+        return self._slow_calls.get_calls() if self._slow_calls else []
+
+    def ping(self):
+        """Return server health information without touching the library.
+
+        ``calls_in_progress`` does not include the ``ping`` call itself.
+        """
+        health = get_health(self._server)
+        health['calls_in_progress'] = max(health['calls_in_progress'] - 1, 0)
+        return health
+
     def get_keyword_names(self):
         return self._library.get_keyword_names() + ['stop_remote_server']
 
     def run_keyword(self, name, args, kwargs=None):
+        if self._profiler and self._profiler.enabled:
+            self._profiler.keyword_called(name)
+        if not self._metrics:
+            return self._run_keyword(name, args, kwargs)
+        start = self._metrics.start()
+        try:
+            result = self._run_keyword(name, args, kwargs)
+        except Exception:
+            self._metrics.end(name, start)
+            raise
+        self._metrics.end(name, start, result)
+        return result
+
+    def _run_keyword(self, name, args, kwargs=None):
         if name == 'stop_remote_server':
-            return KeywordRunner(self.stop_remote_server).run_keyword(args, kwargs)
-        return self._library.run_keyword(name, args, kwargs)
+            runner = KeywordRunner(self.stop_remote_server, self._limits)
+            return runner.run_keyword(args, kwargs)
+        result = self._library.run_keyword(name, args, kwargs)
+        if self._workers:
+            self._recycle_if_timed_out()
+        return result
+
+    def _recycle_if_timed_out(self):
+        # Threads running timed out keywords cannot be killed, but a worker
+        # process can be stopped and the main process replaces it.
+        if (self._workers and self._workers.in_worker and
+                self._limits.timed_out and not self._server.stopping):
+            self._server.stop(self._drain_timeout)
+
+    def _run_keyword_async(self, name, args, kwargs=None):
+        if not self._metrics:
+            return self._start_keyword_async(name, args, kwargs)
+        start = self._metrics.start()
+        try:
+            future = self._start_keyword_async(name, args, kwargs)
+        except Exception:
+            self._metrics.end(name, start)
+            raise
+        future.add_done_callback(lambda future: self._metrics.end(
+            name, start, None if future.cancelled() or future.exception()
+            else future.result()))
+        return future
+
+    def _start_keyword_async(self, name, args, kwargs=None):
+        if name == 'stop_remote_server':
+            runner = KeywordRunner(self.stop_remote_server, self._limits)
+            return runner.run_keyword_async(args, kwargs)
+        future = self._library.run_keyword_async(name, args, kwargs)
+        future.add_done_callback(lambda future: self._recycle_if_timed_out())
+        return future
 
     def get_keyword_arguments(self, name):
         if name == 'stop_remote_server':
@@ -182,7 +535,8 @@ class RobotRemoteServer(object):
     def get_keyword_documentation(self, name):
         if name == 'stop_remote_server':
             return ('Stop the remote server unless stopping is disabled.\n\n'
-                    'Return ``True/False`` depending was server stopped or not.')
+                    'Return ``True/False`` depending was server stopped or '
+                    'not.')
         return self._library.get_keyword_documentation(name)
 
     def get_keyword_tags(self, name):
@@ -190,25 +544,72 @@ class RobotRemoteServer(object):
             return []
         return self._library.get_keyword_tags(name)
 
+    def get_library_information(self):
+        info = dict(self._library.get_library_information())
+        name = 'stop_remote_server'
+        info[name] = {'args': self.get_keyword_arguments(name),
+                      'doc': self.get_keyword_documentation(name),
+                      'tags': self.get_keyword_tags(name)}
+        return info
+
 
 class StoppableXMLRPCServer(SimpleXMLRPCServer):
     allow_reuse_address = True
 
-    def __init__(self, host, port):
-        SimpleXMLRPCServer.__init__(self, (host, port), logRequests=False,
-                                    bind_and_activate=False)
+    def __init__(self, host, port, threads=0, keep_alive_timeout=0,
+                 keep_alive_max_requests=100, unix_socket=None,
+                 compression_threshold=1400, metrics=None, profiler=None,
+                 slow_calls=None):
+        if unix_socket:
+            self.address_family = socket.AF_UNIX
+        address = unix_socket or (host, port)
+        SimpleXMLRPCServer.__init__(self, address, RequestHandler,
+                                    logRequests=False, bind_and_activate=False)
+        self.unix_socket = unix_socket
+        self.keep_alive_timeout = keep_alive_timeout
+        self.keep_alive_max_requests = keep_alive_max_requests
+        self.compression_threshold = compression_threshold
+        self.metrics = metrics
+        self.profiler = profiler
+        self.slow_calls = slow_calls
+        self.stopping = False
+        self.started = None
+        self.calls_in_progress = 0
+        self._calls_lock = threading.Lock()
         self._activated = False
         self._stopper_thread = None
+        self._drain_deadline = None
+        self._drain_forced = False
+        self._threads = threads
+        self._thread_slots = threading.BoundedSemaphore(threads) \
+                if threads > 0 else None
+        self._request_threads = set()
+        self._request_threads_lock = threading.Lock()
+        self._active_requests = set()
 
     def activate(self):
         if not self._activated:
+            if self.unix_socket:
+                remove_unix_socket(self.unix_socket)
             self.server_bind()
             self.server_activate()
             self._activated = True
-        return self.server_address[1]
+            self._owner_pid = os.getpid()
+        return self.unix_socket or self.server_address[1]
 
-    def serve(self):
+    def server_close(self):
+        SimpleXMLRPCServer.server_close(self)
+        # Worker processes share the socket and must not remove it.
+        if self.unix_socket and os.getpid() == self._owner_pid:
+            remove_unix_socket(self.unix_socket)
+
+    def serve(self, shared=False):
         self.activate()
+        if shared:
+            # Other processes accept from the same socket. Non-blocking mode
+            # avoids blocking in accept when another process got the request.
+            self.socket.setblocking(False)
+        self.started = time.time()
         try:
             self.serve_forever()
         except select.error:
@@ -216,24 +617,861 @@ class StoppableXMLRPCServer(SimpleXMLRPCServer):
             if sys.version_info[:2] > (2, 6):
                 raise
         self.server_close()
+        self._wait_request_threads()
+        if self._drain_deadline is not None:
+            self._close_active_requests()
         if self._stopper_thread:
             self._stopper_thread.join()
             self._stopper_thread = None
 
-    def stop(self):
+    def get_request(self):
+        # A free thread is waited for before accepting the connection. Until
+        # then the client stays in the listen queue where threads waiting on
+        # idle persistent connections see it and close their connections.
+        if self._thread_slots and not self._acquire_thread_slot():
+            raise socket.error('Server is stopping.')
+        try:
+            request, client_address = SimpleXMLRPCServer.get_request(self)
+        except Exception:
+            if self._thread_slots:
+                self._thread_slots.release()
+            raise
+        request.setblocking(True)
+        return request, client_address
+
+    def _acquire_thread_slot(self):
+        # Waiting is interrupted regularly to notice that the server is
+        # stopping. Otherwise `shutdown` would block until a thread is free.
+        while not self.stopping:
+            if PY3:
+                if self._thread_slots.acquire(timeout=0.1):
+                    return True
+            elif self._thread_slots.acquire(False):
+                return True
+            else:
+                time.sleep(0.01)
+        return False
+
+    def process_request(self, request, client_address):
+        if not self._thread_slots:
+            SimpleXMLRPCServer.process_request(self, request, client_address)
+            return
+        # The thread slot has been acquired already by `get_request`.
+        thread = threading.Thread(target=self._process_request_in_thread,
+                                  args=(request, client_address))
+        thread.daemon = True
+        with self._request_threads_lock:
+            self._request_threads.add(thread)
+        thread.start()
+
+    def finish_request(self, request, client_address):
+        with self._request_threads_lock:
+            self._active_requests.add(request)
+        try:
+            SimpleXMLRPCServer.finish_request(self, request, client_address)
+        finally:
+            with self._request_threads_lock:
+                self._active_requests.discard(request)
+
+    def handle_error(self, request, client_address):
+        # Errors caused by forcefully closed connections are expected.
+        if not self._drain_forced:
+            SimpleXMLRPCServer.handle_error(self, request, client_address)
+
+    def _process_request_in_thread(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+            with self._request_threads_lock:
+                self._request_threads.discard(threading.current_thread())
+            self._thread_slots.release()
+
+    def _wait_request_threads(self):
+        with self._request_threads_lock:
+            threads = list(self._request_threads)
+        for thread in threads:
+            # Deadline may be set or shortened while waiting.
+            while thread.is_alive() and not self._drain_expired():
+                thread.join(0.1)
+
+    def _drain_expired(self):
+        deadline = self._drain_deadline
+        return deadline is not None and time.time() >= deadline
+
+    def _close_active_requests(self):
+        with self._request_threads_lock:
+            requests = list(self._active_requests)
+        self._drain_forced = bool(requests)
+        for request in requests:
+            try:
+                request.shutdown(socket.SHUT_RDWR)
+            except socket.error:    # Already closed.
+                pass
+
+    def wait_next_request(self, connection):
+        """Wait for the next request on an idle persistent connection.
+
+        Returns ``False`` if the connection should be closed because it has
+        been idle too long, the server is stopping, or other clients are
+        waiting and there are no free threads to serve them.
+        """
+        max_time = time.time() + self.keep_alive_timeout
+        while not self.stopping:
+            remaining = max_time - time.time()
+            if remaining <= 0:
+                return False
+            waiting = [connection]
+            if self._is_full():
+                waiting.append(self.socket)
+            try:
+                ready = select.select(waiting, [], [], min(remaining, 0.5))[0]
+            except select.error:    # Interrupted by a signal on Python 2.
+                continue
+            if connection in ready:
+                return True
+            if ready:
+                return False
+        return False
+
+    @property
+    def ready(self):
+        return self.started is not None and not self.stopping
+
+    def call_started(self):
+        with self._calls_lock:
+            self.calls_in_progress += 1
+
+    def call_finished(self):
+        with self._calls_lock:
+            self.calls_in_progress -= 1
+
+    def _is_full(self):
+        if not self._thread_slots:
+            return True
+        with self._request_threads_lock:
+            return len(self._request_threads) >= self._threads
+
+    def _marshaled_dispatch(self, *args, **kwargs):
+        dispatch = SimpleXMLRPCServer._marshaled_dispatch
+        if self.profiler and self.profiler.enabled:
+            response = self.profiler.run(dispatch, self, *args, **kwargs)
+        else:
+            response = dispatch(self, *args, **kwargs)
+        self._response_ready(response)
+        return response
+
+    def dispatch_json_request(self, data):
+        """Dispatch JSON-RPC request and return response as bytes."""
+        if self.profiler and self.profiler.enabled:
+            return self.profiler.run(self._dispatch_json_request, data)
+        return self._dispatch_json_request(data)
+
+    def _dispatch_json_request(self, data):
+        request_id = None
+        try:
+            request_id, method, params = json_rpc_loads(data, self.funcs)
+            result = self._dispatch(method, params)
+        except Exception:
+            response = json_rpc_dumps(request_id, error=sys.exc_info()[1])
+        else:
+            response = json_rpc_dumps(request_id, result)
+        self._response_ready(response)
+        return response
+
+    def _dispatch(self, method, params):
+        timer = CALL_TIMER.get()
+        if timer:
+            timer.dispatched(method, params)
+        return SimpleXMLRPCServer._dispatch(self, method, params)
+
+    def _response_ready(self, response):
+        if self.metrics:
+            self.metrics.response_sent(len(response))
+        timer = CALL_TIMER.get()
+        if timer:
+            timer.mark('marshal')
+
+    def stop(self, timeout=None):
+        """Stop accepting new requests and stop when running calls are done.
+
+        If ``timeout`` is given, connections still handling calls after that
+        many seconds are closed forcefully. Keywords that are running are
+        not interrupted. Can be called from any thread and signal handler.
+        """
+        self.stopping = True
+        if timeout is not None:
+            deadline = time.time() + timeout
+            if self._drain_deadline is None or deadline < self._drain_deadline:
+                self._drain_deadline = deadline
+            timer = threading.Timer(timeout, self._close_active_requests)
+            timer.daemon = True
+            timer.start()
         self._stopper_thread = threading.Thread(target=self.shutdown)
         self._stopper_thread.daemon = True
         self._stopper_thread.start()
 
 
+class RequestHandler(SimpleXMLRPCRequestHandler):
+    """Request handler supporting HTTP/1.1 persistent connections.
+
+    Also accepts requests compressed with deflate in addition to gzip
+    supported by the base class, and JSON-RPC requests in addition to
+    XML-RPC requests.
+    """
+
+    def address_string(self):
+        # Client address is an empty string with Unix domain sockets.
+        return self.client_address[0] if self.client_address else 'unix'
+
+    def setup(self):
+        # TCP_NODELAY cannot be set on Unix domain sockets.
+        if self.server.unix_socket:
+            self.disable_nagle_algorithm = False
+        SimpleXMLRPCRequestHandler.setup(self)
+        self.encode_threshold = self.server.compression_threshold
+        self.requests_handled = 0
+
+    def decode_request_content(self, data):
+        encoding = self.headers.get('content-encoding', 'identity').lower()
+        try:
+            data = decode_content(data, encoding)
+        except NotImplementedError:
+            self.send_response(501, 'encoding %r not supported' % encoding)
+        except ValueError:
+            self.send_response(400, 'error decoding %s content' % encoding)
+        else:
+            timer = CALL_TIMER.get()
+            if timer:
+                timer.mark('read')
+            return data
+        self.send_header('Content-length', '0')
+        self.end_headers()
+
+    def do_GET(self):
+        metrics = self.server.metrics
+        if self.path == '/health':
+            health = get_health(self.server)
+            self._send_get_response(200 if health['ready'] else 503,
+                                    json_dumps(health), 'application/json')
+        elif self.path == '/metrics' and metrics:
+            self._send_get_response(200, metrics.render(),
+                                    metrics.content_type)
+        else:
+            self.report_404()
+
+    def _send_get_response(self, code, body, content_type):
+        self.send_response(code)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        self.server.call_started()
+        try:
+            self._handle_timed_post()
+        finally:
+            self.server.call_finished()
+
+    def _handle_timed_post(self):
+        slow_calls = self.server.slow_calls
+        if not slow_calls:
+            self._handle_post()
+            return
+        timer = CallTimer()
+        CALL_TIMER.set(timer)
+        try:
+            self._handle_post()
+        finally:
+            CALL_TIMER.set(None)
+        timer.mark('write')
+        slow_calls.record(timer)
+
+    def _handle_post(self):
+        if not is_json(self.headers.get('content-type', '')):
+            SimpleXMLRPCRequestHandler.do_POST(self)
+            return
+        if not self.is_rpc_path_valid():
+            self.report_404()
+            return
+        length = int(self.headers.get('content-length', 0))
+        data = self.decode_request_content(self.rfile.read(length))
+        if data is None:
+            return
+        response = self.server.dispatch_json_request(data)
+        threshold = self.server.compression_threshold
+        compress = (threshold is not None and len(response) > threshold and
+                    gzip_encode is not None and
+                    accepts_gzip(self.headers.get('accept-encoding', '')))
+        if compress:
+            response = gzip_encode(response)
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        if compress:
+            self.send_header('Content-Encoding', 'gzip')
+        self.send_header('Content-Length', str(len(response)))
+        self.end_headers()
+        self.wfile.write(response)
+
+    def handle(self):
+        if not self.server.keep_alive_timeout:
+            SimpleXMLRPCRequestHandler.handle(self)
+            return
+        self.protocol_version = 'HTTP/1.1'
+        self.close_connection = True
+        self.handle_one_request()
+        while (not self.close_connection
+               and self.server.wait_next_request(self.connection)):
+            self.handle_one_request()
+
+    def handle_one_request(self):
+        self.requests_handled += 1
+        SimpleXMLRPCRequestHandler.handle_one_request(self)
+
+    def end_headers(self):
+        if (self.protocol_version == 'HTTP/1.1' and
+                (self.requests_handled >= self.server.keep_alive_max_requests
+                 or self.server.stopping)):
+            self.send_header('Connection', 'close')
+        SimpleXMLRPCRequestHandler.end_headers(self)
+
+
+class AsyncioXMLRPCServer(SimpleXMLRPCDispatcher):
+    """XML-RPC server running in an asyncio event loop.
+
+    Has the same interface as :class:`StoppableXMLRPCServer`. Registered
+    functions are called in the event loop and if they return an asyncio
+    future, its result is used as the return value.
+    """
+    rpc_paths = ('/', '/RPC2')
+    request_queue_size = 100
+
+    def __init__(self, host, port, threads=0, keep_alive_timeout=0,
+                 keep_alive_max_requests=100, unix_socket=None,
+                 compression_threshold=1400, metrics=None, profiler=None,
+                 slow_calls=None):
+        # Profiling and slow call log are not supported and `profiler` and
+        # `slow_calls` are ignored.
+        if not (asyncio and contextvars):
+            raise RuntimeError('Using asyncio requires Python 3.7 or newer.')
+        SimpleXMLRPCDispatcher.__init__(self, allow_none=False, encoding=None)
+        self.server_address = unix_socket or (host, port)
+        self.unix_socket = unix_socket
+        self.socket = None
+        self.keep_alive_timeout = keep_alive_timeout
+        self.keep_alive_max_requests = keep_alive_max_requests
+        self.compression_threshold = compression_threshold
+        self.metrics = metrics
+        self.stopping = False
+        self.started = None
+        self.calls_in_progress = 0
+        self.loop = None
+        self._threads = threads or None
+        self._listener = None
+        self._connections = set()
+        self._pending = set()
+        self._drain_timeout = None
+        self._drain_forced = False
+
+    def activate(self):
+        if not self.socket:
+            if self.unix_socket:
+                remove_unix_socket(self.unix_socket)
+                sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            else:
+                sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            sock.bind(self.server_address)
+            sock.listen(self.request_queue_size)
+            self.socket = sock
+            self._owner_pid = os.getpid()
+            if not self.unix_socket:
+                self.server_address = sock.getsockname()[:2]
+        return self.unix_socket or self.server_address[1]
+
+    def serve(self, shared=False):
+        self.activate()
+        loop = asyncio.new_event_loop()
+        executor = ThreadPoolExecutor(self._threads)
+        loop.set_default_executor(executor)
+        try:
+            create = loop.create_server(lambda: AsyncioRequestHandler(self),
+                                        sock=self.socket)
+            self._listener = loop.run_until_complete(create)
+            self.loop = loop
+            if self.stopping:
+                self._stop_serving(self._drain_timeout)
+            self.started = time.time()
+            loop.run_forever()
+            self._listener.close()
+            loop.run_until_complete(self._listener.wait_closed())
+        finally:
+            self.loop = None
+            # Do not wait for keywords whose connections were force closed.
+            # Cancelling their futures prevents them from using closed loop.
+            for future in list(self._pending):
+                future.cancel()
+            executor.shutdown(wait=not self._drain_forced)
+            loop.close()
+            self.server_close()
+
+    def server_close(self):
+        self.socket.close()
+        # Worker processes share the socket and must not remove it.
+        if self.unix_socket and os.getpid() == self._owner_pid:
+            remove_unix_socket(self.unix_socket)
+
+    def stop(self, timeout=None):
+        """Stop serving. Can be called from any thread and signal handler.
+
+        If ``timeout`` is given, connections still handling calls after that
+        many seconds are closed forcefully.
+        """
+        loop = self.loop
+        if loop:
+            loop.call_soon_threadsafe(self._stop_serving, timeout)
+        else:
+            self.stopping = True
+            self._drain_timeout = timeout
+
+    def _stop_serving(self, timeout=None):
+        self.stopping = True
+        self._listener.close()
+        for connection in list(self._connections):
+            if connection.idle:
+                connection.close()
+        if timeout is not None:
+            self.loop.call_later(timeout, self._close_connections)
+        self._stop_when_idle()
+
+    def _close_connections(self):
+        self._drain_forced = bool(self._connections)
+        for connection in list(self._connections):
+            connection.abort()
+
+    def _stop_when_idle(self):
+        if self.stopping and not self._connections:
+            self.loop.stop()
+
+    @property
+    def ready(self):
+        return self.loop is not None and not self.stopping
+
+    def call_started(self):
+        self.calls_in_progress += 1
+
+    def call_finished(self):
+        self.calls_in_progress -= 1
+
+    def connection_opened(self, connection):
+        self._connections.add(connection)
+
+    def connection_closed(self, connection):
+        self._connections.discard(connection)
+        self._stop_when_idle()
+
+    def dispatch_request(self, data):
+        """Dispatch XML-RPC request and return future containing response."""
+        response = self.loop.create_future()
+        try:
+            params, method = loads(data)
+        except Exception:
+            response.set_result(self._marshal_error(*sys.exc_info()[:2]))
+        else:
+            result = self._call(self._dispatch, method, params)
+            result.add_done_callback(
+                lambda result: self._set_response(response, result))
+        return response
+
+    def dispatch_json_request(self, data):
+        """Dispatch JSON-RPC request and return future containing response."""
+        response = self.loop.create_future()
+        try:
+            request_id, method, params = json_rpc_loads(data, self.funcs)
+        except Exception:
+            response.set_result(json_rpc_dumps(None, error=sys.exc_info()[1]))
+        else:
+            result = self._call(self._dispatch, method, params)
+            result.add_done_callback(lambda result: response.set_result(
+                self._json_response(request_id, result)))
+        return response
+
+    def _json_response(self, request_id, result):
+        try:
+            return json_rpc_dumps(request_id, result.result())
+        except Exception:
+            return json_rpc_dumps(request_id, error=sys.exc_info()[1])
+
+    def _call(self, function, *args):
+        try:
+            result = function(*args)
+        except Exception:
+            result = self.loop.create_future()
+            result.set_exception(sys.exc_info()[1])
+        if not asyncio.isfuture(result):
+            value, result = result, self.loop.create_future()
+            result.set_result(value)
+        elif not result.done():
+            self._pending.add(result)
+            result.add_done_callback(self._pending.discard)
+        return result
+
+    def _dispatch(self, method, params):
+        try:
+            func = self.funcs[method]
+        except KeyError:
+            raise Exception('method "%s" is not supported' % method)
+        return func(*params)
+
+    def system_multicall(self, call_list):
+        """Asynchronous version of the standard ``system.multicall``.
+
+        Calls are executed one by one in the given order and the returned
+        future contains results in the same format as with the standard
+        implementation.
+        """
+        response = self.loop.create_future()
+        calls = iter(call_list)
+        results = []
+
+        def add_result(result):
+            try:
+                results.append([result.result()])
+            except Fault as fault:
+                results.append({'faultCode': fault.faultCode,
+                                'faultString': fault.faultString})
+            except Exception:
+                exc_type, exc_value = sys.exc_info()[:2]
+                error = '%s:%s' % (exc_type, exc_value)
+                results.append({'faultCode': 1, 'faultString': error})
+            run_next()
+
+        def run_next():
+            for call in calls:
+                result = self._call(lambda: self._dispatch(call['methodName'],
+                                                           call['params']))
+                result.add_done_callback(add_result)
+                return
+            response.set_result(results)
+
+        run_next()
+        return response
+
+    def _set_response(self, response, result):
+        try:
+            response.set_result(self._marshal_result(result.result()))
+        except Exception:
+            response.set_result(self._marshal_error(*sys.exc_info()[:2]))
+
+    def _marshal_result(self, result):
+        try:
+            response = dumps((result,), methodresponse=True,
+                             allow_none=self.allow_none,
+                             encoding=self.encoding)
+        except Exception:
+            return self._marshal_error(*sys.exc_info()[:2])
+        return response.encode(self.encoding or 'UTF-8', 'xmlcharrefreplace')
+
+    def _marshal_error(self, exc_type, exc_value):
+        if not isinstance(exc_value, Fault):
+            exc_value = Fault(1, '%s:%s' % (exc_type, exc_value))
+        response = dumps(exc_value, allow_none=self.allow_none,
+                         encoding=self.encoding)
+        return response.encode(self.encoding or 'UTF-8', 'xmlcharrefreplace')
+
+
+class AsyncioRequestHandler(object):
+    """asyncio protocol handling HTTP requests to :class:`AsyncioXMLRPCServer`.
+
+    Supports HTTP/1.1 persistent connections similarly as
+    :class:`RequestHandler` used by :class:`StoppableXMLRPCServer`.
+    """
+
+    def __init__(self, server):
+        self.server = server
+        self.idle = True
+        self._transport = None
+        self._data = b''
+        self._requests_handled = 0
+        self._idle_timer = None
+
+    def connection_made(self, transport):
+        self._transport = transport
+        self.server.connection_opened(self)
+        self._start_idle_timer()
+
+    def connection_lost(self, exc):
+        self._cancel_idle_timer()
+        self.server.connection_closed(self)
+
+    def pause_writing(self):
+        pass
+
+    def resume_writing(self):
+        pass
+
+    def eof_received(self):
+        # Keep the connection open for sending the response.
+        return not self.idle
+
+    def close(self):
+        self._transport.close()
+
+    def abort(self):
+        self._transport.abort()
+
+    def _start_idle_timer(self):
+        if self.server.keep_alive_timeout:
+            self._idle_timer = self.server.loop.call_later(
+                self.server.keep_alive_timeout, self.close)
+
+    def _cancel_idle_timer(self):
+        if self._idle_timer:
+            self._idle_timer.cancel()
+            self._idle_timer = None
+
+    def data_received(self, data):
+        self._data += data
+        self._handle_buffered_data()
+
+    def _handle_buffered_data(self):
+        if not self.idle:
+            return
+        try:
+            request = self._parse_request()
+        except ValueError:
+            self.idle = False
+            self._send_response(400)
+            return
+        if request:
+            self.idle = False
+            self._cancel_idle_timer()
+            self._handle_request(*request)
+
+    def _parse_request(self):
+        header_end = self._data.find(b'\r\n\r\n')
+        if header_end == -1:
+            return None
+        lines = self._data[:header_end].decode('ISO-8859-1').split('\r\n')
+        method, path, version = lines[0].split()
+        headers = {}
+        for line in lines[1:]:
+            name, value = line.split(':', 1)
+            headers[name.strip().lower()] = value.strip()
+        body_start = header_end + 4
+        body_end = body_start + int(headers.get('content-length', 0))
+        if len(self._data) < body_end:
+            return None
+        body = self._data[body_start:body_end]
+        self._data = self._data[body_end:]
+        keep_alive = (version == 'HTTP/1.1' and
+                      headers.get('connection', '').lower() != 'close')
+        return method, path, headers, body, keep_alive
+
+    def _handle_request(self, method, path, headers, body, keep_alive):
+        metrics = self.server.metrics
+        if method == 'GET' and path == '/health':
+            health = get_health(self.server)
+            self._send_response(200 if health['ready'] else 503,
+                                json_dumps(health), keep_alive,
+                                content_type='application/json')
+        elif method == 'GET' and metrics and path == '/metrics':
+            self._send_response(200, metrics.render(), keep_alive,
+                                content_type=metrics.content_type)
+        elif method == 'GET':
+            self._send_response(404, keep_alive=keep_alive)
+        elif method != 'POST':
+            self._send_response(501)
+        elif path not in self.server.rpc_paths:
+            self._send_response(404)
+        else:
+            try:
+                body = decode_content(
+                    body, headers.get('content-encoding', 'identity').lower())
+            except NotImplementedError:
+                self._send_response(501, keep_alive=keep_alive)
+                return
+            except ValueError:
+                self._send_response(400, keep_alive=keep_alive)
+                return
+            gzip = accepts_gzip(headers.get('accept-encoding', ''))
+            self.server.call_started()
+            if is_json(headers.get('content-type', '')):
+                response = self.server.dispatch_json_request(body)
+                content_type = 'application/json'
+            else:
+                response = self.server.dispatch_request(body)
+                content_type = 'text/xml'
+            response.add_done_callback(
+                lambda response: self.server.call_finished())
+            response.add_done_callback(lambda response: self._send_response(
+                200, response.result(), keep_alive, gzip, content_type))
+            if metrics:
+                response.add_done_callback(lambda response: (
+                    metrics.response_sent(len(response.result()))))
+
+    def _send_response(self, code, body=b'', keep_alive=False, gzip=False,
+                       content_type='text/xml'):
+        self._requests_handled += 1
+        http11 = bool(self.server.keep_alive_timeout)
+        keep_alive = (keep_alive and http11 and not self.server.stopping and
+                      self._requests_handled
+                      < self.server.keep_alive_max_requests)
+        threshold = self.server.compression_threshold
+        compress = gzip and threshold is not None and len(body) > threshold
+        if compress:
+            body = gzip_encode(body)
+        headers = ['HTTP/%s %d %s' % ('1.1' if http11 else '1.0', code,
+                                      HTTP_RESPONSES[code]),
+                   'Content-Length: %d' % len(body)]
+        if body:
+            headers.append('Content-Type: ' + content_type)
+        if compress:
+            headers.append('Content-Encoding: gzip')
+        if http11 and not keep_alive:
+            headers.append('Connection: close')
+        head = '\r\n'.join(headers) + '\r\n\r\n'
+        self._transport.write(head.encode('ISO-8859-1') + body)
+        if keep_alive:
+            self.idle = True
+            self._start_idle_timer()
+            self._handle_buffered_data()
+        else:
+            self._transport.close()
+
+
+def decode_content(data, encoding):
+    """Decode request body according to its ``Content-Encoding``.
+
+    Raises ``NotImplementedError`` if the encoding is not supported and
+    ``ValueError`` if decoding fails.
+    """
+    if encoding == 'identity':
+        return data
+    if encoding == 'gzip' and gzip_decode:
+        return gzip_decode(data)
+    if encoding == 'deflate':
+        try:
+            return zlib.decompress(data)
+        except zlib.error as err:
+            raise ValueError(str(err))
+    raise NotImplementedError(encoding)
+
+
+def accepts_gzip(accept_encoding):
+    """Return ``True`` if ``Accept-Encoding`` header value allows gzip."""
+    for item in accept_encoding.split(','):
+        params = item.split(';')
+        if params[0].strip().lower() != 'gzip':
+            continue
+        for param in params[1:]:
+            name, _, value = param.partition('=')
+            if name.strip() == 'q':
+                try:
+                    return float(value) > 0
+                except ValueError:
+                    return False
+        return True
+    return False
+
+
+def is_json(content_type):
+    """Return ``True`` if ``Content-Type`` header value denotes JSON."""
+    return content_type.split(';')[0].strip().lower() == 'application/json'
+
+
+def json_rpc_loads(data, methods):
+    """Parse JSON-RPC request and return ``(request_id, method, params)``.
+
+    Raises ``Fault`` with a JSON-RPC error code if the request is invalid
+    or the method is not found from ``methods``.
+    """
+    try:
+        request = json_loads(data)
+    except ValueError as err:
+        raise Fault(-32700, 'Parse error: %s' % err)
+    if not isinstance(request, dict) or 'method' not in request:
+        raise Fault(-32600, 'Invalid request.')
+    params = request.get('params', [])
+    if not isinstance(params, list):
+        raise Fault(-32602, 'Invalid params: Only positional parameters '
+                            'are supported.')
+    method = request['method']
+    if method not in methods:
+        raise Fault(-32601, 'Method not found: %s' % method)
+    return request.get('id'), method, params
+
+
+def json_rpc_dumps(request_id, result=None, error=None):
+    """Create JSON-RPC response containing ``result`` or ``error``."""
+    if error is None:
+        try:
+            return json_dumps({'jsonrpc': '2.0', 'id': request_id,
+                               'result': result})
+        except Exception:
+            error = sys.exc_info()[1]
+    if not isinstance(error, Fault):
+        error = Fault(-32000, '%s: %s' % (type(error).__name__, error))
+    return json_dumps({'jsonrpc': '2.0', 'id': request_id,
+                       'error': {'code': error.faultCode,
+                                 'message': error.faultString}})
+
+
+def json_dumps(value):
+    """Serialize value to JSON bytes. ``Binary`` is encoded using base64."""
+    return json.dumps(value, default=_json_default,
+                      separators=(',', ':')).encode('ASCII')
+
+
+def _json_default(value):
+    if isinstance(value, Binary):
+        value = value.data
+    if isinstance(value, (bytes, bytearray)):
+        return {'$binary': base64.b64encode(value).decode('ASCII')}
+    raise TypeError('%s is not JSON serializable.' % type(value).__name__)
+
+
+def json_loads(data):
+    """Deserialize JSON bytes. Encoded binary is decoded back to ``Binary``."""
+    return json.loads(data.decode('UTF-8'), object_hook=_json_object_hook)
+
+
+def _json_object_hook(value):
+    if len(value) == 1 and '$binary' in value:
+        return Binary(base64.b64decode(value['$binary']))
+    return value
+
+
+def get_health(server):
+    """Return health information about the given server as a dictionary."""
+    started = server.started
+    return {'ready': server.ready,
+            'calls_in_progress': server.calls_in_progress,
+            'uptime': time.time() - started if started else 0.0,
+            'pid': os.getpid()}
+
+
+def remove_unix_socket(path):
+    """Remove Unix domain socket file if it exists."""
+    try:
+        if stat.S_ISSOCK(os.stat(path).st_mode):
+            os.remove(path)
+    except OSError:
+        pass
+
+
 class SignalHandler(object):
 
-    def __init__(self, handler):
+    def __init__(self, handler, names=('SIGINT', 'SIGTERM', 'SIGHUP')):
         self._handler = lambda signum, frame: handler()
+        self._names = names
         self._original = {}
 
     def __enter__(self):
-        for name in 'SIGINT', 'SIGTERM', 'SIGHUP':
+        for name in self._names:
             if hasattr(signal, name):
                 try:
                     orig = signal.signal(getattr(signal, name), self._handler)
@@ -247,16 +1485,460 @@ class SignalHandler(object):
             signal.signal(getattr(signal, name), handler)
 
 
-def RemoteLibraryFactory(library):
+class WorkerProcesses(object):
+
+    def __init__(self, count, serve, log_exit):
+        self._count = count
+        self._serve = serve
+        self._log_exit = log_exit
+        self._pids = set()
+        self._stopping = False
+        self._kill_deadline = None
+        self._closed = False
+        self._in_worker = False
+        self._stop_reader, self._stop_writer = os.pipe()
+
+    def serve(self):
+        try:
+            while self._pids or not self._stopping:
+                if not self._stopping:
+                    self._start_workers()
+                self._wait_stop_request(timeout=0.5)
+                self._reap_workers()
+                if self._kill_deadline is not None and \
+                        self._stopping and time.time() >= self._kill_deadline:
+                    self.send_signal(signal.SIGKILL)
+        finally:
+            self._closed = True
+            os.close(self._stop_reader)
+            os.close(self._stop_writer)
+
+    def _start_workers(self):
+        while len(self._pids) < self._count:
+            pid = os.fork()
+            if pid == 0:
+                self._serve_in_worker()
+            self._pids.add(pid)
+
+    def _serve_in_worker(self):
+        self._in_worker = True
+        rc = 0
+        try:
+            os.close(self._stop_reader)
+            self._serve()
+        except Exception:
+            traceback.print_exc()
+            rc = 1
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os._exit(rc)
+
+    def _wait_stop_request(self, timeout):
+        try:
+            readable = select.select([self._stop_reader], [], [], timeout)[0]
+        except select.error:    # Interrupted by a signal on Python 2.
+            return
+        if readable:
+            os.read(self._stop_reader, 1024)
+            if not self._stopping:
+                self._stopping = True
+                self._terminate_workers()
+
+    def _terminate_workers(self):
+        self.send_signal(signal.SIGTERM)
+
+    def _reap_workers(self):
+        for pid in list(self._pids):
+            try:
+                reaped, status = os.waitpid(pid, os.WNOHANG)
+            except OSError:     # Already reaped elsewhere.
+                reaped, status = pid, 0
+            if reaped:
+                self._pids.discard(pid)
+                if not self._stopping:
+                    self._log_exit(pid, self._get_return_code(status))
+
+    def _get_return_code(self, status):
+        # Same convention as with subprocess: negative means killed by signal.
+        if os.WIFSIGNALED(status):
+            return -os.WTERMSIG(status)
+        return os.WEXITSTATUS(status)
+
+    @property
+    def in_worker(self):
+        """``True`` when accessed in a worker process."""
+        return self._in_worker
+
+    def send_signal(self, signum):
+        """Send signal to all workers.
+
+        Returns ``False`` without doing anything if called in a worker.
+        """
+        if self._in_worker:
+            return False
+        for pid in self._pids:
+            try:
+                os.kill(pid, signum)
+            except OSError:     # Already dead.
+                pass
+        return True
+
+    def stop(self, timeout=None):
+        """Stop all workers. Can be called also in signal handlers and in
+        worker processes.
+
+        Workers still running after ``timeout`` seconds are killed. The
+        timeout is ignored in worker processes.
+        """
+        if timeout is not None and not self._in_worker:
+            deadline = time.time() + timeout
+            if self._kill_deadline is None or deadline < self._kill_deadline:
+                self._kill_deadline = deadline
+        if not self._closed:
+            os.write(self._stop_writer, b'x')
+
+
+class KeywordMetrics(object):
+    """Collects metrics about keywords and server responses.
+
+    Metrics are rendered in the Prometheus text exposition format. They
+    are not supported with worker processes that would each collect their
+    own metrics.
+    """
+    content_type = 'text/plain; version=0.0.4; charset=utf-8'
+    duration_buckets = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5,
+                        5.0, 10.0, 30.0, 60.0)
+    size_buckets = (1024, 10240, 102400, 1048576, 10485760)
+    _clock = staticmethod(getattr(time, 'perf_counter', time.time))
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._keywords = {}
+        self._in_progress = 0
+        self._responses = Histogram(self.size_buckets)
+
+    def start(self):
+        with self._lock:
+            self._in_progress += 1
+        return self._clock()
+
+    def end(self, name, start, result=None):
+        """Record a finished keyword. ``result`` is ``None`` on errors."""
+        elapsed = self._clock() - start
+        failed = not result or result['status'] != 'PASS'
+        output = result.get('output') if result else None
+        output_bytes = self._byte_size(output) if output else 0
+        with self._lock:
+            self._in_progress -= 1
+            keyword = self._keywords.get(name)
+            if not keyword:
+                keyword = self._keywords[name] = \
+                        KeywordStatistics(self.duration_buckets)
+            keyword.calls += 1
+            keyword.failures += failed
+            keyword.output_bytes += output_bytes
+            keyword.durations.observe(elapsed)
+
+    def _byte_size(self, value):
+        if isinstance(value, Binary):
+            return len(value.data)
+        if isinstance(value, unicode):
+            return len(value.encode('UTF-8', 'replace'))
+        return len(value)
+
+    def response_sent(self, size):
+        with self._lock:
+            self._responses.observe(size)
+
+    def render(self):
+        """Return metrics in Prometheus text format as bytes."""
+        with self._lock:
+            keywords = sorted((name, kw.copy())
+                              for name, kw in self._keywords.items())
+            in_progress = self._in_progress
+            responses = self._responses.copy()
+        lines = []
+        for name, doc, value in [
+                ('calls_total', 'Number of keyword calls.', 'calls'),
+                ('failures_total', 'Number of failed keyword calls.',
+                 'failures'),
+                ('output_bytes_total', 'Bytes of output written by '
+                                       'keywords.', 'output_bytes')]:
+            name = 'robot_remote_keyword_' + name
+            lines.extend(['# HELP %s %s' % (name, doc),
+                          '# TYPE %s counter' % name])
+            for keyword, stats in keywords:
+                lines.append('%s{keyword="%s"} %s'
+                             % (name, self._escape(keyword),
+                                getattr(stats, value)))
+        name = 'robot_remote_keyword_duration_seconds'
+        lines.extend(['# HELP %s Keyword execution time.' % name,
+                      '# TYPE %s histogram' % name])
+        for keyword, stats in keywords:
+            lines.extend(stats.durations.render(
+                name, 'keyword="%s",' % self._escape(keyword)))
+        name = 'robot_remote_keywords_in_progress'
+        lines.extend(['# HELP %s Number of keywords currently running.' % name,
+                      '# TYPE %s gauge' % name,
+                      '%s %d' % (name, in_progress)])
+        name = 'robot_remote_response_bytes'
+        lines.extend(['# HELP %s Size of XML-RPC and JSON-RPC responses '
+                      'before compression.' % name,
+                      '# TYPE %s histogram' % name])
+        lines.extend(responses.render(name))
+        rss = self._get_resident_memory()
+        if rss is not None:
+            name = 'process_resident_memory_bytes'
+            lines.extend(['# HELP %s Resident memory size in bytes.' % name,
+                          '# TYPE %s gauge' % name,
+                          '%s %d' % (name, rss)])
+        return ('\n'.join(lines) + '\n').encode('UTF-8')
+
+    def _escape(self, value):
+        return (value.replace('\\', '\\\\').replace('"', '\\"')
+                .replace('\n', '\\n'))
+
+    def _get_resident_memory(self):
+        # Only supported on Linux.
+        try:
+            with open('/proc/self/statm') as statm:
+                pages = int(statm.read().split()[1])
+            return pages * os.sysconf('SC_PAGE_SIZE')
+        except (EnvironmentError, ValueError, IndexError, AttributeError):
+            return None
+
+
+class KeywordStatistics(object):
+
+    def __init__(self, duration_buckets):
+        self.calls = 0
+        self.failures = 0
+        self.output_bytes = 0
+        self.durations = Histogram(duration_buckets)
+
+    def copy(self):
+        copy = KeywordStatistics(())
+        copy.calls = self.calls
+        copy.failures = self.failures
+        copy.output_bytes = self.output_bytes
+        copy.durations = self.durations.copy()
+        return copy
+
+
+class Histogram(object):
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0
+
+    def observe(self, value):
+        # Buckets are inclusive, i.e. `value <= bucket`.
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+    def copy(self):
+        copy = Histogram(self.buckets)
+        copy.counts = list(self.counts)
+        copy.sum = self.sum
+        return copy
+
+    def render(self, name, labels=''):
+        lines = []
+        total = 0
+        for bucket, count in zip(self.buckets + ('+Inf',), self.counts):
+            total += count
+            lines.append('%s_bucket{%sle="%s"} %d'
+                         % (name, labels, bucket, total))
+        labels = '{%s}' % labels.rstrip(',') if labels else ''
+        lines.append('%s_sum%s %s' % (name, labels, self.sum))
+        lines.append('%s_count%s %d' % (name, labels, total))
+        return lines
+
+
+class KeywordProfiler(object):
+    """Profiles keywords using cProfile and writes results as pstats files.
+
+    Requests are profiled as a whole, including parsing the request and
+    marshalling the response, and results are aggregated per keyword.
+    Results of each keyword are written into a separate file in
+    ``directory``. Keyword names are matched case, space and underscore
+    insensitively.
+    """
+
+    def __init__(self, directory=None):
+        self.directory = directory or tempfile.gettempdir()
+        self.enabled = False
+        self._names = None
+        self._stats = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def start(self, names=None):
+        """Start profiling keywords with the given names, by default all."""
+        if not cProfile:
+            raise RuntimeError('Profiling requires the cProfile module.')
+        with self._lock:
+            self._names = set(self._normalize(n) for n in names) \
+                    if names else None
+            self._stats = {}
+            self.enabled = True
+
+    def stop(self):
+        """Stop profiling and write results. Returns paths to written files."""
+        with self._lock:
+            stats, self._stats = self._stats, {}
+            self.enabled = False
+        paths = []
+        for name in sorted(stats):
+            filename = '%s-%d.pstats' % (re.sub(r'[^\w-]+', '_', name),
+                                        os.getpid())
+            path = os.path.join(self.directory, filename)
+            stats[name].dump_stats(path)
+            paths.append(path)
+        return paths
+
+    def run(self, function, *args, **kwargs):
+        """Run function and profile it.
+
+        Results are stored if a profiled keyword was run during the call.
+        """
+        self._local.keyword = None
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:  # Another profiler is active on Python 3.12+.
+            return function(*args, **kwargs)
+        PROFILER.set(self)
+        try:
+            return function(*args, **kwargs)
+        finally:
+            profile.disable()
+            PROFILER.set(None)
+            if self._local.keyword:
+                self._add(self._local.keyword, profile)
+
+    def wrap(self, function):
+        """Wrap function to be profiled when run in another thread.
+
+        cProfile only profiles the thread where it is enabled. Results are
+        stored for the keyword run by the current request when the function
+        finishes, even if the request has already finished.
+        """
+        name = getattr(self._local, 'keyword', None)
+        if not name:
+            return function
+
+        def run(*args, **kwargs):
+            profile = cProfile.Profile()
+            try:
+                profile.enable()
+            except ValueError:  # Profiler on Python 3.12+ sees all threads.
+                return function(*args, **kwargs)
+            try:
+                return function(*args, **kwargs)
+            finally:
+                profile.disable()
+                self._add(name, profile)
+
+        return run
+
+    def keyword_called(self, name):
+        """Mark that keyword with the given name was run by the request."""
+        if self._names is None or self._normalize(name) in self._names:
+            self._local.keyword = name
+
+    def _add(self, name, profile):
+        with self._lock:
+            if not self.enabled:
+                return
+            if name in self._stats:
+                self._stats[name].add(profile)
+            else:
+                self._stats[name] = pstats.Stats(profile)
+
+    def _normalize(self, name):
+        return name.lower().replace(' ', '').replace('_', '')
+
+
+class SlowCallLog(object):
+    """Keeps the latest calls taking longer than ``threshold`` seconds.
+
+    At most ``size`` calls are kept and older ones are discarded.
+    """
+
+    def __init__(self, threshold, size=100):
+        self.threshold = float(threshold)
+        self._calls = deque(maxlen=int(size))
+        self._lock = threading.Lock()
+
+    def record(self, timer):
+        if timer.elapsed >= self.threshold:
+            call = timer.to_dict()
+            with self._lock:
+                self._calls.append(call)
+
+    def get_calls(self):
+        with self._lock:
+            return list(self._calls)
+
+
+class CallTimer(object):
+    """Measures time spent in different phases of handling a call.
+
+    Each call to :meth:`mark` adds the time elapsed since the previous call
+    to the given phase. The phases are ``read`` (reading and decompressing
+    the request), ``parse`` (parsing the request), ``arguments`` (handling
+    binary arguments), ``keyword`` (running the keyword), ``return``
+    (converting the return value), ``output`` (collecting captured output),
+    ``marshal`` (creating the response) and ``write`` (sending the response).
+    """
+    _clock = staticmethod(getattr(time, 'perf_counter', time.time))
+
+    def __init__(self):
+        self.started = time.time()
+        self.method = None
+        self.keyword = None
+        self.phases = {}
+        self._start = self._previous = self._clock()
+
+    def dispatched(self, method, params):
+        self.mark('parse')
+        if self.method is None:
+            self.method = method
+            if method == 'run_keyword' and params:
+                self.keyword = params[0]
+
+    def mark(self, phase):
+        now = self._clock()
+        self.phases[phase] = self.phases.get(phase, 0) + now - self._previous
+        self._previous = now
+
+    @property
+    def elapsed(self):
+        return self._previous - self._start
+
+    def to_dict(self):
+        call = {'method': self.method or '', 'started': self.started,
+                'elapsed': self.elapsed, 'phases': dict(self.phases)}
+        if self.keyword is not None:
+            call['keyword'] = self.keyword
+        return call
+
+
+def RemoteLibraryFactory(library, lazy=False, cache=None, limits=None):
     if inspect.ismodule(library):
-        return StaticRemoteLibrary(library)
+        return StaticRemoteLibrary(library, lazy, cache, limits)
     get_keyword_names = dynamic_method(library, 'get_keyword_names')
     if not get_keyword_names:
-        return StaticRemoteLibrary(library)
+        return StaticRemoteLibrary(library, lazy, cache, limits)
     run_keyword = dynamic_method(library, 'run_keyword')
     if not run_keyword:
-        return HybridRemoteLibrary(library, get_keyword_names)
-    return DynamicRemoteLibrary(library, get_keyword_names, run_keyword)
+        return HybridRemoteLibrary(library, get_keyword_names, lazy, cache,
+                                   limits)
+    return DynamicRemoteLibrary(library, get_keyword_names, run_keyword,
+                                limits)
 
 
 def dynamic_method(library, underscore_name):
@@ -273,11 +1955,49 @@ def is_function_or_method(item):
     return inspect.isfunction(item) or inspect.ismethod(item)
 
 
+def is_coroutine_function(item):
+    return asyncio is not None and asyncio.iscoroutinefunction(item)
+
+
+# Used instead of `inspect.iscoroutine` in an exact type check that is
+# faster. `asyncio.iscoroutine` accepts also generators on Python < 3.12.
+CoroutineType = getattr(types, 'CoroutineType', None)
+
+
+def run_coroutine(coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+KeywordInfo = namedtuple('KeywordInfo', ['keyword', 'arguments',
+                                         'documentation', 'tags', 'varargs',
+                                         'kwargs', 'timeout'])
+
+
 class StaticRemoteLibrary(object):
 
-    def __init__(self, library):
+    def __init__(self, library, lazy=False, cache=None, limits=None):
         self._library = library
-        self._names, self._robot_name_index = self._get_keyword_names(library)
+        self._limits = limits
+        self._keywords = {}
+        self._runners = {}
+        self._cached_keywords = {}
+        self._library_information = None
+        cached = cache.load() if cache else None
+        if cached:
+            self._names = cached['names']
+            self._robot_name_index = cached['robot_names']
+            self._cached_keywords = cached['keywords']
+        else:
+            self._names, self._robot_name_index \
+                    = self._get_keyword_names(library)
+            if not lazy or cache:
+                self._index_keywords(self._names)
+            if cache:
+                cache.save(self._names, self._robot_name_index, self._keywords)
 
     def _get_keyword_names(self, library):
         names = []
@@ -291,22 +2011,39 @@ class StaticRemoteLibrary(object):
                     names.append(name)
         return names, robot_name_index
 
-    def get_keyword_names(self):
-        return self._names
-
-    def run_keyword(self, name, args, kwargs=None):
-        kw = self._get_keyword(name)
-        return KeywordRunner(kw).run_keyword(args, kwargs)
-
-    def _get_keyword(self, name):
-        if name in self._robot_name_index:
-            name = self._robot_name_index[name]
-        return getattr(self._library, name)
+    def _index_keywords(self, names):
+        for name in names:
+            try:
+                self._get_keyword_info(name)
+            except Exception:
+                pass    # Errors are reported when the keyword is used.
 
-    def get_keyword_arguments(self, name):
-        if __name__ == '__init__':
-            return []
-        kw = self._get_keyword(name)
+    def _get_keyword_info(self, name):
+        try:
+            return self._keywords[name]
+        except KeyError:
+            info = self._keywords[name] = self._create_keyword_info(name)
+            return info
+
+    def _create_keyword_info(self, name):
+        attr_name = self._robot_name_index.get(name, name)
+        keyword = getattr(self._library, attr_name)
+        if name in self._cached_keywords:
+            cached = self._cached_keywords[name]
+            return KeywordInfo(keyword, tuple(cached['args']), cached['doc'],
+                               tuple(cached['tags']), cached['varargs'],
+                               cached['kwargs'], self._get_timeout(keyword))
+        args, varargs, kwargs = self._get_arguments(keyword)
+        return KeywordInfo(keyword, tuple(args), inspect.getdoc(keyword) or '',
+                           tuple(getattr(keyword, 'robot_tags', ())),
+                           bool(varargs), bool(kwargs),
+                           self._get_timeout(keyword))
+
+    def _get_timeout(self, keyword):
+        timeout = getattr(keyword, 'robot_timeout', None)
+        return float(timeout) if timeout is not None else None
+
+    def _get_arguments(self, kw):
         args, varargs, kwargs, defaults = inspect.getargspec(kw)
         if inspect.ismethod(kw):
             args = args[1:]  # drop 'self'
@@ -317,7 +2054,29 @@ class StaticRemoteLibrary(object):
             args.append('*%s' % varargs)
         if kwargs:
             args.append('**%s' % kwargs)
-        return args
+        return args, varargs, kwargs
+
+    def get_keyword_names(self):
+        return self._names
+
+    def run_keyword(self, name, args, kwargs=None):
+        return self._get_runner(name).run_keyword(args, kwargs)
+
+    def run_keyword_async(self, name, args, kwargs=None):
+        return self._get_runner(name).run_keyword_async(args, kwargs)
+
+    def _get_runner(self, name):
+        # Runners do not have any state and can be reused.
+        try:
+            return self._runners[name]
+        except KeyError:
+            info = self._get_keyword_info(name)
+            runner = KeywordRunner(info.keyword, self._limits, info.timeout)
+            self._runners[name] = runner
+            return runner
+
+    def get_keyword_arguments(self, name):
+        return list(self._get_keyword_info(name).arguments)
 
     def get_keyword_documentation(self, name):
         if name == '__intro__':
@@ -325,7 +2084,7 @@ class StaticRemoteLibrary(object):
         elif name == '__init__':
             source = self._get_init(self._library)
         else:
-            source = self._get_keyword(name)
+            return self._get_keyword_info(name).documentation
         return inspect.getdoc(source) or ''
 
     def _get_init(self, library):
@@ -345,21 +2104,117 @@ class StaticRemoteLibrary(object):
         return is_function_or_method(init)
 
     def get_keyword_tags(self, name):
-        keyword = self._get_keyword(name)
-        return getattr(keyword, 'robot_tags', [])
+        return list(self._get_keyword_info(name).tags)
+
+    def get_library_information(self):
+        """Return arguments, documentation and tags of all keywords at once.
+
+        Information is collected when this method is called the first time
+        and cached after that.
+        """
+        if self._library_information is None:
+            self._library_information = self._get_library_information()
+        return self._library_information
+
+    def _get_library_information(self):
+        info = dict((name, {'doc': self.get_keyword_documentation(name)})
+                    for name in ('__intro__', '__init__'))
+        for name in self.get_keyword_names():
+            info[name] = {'args': self.get_keyword_arguments(name),
+                          'doc': self.get_keyword_documentation(name),
+                          'tags': self.get_keyword_tags(name)}
+        return info
+
+
+class IntrospectionCache(object):
+    """Stores information about keywords of a static library into a file.
+
+    The cache is valid as long as the source file of the module containing
+    the library, the version of the library and the version of the remote
+    server stay the same.
+    """
+
+    def __init__(self, path, library):
+        self.path = path
+        self._key = self._get_key(library)
+
+    def _get_key(self, library):
+        if inspect.ismodule(library):
+            module, name = library, library.__name__
+        else:
+            module = sys.modules.get(type(library).__module__)
+            name = '%s.%s' % (type(library).__module__,
+                              type(library).__name__)
+        source = getattr(module, '__file__', None)
+        if not source or not os.path.exists(source):
+            return None
+        version = getattr(library, 'ROBOT_LIBRARY_VERSION', None) \
+                or getattr(library, '__version__', None)
+        return {'library': name,
+                'source': os.path.abspath(source),
+                'mtime': os.path.getmtime(source),
+                'version': unicode(version) if version else None,
+                'server_version': __version__}
+
+    def load(self):
+        """Return cached information or ``None`` if the cache is not valid."""
+        if not self._key or not os.path.exists(self.path):
+            return None
+        try:
+            with open(self.path) as cache:
+                data = json.load(cache)
+        except (IOError, OSError, ValueError):
+            return None
+        if data.get('key') != self._key:
+            return None
+        return data
+
+    def save(self, names, robot_name_index, keywords):
+        if not self._key:
+            return
+        data = {'key': self._key,
+                'names': names,
+                'robot_names': robot_name_index,
+                'keywords': dict((name, {'args': info.arguments,
+                                         'doc': info.documentation,
+                                         'tags': info.tags,
+                                         'varargs': info.varargs,
+                                         'kwargs': info.kwargs})
+                                 for name, info in keywords.items())}
+        # Write to a temporary file first to avoid others reading partial data.
+        temp = '%s.%d.tmp' % (self.path, os.getpid())
+        try:
+            with open(temp, 'w') as cache:
+                json.dump(data, cache)
+            self._replace(temp, self.path)
+        except (IOError, OSError):
+            # Caching is an optimization and failures are not fatal.
+            if os.path.exists(temp):
+                os.remove(temp)
+
+    def _replace(self, source, destination):
+        try:
+            os.rename(source, destination)
+        except OSError:     # Windows does not allow overwriting.
+            os.remove(destination)
+            os.rename(source, destination)
 
 
 class HybridRemoteLibrary(StaticRemoteLibrary):
 
-    def __init__(self, library, get_keyword_names):
-        StaticRemoteLibrary.__init__(self, library)
+    def __init__(self, library, get_keyword_names, lazy=False, cache=None,
+                 limits=None):
+        StaticRemoteLibrary.__init__(self, library, lazy, cache, limits)
         self.get_keyword_names = get_keyword_names
 
 
 class DynamicRemoteLibrary(HybridRemoteLibrary):
 
-    def __init__(self, library, get_keyword_names, run_keyword):
-        HybridRemoteLibrary.__init__(self, library, get_keyword_names)
+    def __init__(self, library, get_keyword_names, run_keyword,
+                 limits=None):
+        # Keywords are not library attributes so there is nothing to index.
+        HybridRemoteLibrary.__init__(self, library, get_keyword_names,
+                                     lazy=True, limits=limits)
         self._run_keyword = run_keyword
         self._supports_kwargs = self._get_kwargs_support(run_keyword)
         self._get_keyword_arguments \
@@ -375,7 +2230,13 @@ class DynamicRemoteLibrary(HybridRemoteLibrary):
 
     def run_keyword(self, name, args, kwargs=None):
         args = [name, args, kwargs] if kwargs else [name, args]
-        return KeywordRunner(self._run_keyword).run_keyword(args)
+        runner = KeywordRunner(self._run_keyword, self._limits)
+        return runner.run_keyword(args)
+
+    def run_keyword_async(self, name, args, kwargs=None):
+        args = [name, args, kwargs] if kwargs else [name, args]
+        runner = KeywordRunner(self._run_keyword, self._limits)
+        return runner.run_keyword_async(args)
 
     def get_keyword_arguments(self, name):
         if self._get_keyword_arguments:
@@ -395,28 +2256,182 @@ class DynamicRemoteLibrary(HybridRemoteLibrary):
         return []
 
 
+class KeywordTimeoutError(RuntimeError):
+    ROBOT_SUPPRESS_NAME = True
+
+    def __init__(self, timeout):
+        RuntimeError.__init__(self, 'Keyword timeout %g seconds exceeded.'
+                              % timeout)
+
+
 class KeywordRunner(object):
 
-    def __init__(self, keyword):
+    def __init__(self, keyword, limits=None, timeout=None):
         self._keyword = keyword
+        self._limits = limits
+        if timeout is None and limits:
+            timeout = limits.keyword_timeout
+        # Zero or negative timeout means no timeout.
+        self._timeout = timeout if timeout and timeout > 0 else None
 
     def run_keyword(self, args, kwargs=None):
+        if self._timeout is None:
+            return self._run_keyword(args, kwargs)
+        return self._run_keyword_with_timeout(args, kwargs)
+
+    def _run_keyword_with_timeout(self, args, kwargs):
+        # Threads cannot be killed, so the keyword is run in a separate
+        # thread that is abandoned if it does not finish in time.
+        results = []
+
+        def run():
+            try:
+                results.append((self._run_keyword(args, kwargs), None))
+            except Exception:
+                results.append((None, sys.exc_info()[1]))
+
+        profiler = PROFILER.get()
+        if profiler:
+            run = profiler.wrap(run)
+        if contextvars:
+            # The slow call log timer is stored in the context.
+            context = contextvars.copy_context()
+            thread = threading.Thread(target=lambda: context.run(run))
+        else:
+            thread = threading.Thread(target=run)
+        thread.daemon = True
+        shared = CapturingStream.shared
+        thread.start()
+        thread.join(self._timeout)
+        if results:
+            result, error = results[0]
+            if error:
+                raise error
+            return result
+        # The abandoned keyword must not capture output written after this
+        # by others when its interceptor is shared.
+        if StandardStreamCapture.shared:
+            CapturingStream.shared = shared
+        if self._limits:
+            self._limits.add_timed_out()
+        result = KeywordResult(self._limits)
+        result.set_error(KeywordTimeoutError,
+                         KeywordTimeoutError(self._timeout))
+        return result.data
+
+    def _run_keyword(self, args, kwargs=None):
+        # The slow call log timer is checked only once so that running
+        # keywords has no timing overhead when the log is not used.
+        timer = CALL_TIMER.get()
+        if timer:
+            return self._run_timed_keyword(timer, args, kwargs)
+        if args:
+            args = self._handle_binary(args)
+        kwargs = self._handle_binary(kwargs) if kwargs else {}
+        result = KeywordResult(self._limits)
+        with StandardStreamInterceptor(self._limits) as interceptor:
+            try:
+                return_value = self._keyword(*args, **kwargs)
+                if type(return_value) is CoroutineType:
+                    return_value = run_coroutine(return_value)
+            except Exception:
+                result.set_error(*sys.exc_info())
+            else:
+                self._set_return(result, return_value)
+        result.set_output(interceptor.output, interceptor.removed,
+                          interceptor.files)
+        return result.data
+
+    def _run_timed_keyword(self, timer, args, kwargs=None):
+        # Same as `_run_keyword` but records the time taken by each phase.
+        if args:
+            args = self._handle_binary(args)
+        kwargs = self._handle_binary(kwargs) if kwargs else {}
+        timer.mark('arguments')
+        result = KeywordResult(self._limits)
+        with StandardStreamInterceptor(self._limits) as interceptor:
+            try:
+                return_value = self._keyword(*args, **kwargs)
+                if type(return_value) is CoroutineType:
+                    return_value = run_coroutine(return_value)
+            except Exception:
+                result.set_error(*sys.exc_info())
+                timer.mark('keyword')
+            else:
+                timer.mark('keyword')
+                self._set_return(result, return_value)
+                timer.mark('return')
+        result.set_output(interceptor.output, interceptor.removed,
+                          interceptor.files)
+        timer.mark('output')
+        return result.data
+
+    def _set_return(self, result, return_value):
+        try:
+            result.set_return(return_value)
+        except Exception:
+            result.set_error(*sys.exc_info()[:2])
+        else:
+            result.set_status('PASS')
+
+    def run_keyword_async(self, args, kwargs=None):
+        """Run keyword in the current asyncio event loop.
+
+        Coroutine functions are run in the loop and other keywords in its
+        default executor. Returns a future containing the result.
+        """
+        loop = asyncio.get_event_loop()
+        if not is_coroutine_function(self._keyword):
+            return loop.run_in_executor(None, self.run_keyword, args, kwargs)
         args = self._handle_binary(args)
         kwargs = self._handle_binary(kwargs or {})
-        result = KeywordResult()
-        with StandardStreamInterceptor() as interceptor:
+        # Task created in a copied context gets its own capture buffers.
+        context = contextvars.copy_context()
+        interceptor = context.run(StandardStreamInterceptor,
+                                  self._limits)
+        try:
+            task = context.run(asyncio.ensure_future,
+                               self._keyword(*args, **kwargs))
+        except Exception:
+            task = loop.create_future()
+            task.set_exception(sys.exc_info()[1])
+        timed_out = []
+        if self._timeout is not None and not task.done():
+            timer = loop.call_later(self._timeout,
+                                    lambda: timed_out.append(task.cancel()))
+            task.add_done_callback(lambda task: timer.cancel())
+        future = loop.create_future()
+        task.add_done_callback(lambda task: self._set_async_result(
+            future, context, task, interceptor, timed_out))
+        return future
+
+    def _set_async_result(self, future, context, task, interceptor,
+                          timed_out):
+        # Errors are reported like with the synchronous `run_keyword`.
+        # Otherwise the future would never be done.
+        try:
+            result = context.run(self._get_async_result, task, interceptor,
+                                 timed_out)
+        except Exception:
+            future.set_exception(sys.exc_info()[1])
+        else:
+            future.set_result(result)
+
+    def _get_async_result(self, task, interceptor, timed_out=False):
+        result = KeywordResult(self._limits)
+        with interceptor:
             try:
-                return_value = self._keyword(*args, **kwargs)
+                if task.cancelled() and timed_out:
+                    raise KeywordTimeoutError(self._timeout)
+                if task.cancelled():
+                    raise RuntimeError('Keyword execution was cancelled.')
+                return_value = task.result()
             except Exception:
                 result.set_error(*sys.exc_info())
             else:
-                try:
-                    result.set_return(return_value)
-                except Exception:
-                    result.set_error(*sys.exc_info()[:2])
-                else:
-                    result.set_status('PASS')
-        result.set_output(interceptor.output)
+                self._set_return(result, return_value)
+        result.set_output(interceptor.output, interceptor.removed,
+                          interceptor.files)
         return result.data
 
     def _handle_binary(self, arg):
@@ -433,25 +2448,78 @@ class KeywordRunner(object):
 
 
 class StandardStreamInterceptor(object):
+    """Captures output written by a keyword into standard streams.
+
+    The interceptor is active in the current thread or asyncio task and
+    :class:`CapturingStream` proxies route output written there to it. When
+    the server is running, the proxies are already installed by
+    :class:`StandardStreamCapture` and global streams are not replaced when
+    keywords are run. When requests are handled one by one, also output
+    written by other threads, for example threads started by the keyword,
+    is captured.
+
+    Buffers are created only when something is written, which keeps running
+    keywords that do not log anything cheap.
+    """
 
-    def __init__(self):
+    def __init__(self, limits=None):
         self.output = ''
-        self.origout = sys.stdout
-        self.origerr = sys.stderr
-        sys.stdout = StringIO()
-        sys.stderr = StringIO()
+        self.removed = 0
+        self.files = ()
+        self._limits = limits
+        self._buffers = None
+        self._install = not StandardStreamCapture.streams
+        if self._install:
+            CapturingStream.install('stdout')
+            CapturingStream.install('stderr')
+        self._previous = CAPTURE.get()
+        CAPTURE.set(self)
+        self._shared = StandardStreamCapture.shared
+        if self._shared:
+            self._previous_shared = CapturingStream.shared
+            CapturingStream.shared = self
 
     def __enter__(self):
         return self
 
+    def write(self, index, data):
+        if type(data) is not str and not isinstance(data, (str, unicode)):
+            # Buffers would accept anything, but joining them would fail.
+            raise TypeError("string argument expected, got '%s'"
+                            % type(data).__name__)
+        buffers = self._buffers
+        if buffers is None:
+            with CapturingStream._lock:
+                if self._buffers is None:
+                    self._buffers = self._create_buffers()
+                buffers = self._buffers
+        buffers[index].append(data)
+
+    def _create_buffers(self):
+        limits = self._limits
+        if limits and limits.max_output_size is not None:
+            return (BoundedOutput(limits.max_output_size,
+                                  limits.output_spill_dir),
+                    BoundedOutput(limits.max_output_size,
+                                  limits.output_spill_dir))
+        return ([], [])
+
     def __exit__(self, *exc_info):
-        stdout = sys.stdout.getvalue()
-        stderr = sys.stderr.getvalue()
-        close = [sys.stdout, sys.stderr]
-        sys.stdout = self.origout
-        sys.stderr = self.origerr
-        for stream in close:
-            stream.close()
+        # Keyword abandoned after a timeout must not reset the shared
+        # interceptor of a keyword started after it.
+        if self._shared and CapturingStream.shared is self:
+            CapturingStream.shared = self._previous_shared
+        CAPTURE.set(self._previous)
+        if self._install:
+            CapturingStream.uninstall('stdout')
+            CapturingStream.uninstall('stderr')
+        if self._buffers is None:
+            return
+        stdout, stderr = self._buffers
+        if type(stdout) is list:
+            stdout, stderr = ''.join(stdout), ''.join(stderr)
+        else:
+            stdout, stderr = self._get_value(stdout), self._get_value(stderr)
         if stdout and stderr:
             if not stderr.startswith(('*TRACE*', '*DEBUG*', '*INFO*', '*HTML*',
                                       '*WARN*', '*ERROR*')):
@@ -460,12 +2528,291 @@ class StandardStreamInterceptor(object):
                 stdout += '\n'
         self.output = stdout + stderr
 
+    def _get_value(self, buffer):
+        buffer.close()
+        self.removed += buffer.removed
+        if buffer.file:
+            self.files += (buffer.file,)
+        return buffer.getvalue()
+
+
+class ResultLimits(object):
+    """Limits and options for running keywords and for their output and
+    return values.
+
+    See :class:`RobotRemoteServer` for documentation of the arguments.
+    ``None`` means no limit. ``timed_out`` is the number of keywords that
+    have exceeded their timeout. It is incremented using
+    :meth:`add_timed_out` because keywords can be run in many threads.
+    """
+    _buffer_conversions = (None, 'binary', 'list')
+
+    def __init__(self, max_output_size=None, output_spill_dir=None,
+                 max_return_depth=None, max_return_items=None,
+                 buffer_conversion=None, keyword_timeout=None):
+        self.max_output_size = self._int(max_output_size)
+        self.output_spill_dir = output_spill_dir
+        self.max_return_depth = self._int(max_return_depth)
+        self.max_return_items = self._int(max_return_items)
+        if buffer_conversion not in self._buffer_conversions:
+            raise ValueError("Invalid buffer conversion '%s'. Valid values "
+                             "are 'binary' and 'list'." % buffer_conversion)
+        self.buffer_conversion = buffer_conversion
+        self.keyword_timeout = float(keyword_timeout) \
+                if keyword_timeout is not None else None
+        self.timed_out = 0
+        self._lock = threading.Lock()
+
+    def add_timed_out(self):
+        with self._lock:
+            self.timed_out += 1
+
+    def _int(self, value):
+        return int(value) if value is not None else None
+
+
+class BoundedOutput(object):
+    """Capture buffer keeping only the beginning and the end of output.
+
+    Keeps at most ``max_size`` characters in memory. If more output is
+    written, the middle of it is removed and replaced with a marker. If
+    ``spill_dir`` is given, the full output is written to a temporary file
+    in that directory once the limit is exceeded.
+    """
+
+    def __init__(self, max_size, spill_dir=None):
+        self.removed = 0
+        self.file = None
+        self._spill_dir = spill_dir
+        self._spill = None
+        self._head = []
+        self._head_room = max_size - max_size // 2
+        self._tail = deque()
+        self._tail_size = 0
+        self._tail_limit = max_size // 2
+
+    def append(self, data):
+        if self._spill:
+            self._write_spill(data)
+        if self._head_room:
+            head, data = data[:self._head_room], data[self._head_room:]
+            self._head.append(head)
+            self._head_room -= len(head)
+            if not data:
+                return
+        self._tail.append(data)
+        self._tail_size += len(data)
+        if self._tail_size > self._tail_limit:
+            self._trim_tail()
+
+    def extend(self, lines):
+        for line in lines:
+            self.append(line)
+
+    def _trim_tail(self):
+        if self._spill_dir and not self.removed:
+            self._open_spill()
+        while self._tail_size > self._tail_limit:
+            excess = self._tail_size - self._tail_limit
+            chunk = self._tail.popleft()
+            if len(chunk) > excess:
+                self._tail.appendleft(chunk[excess:])
+                removed = excess
+            else:
+                removed = len(chunk)
+            self._tail_size -= removed
+            self.removed += removed
+
+    def _open_spill(self):
+        fd, self.file = tempfile.mkstemp(prefix='robotremoteserver-',
+                                         suffix='.txt', dir=self._spill_dir)
+        self._spill = io.open(fd, 'w', encoding='UTF-8')
+        # Nothing has been removed yet, so head and tail contain all output.
+        for chunk in self._head:
+            self._write_spill(chunk)
+        for chunk in self._tail:
+            self._write_spill(chunk)
+
+    def _write_spill(self, data):
+        if isinstance(data, bytes):
+            data = data.decode('UTF-8', 'replace')
+        self._spill.write(data)
+
+    def close(self):
+        if self._spill:
+            self._spill.close()
+            self._spill = None
+
+    def getvalue(self):
+        head = ''.join(self._head)
+        tail = ''.join(self._tail)
+        if not self.removed:
+            return head + tail
+        marker = '\n[ %d characters removed ]\n' % self.removed
+        if self.file:
+            marker = '\n[ %d characters removed, full output in %s ]\n' \
+                     % (self.removed, self.file)
+        return head + marker + tail
+
+
+class StandardStreamCapture(object):
+    """Keeps :class:`CapturingStream` proxies installed while serving.
+
+    Installed proxies are available via the ``streams`` class attribute
+    so that keywords can be run without installing them again.
+
+    If ``shared`` is true, requests are handled one by one and output
+    written by any thread while a keyword is run is captured like when
+    ``sys.stdout`` and ``sys.stderr`` are replaced globally. The
+    ``shared`` class attribute is true only if all users use this mode.
+    """
+    streams = None
+    shared = False
+    _users = 0
+    _concurrent_users = 0
+
+    def __init__(self, shared=False):
+        self._shared = shared
+
+    def __enter__(self):
+        cls = type(self)
+        stdout = CapturingStream.install('stdout')
+        stderr = CapturingStream.install('stderr')
+        with CapturingStream._lock:
+            cls._users += 1
+            if not self._shared:
+                cls._concurrent_users += 1
+            cls.streams = (stdout, stderr)
+            cls.shared = not cls._concurrent_users
+        return self
+
+    def __exit__(self, *exc_info):
+        cls = type(self)
+        with CapturingStream._lock:
+            cls._users -= 1
+            if not self._shared:
+                cls._concurrent_users -= 1
+            if not cls._users:
+                cls.streams = None
+            cls.shared = cls._users > 0 and not cls._concurrent_users
+        CapturingStream.uninstall('stdout')
+        CapturingStream.uninstall('stderr')
+
+
+class ContextLocal(object):
+    """Value local to the current thread and, if supported, asyncio task."""
+
+    def __init__(self, name):
+        if contextvars:
+            var = contextvars.ContextVar(name, default=None)
+            self.get, self.set = var.get, var.set
+        else:
+            self._local = threading.local()
+
+    def get(self):
+        return getattr(self._local, 'value', None)
+
+    def set(self, value):
+        self._local.value = value
+
+
+CAPTURE = ContextLocal('robotremoteserver_capture')
+CALL_TIMER = ContextLocal('robotremoteserver_call_timer')
+PROFILER = ContextLocal('robotremoteserver_profiler')
+
+
+class CapturingStream(object):
+    """Replaces ``sys.stdout`` or ``sys.stderr`` while keywords are run.
+
+    Writes go to the :class:`StandardStreamInterceptor` active in the current
+    thread or asyncio task, or to the original stream if no keyword is run in
+    that context. This keeps output of keywords running concurrently
+    separate. An interceptor stored to the ``shared`` class attribute gets
+    also output written in contexts not having an interceptor of their own.
+    """
+    _lock = threading.Lock()
+    _installed = {}
+    shared = None
+
+    def __init__(self, name, stream):
+        self.name = name
+        self.stream = stream
+        self.closed = False
+        self._users = 0
+        self._index = 0 if name == 'stdout' else 1
+
+    @classmethod
+    def install(cls, name):
+        with cls._lock:
+            if name not in cls._installed:
+                cls._installed[name] = cls(name, getattr(sys, name))
+                setattr(sys, name, cls._installed[name])
+            capturer = cls._installed[name]
+            capturer._users += 1
+            return capturer
+
+    @classmethod
+    def uninstall(cls, name):
+        with cls._lock:
+            capturer = cls._installed[name]
+            capturer._users -= 1
+            if capturer._users == 0:
+                del cls._installed[name]
+                if getattr(sys, name) is capturer:
+                    setattr(sys, name, capturer.stream)
+                capturer.closed = True
+
+    def _get_interceptor(self):
+        if self.closed:
+            raise ValueError('I/O operation on closed file.')
+        interceptor = CAPTURE.get()
+        return interceptor if interceptor is not None else self.shared
+
+    def write(self, data):
+        # Same as `_get_interceptor`, but inlined because this is called
+        # often.
+        if self.closed:
+            raise ValueError('I/O operation on closed file.')
+        interceptor = CAPTURE.get() or self.shared
+        if interceptor is None:
+            self.stream.write(data)
+        else:
+            interceptor.write(self._index, data)
+
+    def writelines(self, lines):
+        interceptor = self._get_interceptor()
+        if interceptor is None:
+            self.stream.writelines(lines)
+        else:
+            for line in lines:
+                interceptor.write(self._index, line)
+
+    def flush(self):
+        if self._get_interceptor() is None:
+            self.stream.flush()
+
+    def isatty(self):
+        if self._get_interceptor() is None:
+            return self.stream.isatty()
+        return False
+
+    def __getattr__(self, name):
+        if self.closed:
+            raise ValueError('I/O operation on closed file.')
+        return getattr(self.stream, name)
+
 
 class KeywordResult(object):
     _generic_exceptions = (AssertionError, RuntimeError, Exception)
+    _unchanged_types = (bool, int, long, float)
+    # Short printable strings are common and do not need to be changed.
+    # On Python 2 there is no such fast path because `str` is bytes.
+    _text_type = str if PY3 else None
+    _recursion_limit = 50
 
-    def __init__(self):
+    def __init__(self, limits=None):
         self.data = {'status': 'FAIL'}
+        self._limits = limits
 
     def set_error(self, exc_type, exc_value, exc_tb=None):
         self.data['error'] = self._get_message(exc_type, exc_value)
@@ -493,7 +2840,8 @@ class KeywordResult(object):
         try:
             msg = unicode(value)
         except UnicodeError:
-            msg = ' '.join(self._str(a, handle_binary=False) for a in value.args)
+            msg = ' '.join(self._str(a, handle_binary=False)
+                           for a in value.args)
         return self._handle_binary_result(msg)
 
     def _get_traceback(self, exc_tb):
@@ -506,22 +2854,194 @@ class KeywordResult(object):
         return bool(getattr(exc_value, 'ROBOT_%s_ON_FAILURE' % name, False))
 
     def set_return(self, value):
-        value = self._handle_return_value(value)
-        if value != '':
+        # Common scalars are handled here without any conversion overhead.
+        value_type = type(value)
+        if value_type in self._unchanged_types:
             self.data['return'] = value
+        elif (value_type is self._text_type and len(value) < 1000
+                and value.isprintable()):
+            if value:
+                self.data['return'] = value
+        elif value is not None:
+            value = self._handle_return_value(value)
+            if value != '':
+                self.data['return'] = value
 
     def _handle_return_value(self, ret):
-        if isinstance(ret, (str, unicode, bytes)):
-            return self._handle_binary_result(ret)
-        if isinstance(ret, (int, long, float)):
-            return ret
-        if isinstance(ret, Mapping):
-            return dict((self._str(key), self._handle_return_value(value))
-                        for key, value in ret.items())
-        try:
-            return [self._handle_return_value(item) for item in ret]
+        # Containers are converted recursively, which is fast, until they
+        # are nested `_recursion_limit` levels deep. Deeper containers are
+        # converted using an explicit stack to avoid hitting the recursion
+        # limit. Cycles are detected by tracking containers on the path from
+        # the root to the current one.
+        limits = self._limits
+        self._max_depth = limits.max_return_depth if limits else None
+        self._max_items = limits.max_return_items if limits else None
+        self._buffers = limits.buffer_conversion if limits else None
+        self._path = set()
+        self._items = 0
+        value, container = self._convert(ret)
+        if container:
+            value = self._convert_iteratively(container)
+        self._path = None
+        return value
+
+    def _convert_iteratively(self, container):
+        stack = [container]
+        while True:
+            child = stack[-1].convert(self._convert)
+            if child:
+                stack.append(child)
+                continue
+            container = stack.pop()
+            if not stack:
+                return container.result
+            stack[-1].add(container.source, container.result)
+
+    def _convert(self, value, depth=1):
+        # Lists and tuples are checked first, because common scalar items
+        # in them are handled already by `_convert_sequence`.
+        sequence = isinstance(value, (list, tuple))
+        if not sequence:
+            if isinstance(value, (str, unicode, bytes)):
+                return self._handle_binary_result(value), None
+            if isinstance(value, (int, long, float)):
+                return value, None
+            if value is None:
+                return '', None
+            if self._buffers and not isinstance(value, dict):
+                converted = self._convert_buffer(value)
+                if isinstance(converted, Binary):
+                    return converted, None
+                if converted is not value:
+                    return self._convert(converted, depth)
+        if id(value) in self._path:
+            raise ValueError('Return value contains a reference to itself.')
+        if self._max_depth is not None and depth > self._max_depth:
+            if isinstance(value, Mapping) or self._is_iterable(value):
+                raise ValueError('Return value is nested more than %d levels '
+                                 'deep.' % self._max_depth)
+        # Checking against the Mapping ABC is slow, so do it last.
+        recurse = depth < self._recursion_limit
+        if sequence:
+            self._count_items(len(value))
+            if recurse:
+                return self._convert_sequence(value, value, depth), None
+            container = ContainerConverter(value, iter(value), depth,
+                                           path=self._path)
+        elif isinstance(value, dict) or isinstance(value, Mapping):
+            self._count_items(len(value))
+            if recurse:
+                return self._convert_mapping(value, depth), None
+            items = value.iteritems() if PY2 else iter(value.items())
+            container = ContainerConverter(value, items, depth, self._str,
+                                           self._path)
+        else:
+            try:
+                items = iter(value)
+            except TypeError:
+                return self._str(value), None
+            if self._max_items is not None:
+                # Avoid consuming possibly infinite iterators fully.
+                items = islice(items, self._max_items - self._items + 1)
+            items = list(items)
+            self._count_items(len(items))
+            if recurse:
+                return self._convert_sequence(value, items, depth), None
+            container = ContainerConverter(value, iter(items), depth,
+                                           path=self._path)
+        return None, container
+
+    def _convert_sequence(self, source, items, depth):
+        # Only exact lists and tuples can be returned as-is, because the
+        # marshaller does not support their subclasses. Others are copied
+        # like containers whose items have changed.
+        self._path.add(id(source))
+        unchanged_types = self._unchanged_types
+        text_type = self._text_type
+        result = None
+        for index, item in enumerate(items):
+            # Common items are handled here to avoid function call overhead.
+            item_type = type(item)
+            if item_type in unchanged_types or (
+                    item_type is text_type and len(item) < 1000
+                    and item.isprintable()):
+                converted = item
+            elif item is None:
+                converted = ''
+            else:
+                converted, container = self._convert(item, depth + 1)
+                if container:
+                    converted = self._convert_iteratively(container)
+            if result is None:
+                if converted is item:
+                    continue
+                result = items[:index] if type(items) is list \
+                        else list(items[:index])
+            result.append(converted)
+        self._path.discard(id(source))
+        if result is not None:
+            return result
+        return items if type(items) in (list, tuple) else list(items)
+
+    def _convert_mapping(self, value, depth):
+        # Like `_convert_sequence`, but only exact dicts are returned as-is.
+        self._path.add(id(value))
+        unchanged_types = self._unchanged_types
+        text_type = self._text_type
+        result = None
+        for index, (key, item) in enumerate(self._iteritems(value)):
+            item_type = type(item)
+            if item_type in unchanged_types or (
+                    item_type is text_type and len(item) < 1000
+                    and item.isprintable()):
+                converted = item
+            elif item is None:
+                converted = ''
+            else:
+                converted, container = self._convert(item, depth + 1)
+                if container:
+                    converted = self._convert_iteratively(container)
+            if (type(key) is text_type and len(key) < 1000
+                    and key.isprintable()):
+                converted_key = key
+            else:
+                converted_key = self._str(key)
+            if result is None:
+                if converted is item and converted_key is key:
+                    continue
+                result = dict(islice(self._iteritems(value), index))
+            result[converted_key] = converted
+        self._path.discard(id(value))
+        if result is not None:
+            return result
+        return value if type(value) is dict else dict(self._iteritems(value))
+
+    def _iteritems(self, mapping):
+        return mapping.iteritems() if PY2 else iter(mapping.items())
+
+    def _convert_buffer(self, value):
+        # Objects supporting the buffer protocol are converted as a whole
+        # instead of iterating over them item by item.
+        try:
+            view = memoryview(value)
+        except (TypeError, ValueError):
+            return value
+        if self._buffers == 'list' and hasattr(value, 'tolist'):
+            return value.tolist()
+        return Binary(view.tobytes())
+
+    def _is_iterable(self, value):
+        try:
+            iter(value)
         except TypeError:
-            return self._str(ret)
+            return False
+        return True
+
+    def _count_items(self, count):
+        self._items += count
+        if self._max_items is not None and self._items > self._max_items:
+            raise ValueError('Return value contains more than %d items.'
+                             % self._max_items)
 
     def _handle_binary_result(self, result):
         if not self._contains_binary(result):
@@ -538,9 +3058,22 @@ class KeywordResult(object):
 
     def _contains_binary(self, result):
         if PY3:
-            return isinstance(result, bytes) or BINARY.search(result)
-        return (isinstance(result, bytes) and NON_ASCII.search(result) or
-                BINARY.search(result))
+            if isinstance(result, bytes):
+                return True
+            # Checking is a short string printable is faster than using
+            # a regexp. Most strings are printable, possibly excluding
+            # newlines that are common in output.
+            if len(result) < 1000:
+                return not (result.isprintable()
+                            or result.replace('\n', ' ').isprintable()
+                            or not BINARY.search(result))
+            # With long strings searching characters one by one is a lot
+            # faster than using a regexp because it is done using memchr.
+            return any(char in result for char in CONTROL_CHARS)
+        if isinstance(result, bytes):
+            # Deleting binary characters is a single pass done in C.
+            return len(result.translate(None, BINARY_BYTES)) != len(result)
+        return BINARY.search(result) is not None
 
     def _str(self, item, handle_binary=True):
         if item is None:
@@ -554,58 +3087,587 @@ class KeywordResult(object):
     def set_status(self, status):
         self.data['status'] = status
 
-    def set_output(self, output):
+    def set_output(self, output, removed=0, files=()):
         if output:
             self.data['output'] = self._handle_binary_result(output)
+        if removed:
+            self.data['output_removed'] = removed
+        if files:
+            self.data['output_files'] = list(files)
+
+
+class ContainerConverter(object):
+    """Helper for converting a list or a dictionary in a return value.
+
+    Converted items are collected into a new list or dictionary. Lists,
+    tuples and dictionaries are not copied at all, however, if none of their
+    items or keys need to be changed, which avoids copying large return
+    values needlessly.
+
+    The id of the source is kept in the given ``path`` set until all items
+    have been converted, which allows detecting references to containers
+    whose conversion is still in progress.
+    """
+    _unchanged_types = (bool, int, long, float)
+    # Short printable strings are common and do not need to be changed.
+    # On Python 2 there is no such fast path because `str` is bytes.
+    _text_type = str if PY3 else None
+
+    def __init__(self, source, items, depth=1, convert_key=None, path=None):
+        self.source = source
+        self.depth = depth
+        self._items = items
+        self._path = path if path is not None else set()
+        self._path.add(id(source))
+        self._convert_key = convert_key
+        self._key = None
+        self._pending = None
+        self._count = 0
+        self._result = None if type(source) in (list, tuple, dict) else \
+                ({} if convert_key else [])
+
+    def convert(self, convert, nested=False):
+        """Convert items until a nested container is found.
+
+        Returns the nested container that must be converted before this
+        one can be continued, or ``None`` if all items have been converted.
+        Items are converted using the given ``convert`` function that gets
+        an item and its depth as arguments and must return a tuple
+        ``(value, nested_container)``.
+
+        Nested containers not containing other containers, for example,
+        rows of a table, are converted directly to avoid the overhead of
+        handling them separately.
+        """
+        if self._pending:
+            pending, self._pending = self._pending, None
+            return pending
+        unchanged_types = self._unchanged_types
+        text_type = self._text_type
+        convert_key = self._convert_key
+        depth = self.depth + 1
+        for item in self._items:
+            if convert_key:
+                self._key, item = key, item = item
+                if not (type(key) is text_type and len(key) < 1000
+                        and key.isprintable()):
+                    key = convert_key(key)
+            if type(item) in unchanged_types:
+                value = item
+            elif item is None:
+                value = ''
+            elif (type(item) is text_type and len(item) < 1000
+                    and item.isprintable()):
+                value = item
+            else:
+                value, container = convert(item, depth)
+                if container:
+                    if nested:
+                        # Let the caller return this container to be handled
+                        # separately. The nested one is returned next.
+                        self._pending = container
+                        return self
+                    if container.convert(convert, nested=True):
+                        return container
+                    value = container.result
+            if self._result is None:
+                if value is item and (not convert_key or key is self._key):
+                    self._count += 1
+                    continue
+                self._result = self._copy_unchanged()
+            if convert_key:
+                self._result[key] = value
+            else:
+                self._result.append(value)
+        self._path.discard(id(self.source))
+        return None
+
+    def add(self, item, value):
+        """Add the result of a nested container converted separately."""
+        key = self._convert_key(self._key) if self._convert_key else None
+        if self._result is None:
+            if value is item and key is self._key:
+                self._count += 1
+                return
+            self._result = self._copy_unchanged()
+        if self._convert_key:
+            self._result[key] = value
+        else:
+            self._result.append(value)
+
+    def _copy_unchanged(self):
+        if self._convert_key:
+            items = self.source.iteritems() if PY2 else self.source.items()
+            return dict(islice(items, self._count))
+        return list(self.source[:self._count])
+
+    @property
+    def result(self):
+        return self._result if self._result is not None else self.source
+
+
+class UnixSocketConnection(HTTPConnection):
+
+    def __init__(self, path, timeout=None):
+        HTTPConnection.__init__(self, 'localhost')
+        self.socket_path = path
+        self.socket_timeout = timeout
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        if self.socket_timeout is not None:
+            self.sock.settimeout(self.socket_timeout)
+        self.sock.connect(self.socket_path)
+
+
+def post(connection, uri, path, body, headers):
+    """Send a POST request using the given connection and return the body
+    of the response.
+
+    Raises ``ProtocolError`` if the response status is not 200 and decodes
+    gzip compressed responses.
+    """
+    return read_response(uri, send_request(connection, path, body, headers))
+
+
+def send_request(connection, path, body, headers):
+    """Send a POST request and return the response without reading its body.
+
+    If sending fails so that :func:`is_connection_closed` returns ``True``,
+    the server has not read the request and it can be safely sent again.
+    """
+    connection.request('POST', path, body, headers)
+    return connection.getresponse()
+
+
+def is_connection_closed(error):
+    """Return ``True`` if ``error`` means the server closed the connection.
+
+    Timeouts are not considered closed connections, because the server may
+    still be processing the request.
+    """
+    if isinstance(error, RemoteDisconnected):
+        return True
+    return getattr(error, 'errno', None) in (errno.EPIPE, errno.ECONNRESET)
+
+
+def read_response(uri, response):
+    """Read the body of a response got from :func:`send_request`.
 
+    Raises ``ProtocolError`` if the response status is not 200 and decodes
+    gzip compressed responses.
+    """
+    data = response.read()
+    if response.status != 200:
+        raise ProtocolError(uri, response.status, response.reason,
+                            response.msg)
+    if response.getheader('Content-Encoding') == 'gzip':
+        data = gzip_decode(data)
+    return data
+
+
+class JsonRpcProxy(object):
+    """Client calling remote server methods using JSON-RPC instead of XML-RPC.
+
+    Used like the standard XML-RPC ``ServerProxy``, for example,
+    ``JsonRpcProxy(uri).run_keyword(name, args)``. Errors are raised as
+    ``Fault`` and binary data is returned as ``Binary``, also similarly as
+    with XML-RPC. The connection to the server is reused between calls when
+    possible. A call is sent again using a new connection only if the server
+    has closed the idle connection before reading the request.
+
+    :param uri:      Server address. Use ``unix:///path/to/socket`` format
+                     with servers using Unix domain sockets.
+    :param timeout:  Socket timeout in seconds. ``None`` means no timeout.
+    """
+
+    def __init__(self, uri, timeout=None):
+        self.uri = uri
+        if uri.startswith('unix://'):
+            self._connection = UnixSocketConnection(uri[len('unix://'):],
+                                                    timeout)
+            self._path = '/'
+        else:
+            parts = urlsplit(uri)
+            if parts.scheme != 'http':
+                raise ValueError("Unsupported URI scheme '%s'." % parts.scheme)
+            self._connection = HTTPConnection(parts.netloc, timeout=timeout)
+            self._path = parts.path or '/'
+        self._id = 0
+        self._reused = False
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return RemoteMethod(self, name)
+
+    def call(self, method, *params):
+        """Call the given method with the given parameters."""
+        self._id += 1
+        body = json_dumps({'jsonrpc': '2.0', 'id': self._id,
+                           'method': method, 'params': list(params)})
+        headers = {'Content-Type': 'application/json'}
+        if gzip_decode:
+            headers['Accept-Encoding'] = 'gzip'
+        # See `RemoteClient.call` for details about retrying.
+        reused = self._reused
+        try:
+            try:
+                response = send_request(self._connection, self._path, body,
+                                        headers)
+            except (socket.error, HTTPException):
+                if not (reused and is_connection_closed(sys.exc_info()[1])):
+                    raise
+                # Server has closed an idle persistent connection.
+                self._connection.close()
+                response = send_request(self._connection, self._path, body,
+                                        headers)
+            data = read_response(self.uri, response)
+        except Exception:
+            self.close()
+            raise
+        self._reused = self._connection.sock is not None
+        response = json_loads(data)
+        if 'error' in response:
+            raise Fault(response['error']['code'],
+                        response['error']['message'])
+        return response['result']
+
+    def close(self):
+        """Close the connection to the server."""
+        self._connection.close()
+        self._reused = False
+
+
+class RemoteMethod(object):
+
+    def __init__(self, proxy, name):
+        self._proxy = proxy
+        self._name = name
+
+    def __getattr__(self, name):
+        # Supports methods like ``system.multicall``.
+        return RemoteMethod(self._proxy, '%s.%s' % (self._name, name))
+
+    def __call__(self, *params):
+        return self._proxy.call(self._name, *params)
+
+
+class RemoteClient(object):
+    """XML-RPC client with a connection pool, timeouts and retries.
+
+    Remote methods can be called like with the standard ``ServerProxy``,
+    for example, ``RemoteClient(uri).get_keyword_names()``. The client is
+    thread-safe and keeps up to ``pool_size`` idle connections open for
+    reuse. Reusing connections requires the server to support persistent
+    connections.
+
+    Failing to connect is retried ``retries`` times waiting ``backoff``
+    seconds before the first retry and doubling the wait after that. Calls
+    that fail after the request has been sent are not retried, because the
+    server may have already executed them, except when a reused idle
+    connection turns out to have been closed by the server before it read
+    the request. Timeouts are never retried.
+
+    :param uri:              Server address. Use ``unix:///path/to/socket``
+                             format with servers using Unix domain sockets.
+    :param timeout:          Socket timeout in seconds when waiting for
+                             responses. ``None`` means no timeout.
+    :param connect_timeout:  Timeout in seconds when connecting. Defaults to
+                             ``timeout``.
+    :param retries:          How many times to retry failed connections.
+    :param backoff:          Initial wait in seconds between retries.
+    :param pool_size:        Maximum number of idle connections to keep.
+    """
 
-def test_remote_server(uri, log=True):
+    def __init__(self, uri, timeout=None, connect_timeout=None, retries=0,
+                 backoff=0.1, pool_size=4):
+        self.uri = uri
+        self.timeout = timeout
+        self.connect_timeout = (connect_timeout if connect_timeout is not None
+                                else timeout)
+        self.retries = retries
+        self.backoff = backoff
+        self.pool_size = pool_size
+        if uri.startswith('unix://'):
+            self._address = uri[len('unix://'):]
+            self._path = '/'
+            self._connection_class = UnixSocketConnection
+        else:
+            parts = urlsplit(uri)
+            classes = {'http': HTTPConnection, 'https': HTTPSConnection}
+            if parts.scheme not in classes:
+                raise ValueError("Unsupported URI scheme '%s'." % parts.scheme)
+            self._address = parts.netloc
+            self._path = parts.path or '/'
+            self._connection_class = classes[parts.scheme]
+        self._pool = []
+        self._lock = threading.Lock()
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return RemoteMethod(self, name)
+
+    def call(self, method, *params):
+        """Call the given method with the given parameters."""
+        body = dumps(params, method)
+        if not isinstance(body, bytes):
+            body = body.encode('UTF-8')
+        headers = {'Content-Type': 'text/xml'}
+        if gzip_decode:
+            headers['Accept-Encoding'] = 'gzip'
+        connection, reused = self._acquire()
+        try:
+            try:
+                response = send_request(connection, self._path, body,
+                                        headers)
+            except (socket.error, HTTPException):
+                if not (reused and is_connection_closed(sys.exc_info()[1])):
+                    raise
+                # Server has closed an idle persistent connection.
+                connection.close()
+                connection, reused = self._acquire(reuse=False)
+                response = send_request(connection, self._path, body,
+                                        headers)
+            data = read_response(self.uri, response)
+        except Exception:
+            connection.close()
+            raise
+        self._release(connection)
+        return loads(data)[0][0]
+
+    def run_keyword(self, name, args=(), kwargs=None):
+        """Run keyword ``name`` and return the result as a dictionary."""
+        if kwargs:
+            return self.call('run_keyword', name, list(args), kwargs)
+        return self.call('run_keyword', name, list(args))
+
+    def multicall(self, calls):
+        """Execute many calls in one request using ``system.multicall``.
+
+        :param calls:  List of ``(method, params)`` tuples.
+        :return        List of results in the same order as ``calls``.
+                       Failed calls are represented as ``Fault`` instances.
+        """
+        results = self.call('system.multicall',
+                            [{'methodName': method, 'params': list(params)}
+                             for method, params in calls])
+        return [Fault(result['faultCode'], result['faultString'])
+                if isinstance(result, dict) else result[0]
+                for result in results]
+
+    def close(self):
+        """Close all idle connections."""
+        with self._lock:
+            pool, self._pool = self._pool, []
+        for connection in pool:
+            connection.close()
+
+    def _acquire(self, reuse=True):
+        with self._lock:
+            if reuse and self._pool:
+                return self._pool.pop(), True
+        for attempt in range(self.retries + 1):
+            connection = self._connection_class(self._address,
+                                                timeout=self.connect_timeout)
+            try:
+                connection.connect()
+            except (socket.error, HTTPException):
+                connection.close()
+                if attempt == self.retries:
+                    raise
+                time.sleep(self.backoff * 2 ** attempt)
+            else:
+                connection.sock.settimeout(self.timeout)
+                return connection, False
+
+    def _release(self, connection):
+        if connection.sock is not None:
+            with self._lock:
+                if len(self._pool) < self.pool_size:
+                    self._pool.append(connection)
+                    return
+        connection.close()
+
+
+def test_remote_server(uri, log=True, timeout=None):
     """Test is remote server running.
 
-    :param uri:  Server address.
-    :param log:  Log status message or not.
-    :return      ``True`` if server is running, ``False`` otherwise.
+    :param uri:      Server address. Use ``unix:///path/to/socket`` format
+                     with servers using Unix domain sockets.
+    :param log:      Log status message or not.
+    :param timeout:  Socket timeout in seconds. ``None`` means no timeout.
+    :return          ``True`` if server is running, ``False`` otherwise.
     """
     logger = print if log else lambda message: None
     try:
-        ServerProxy(uri).get_keyword_names()
-    except Exception:
+        client = RemoteClient(uri, timeout)
+    except ValueError:      # Unsupported scheme.
+        running = False
+    else:
+        try:
+            running = _is_running(client)
+        finally:
+            client.close()
+    if not running:
         logger('No remote server running at %s.' % uri)
         return False
     logger('Remote server running at %s.' % uri)
     return True
 
 
-def stop_remote_server(uri, log=True):
+def _is_running(client):
+    try:
+        try:
+            client.ping()
+        except Fault:   # Older servers do not have `ping`.
+            client.get_keyword_names()
+    except Exception:
+        return False
+    return True
+
+
+def stop_remote_server(uri, log=True, timeout=None):
     """Stop remote server unless server has disabled stopping.
 
-    :param uri:  Server address.
-    :param log:  Log status message or not.
-    :return      ``True`` if server was stopped or it was not running in
-                 the first place, ``False`` otherwise.
+    :param uri:      Server address.
+    :param log:      Log status message or not.
+    :param timeout:  Socket timeout in seconds. ``None`` means no timeout.
+    :return          ``True`` if server was stopped or it was not running in
+                     the first place, ``False`` otherwise.
     """
     logger = print if log else lambda message: None
-    if not test_remote_server(uri, log=False):
-        logger('No remote server running at %s.' % uri)
+    try:
+        client = RemoteClient(uri, timeout)
+    except ValueError:      # Unsupported scheme.
+        client = None
+    try:
+        if client is None or not _is_running(client):
+            logger('No remote server running at %s.' % uri)
+            return True
+        logger('Stopping remote server at %s.' % uri)
+        if not client.stop_remote_server():
+            logger('Stopping not allowed!')
+            return False
         return True
-    logger('Stopping remote server at %s.' % uri)
-    if not ServerProxy(uri).stop_remote_server():
-        logger('Stopping not allowed!')
-        return False
-    return True
+    finally:
+        if client is not None:
+            client.close()
+
+
+def run_for_servers(action, uris, timeout=None, workers=32):
+    """Run ``test_remote_server`` or ``stop_remote_server`` concurrently.
+
+    :param action:   Function to run. Called with an URI and ``log=False``
+                     and ``timeout`` as keyword arguments.
+    :param uris:     Server addresses.
+    :param timeout:  Socket timeout in seconds used with each server.
+    :param workers:  Maximum number of servers to handle concurrently.
+    :return          List of ``(uri, result, elapsed)`` tuples in the same
+                     order as ``uris``. ``result`` is the return value of
+                     ``action`` or an exception it raised.
+    """
+    results = [None] * len(uris)
+    indices = iter(range(len(uris)))
+    lock = threading.Lock()
+
+    def run():
+        while True:
+            with lock:
+                index = next(indices, None)
+            if index is None:
+                return
+            start = time.time()
+            try:
+                result = action(uris[index], log=False, timeout=timeout)
+            except Exception:
+                result = sys.exc_info()[1]
+            results[index] = (uris[index], result, time.time() - start)
 
+    threads = [threading.Thread(target=run)
+               for _ in range(min(workers, len(uris)))]
+    for thread in threads:
+        thread.daemon = True
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
 
-if __name__ == '__main__':
 
-    def parse_args(script, *args):
-        actions = {'stop': stop_remote_server, 'test': test_remote_server}
-        if not (0 < len(args) < 3) or args[0] not in actions:
-            sys.exit('Usage:  %s {test|stop} [uri]' % os.path.basename(script))
-        uri = args[1] if len(args) == 2 else 'http://127.0.0.1:8270'
-        if '://' not in uri:
-            uri = 'http://' + uri
-        return actions[args[0]], uri
-
-    action, uri = parse_args(*sys.argv)
-    success = action(uri)
+def print_summary(action, results):
+    """Print results got from :func:`run_for_servers` as a table.
+
+    Returns ``True`` if ``action`` succeeded with all servers.
+    """
+    statuses = {(test_remote_server, True): 'RUNNING',
+                (test_remote_server, False): 'NOT RUNNING',
+                (stop_remote_server, True): 'STOPPED',
+                (stop_remote_server, False): 'NOT ALLOWED'}
+    width = max([len('URI')] + [len(uri) for uri, _, _ in results])
+    print('%-*s  %-11s  %s' % (width, 'URI', 'Status', 'Time'))
+    failures = 0
+    for uri, result, elapsed in results:
+        if isinstance(result, Exception):
+            status = 'ERROR: %s' % (result or type(result).__name__)
+            result = False
+        else:
+            status = statuses[action, bool(result)]
+        failures += not result
+        print('%-*s  %-11s  %.2fs' % (width, uri, status, elapsed))
+    print('%d server%s, %d succeeded, %d failed.'
+          % (len(results), '' if len(results) == 1 else 's',
+             len(results) - failures, failures))
+    return failures == 0
+
+
+def parse_args(script, *args):
+    """Parse command line arguments used when this module is executed.
+
+    Returns ``(action, uris, timeout)``. URIs given using ``--file`` and as
+    positional arguments are used in the given order. Exits with a usage
+    message if arguments are invalid.
+    """
+    actions = {'stop': stop_remote_server, 'test': test_remote_server}
+    usage = ('Usage:  %s {test|stop} [--timeout seconds] [--file path] '
+             '[uri ...]' % os.path.basename(script))
+    if not args or args[0] not in actions:
+        sys.exit(usage)
+    action, args = actions[args[0]], list(args[1:])
+    uris, timeout = [], None
+    while args:
+        arg = args.pop(0)
+        if arg in ('--timeout', '--file') and not args:
+            sys.exit(usage)
+        if arg == '--timeout':
+            try:
+                timeout = float(args.pop(0))
+            except ValueError:
+                sys.exit(usage)
+        elif arg == '--file':
+            uris.extend(read_uris(args.pop(0)))
+        else:
+            uris.append(arg)
+    uris = [uri if '://' in uri else 'http://' + uri
+            for uri in uris or ['http://127.0.0.1:8270']]
+    return action, uris, timeout
+
+
+def read_uris(path):
+    """Read URIs from a file having one URI per line.
+
+    Empty lines and lines starting with ``#`` are ignored.
+    """
+    with open(path) as uri_file:
+        lines = [line.strip() for line in uri_file]
+    return [line for line in lines if line and not line.startswith('#')]
+
+
+if __name__ == '__main__':
+    action, uris, timeout = parse_args(*sys.argv)
+    if len(uris) == 1:
+        success = action(uris[0], timeout=timeout)
+    else:
+        success = print_summary(action, run_for_servers(action, uris,
+                                                        timeout))
     sys.exit(0 if success else 1)
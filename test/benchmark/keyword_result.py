@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+
+"""Micro-benchmark measuring converting keyword return values.
+
+Usage: keyword_result.py [rounds]
+
+Measures how long converting different kind of return values into data that
+can be sent over XML-RPC takes and, on Python 3, how much memory it needs at
+most. `rounds` specifies how many times each value is converted and defaults
+to 10.
+"""
+
+from __future__ import print_function
+
+from os.path import abspath, dirname, join
+import sys
+import timeit
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+curdir = dirname(abspath(__file__))
+sys.path.insert(0, join(curdir, '..', '..', 'src'))
+
+from robotremoteserver import KeywordResult
+
+
+LINE = 'Lorem ipsum dolor sit amet, consectetur adipiscing elit.\n'
+MB = 1024 * 1024
+
+VALUES = [
+    ('10MB single line', 'x' * 10 * MB),
+    ('10MB multiline', LINE * (10 * MB // len(LINE))),
+    ('10MB non-ASCII', u'\xe4' * 10 * MB),
+    ('10MB binary', b'\x00\x01' * 5 * MB),
+    ('100k strings', ['item %d' % i for i in range(100000)]),
+    ('100k integers', list(range(100000))),
+    ('100k dicts', [{'key': 'value', 'index': i} for i in range(100000)]),
+    ('1M tuple rows', [(i, 'name', 2.5) for i in range(1000000)]),
+    ('100k nested lists', [[[i, None]] for i in range(100000)]),
+]
+
+
+def benchmark(rounds):
+    for name, value in VALUES:
+        timer = timeit.Timer(lambda: KeywordResult().set_return(value))
+        elapsed = min(timer.repeat(repeat=3, number=rounds))
+        yield name, elapsed / rounds * 1000, peak_memory(value)
+
+
+def peak_memory(value):
+    if not tracemalloc:
+        return None
+    tracemalloc.start()
+    try:
+        KeywordResult().set_return(value)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+if __name__ == '__main__':
+    if '-h' in sys.argv or '--help' in sys.argv:
+        sys.exit(__doc__)
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    for name, msec, peak in benchmark(rounds):
+        memory = ', %.1f MB' % (peak / 1e6) if peak is not None else ''
+        print('%-20s %.2f msec%s' % (name, msec, memory))
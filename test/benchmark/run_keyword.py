@@ -0,0 +1,52 @@
+#!/usr/bin/env python
+
+"""Micro-benchmark measuring the overhead of running keywords.
+
+Usage: run_keyword.py [calls]
+
+Keywords are run using `RobotRemoteServer.run_keyword` directly without
+any network communication, which means that results show only the overhead
+caused by the server itself. Output capturing proxies are installed similarly
+as when the server is running. `calls` specifies how many times each keyword
+is run and defaults to 100000.
+"""
+
+from __future__ import print_function
+
+from os.path import abspath, dirname, join
+import sys
+import timeit
+
+curdir = dirname(abspath(__file__))
+sys.path.insert(0, join(curdir, '..', '..', 'src'))
+
+from robotremoteserver import RobotRemoteServer, StandardStreamCapture
+
+
+class Library(object):
+
+    def no_operation(self):
+        pass
+
+    def return_value(self):
+        return 'value'
+
+    def log_message(self):
+        print('message')
+
+
+def benchmark(calls):
+    server = RobotRemoteServer(Library(), serve=False)
+    with StandardStreamCapture():
+        for name in 'no_operation', 'return_value', 'log_message':
+            timer = timeit.Timer(lambda: server.run_keyword(name, []))
+            elapsed = min(timer.repeat(repeat=3, number=calls))
+            yield name, elapsed / calls * 1e6
+
+
+if __name__ == '__main__':
+    if '-h' in sys.argv or '--help' in sys.argv:
+        sys.exit(__doc__)
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    for name, usec in benchmark(calls):
+        print('%-15s %.2f usec per call' % (name, usec))
@@ -0,0 +1,52 @@
+import asyncio
+import sys
+
+
+class AsyncLibrary(object):
+
+    def __init__(self):
+        self.running = 0
+        self.max_running = 0
+        self.cancelled = False
+
+    async def sleeping(self, name, seconds=0.2):
+        self.running += 1
+        self.max_running = max(self.running, self.max_running)
+        print('Start %s' % name)
+        await asyncio.sleep(float(seconds))
+        sys.stderr.write('End %s' % name)
+        self.running -= 1
+        return name
+
+    async def printing(self, message):
+        await asyncio.sleep(0)
+        print(message)
+
+    async def failing(self, message):
+        await asyncio.sleep(0)
+        raise AssertionError(message)
+
+    def blocking(self, seconds=0.2):
+        import time
+        time.sleep(float(seconds))
+        print('Blocked')
+        return 'done'
+
+    def get_max_running(self):
+        return self.max_running
+
+    async def timing_out(self, seconds=10):
+        try:
+            await asyncio.sleep(float(seconds))
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        return 'done'
+    timing_out.robot_timeout = 0.1
+
+
+if __name__ == '__main__':
+    from robotremoteserver import RobotRemoteServer
+
+    RobotRemoteServer(AsyncLibrary(), '127.0.0.1', *sys.argv[1:],
+                      use_asyncio=True)
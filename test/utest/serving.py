@@ -0,0 +1,43 @@
+"""Helpers for tests running servers in a background thread."""
+
+from contextlib import contextmanager
+import threading
+import unittest
+
+try:
+    import contextvars
+except ImportError:
+    contextvars = None
+
+
+@contextmanager
+def serving(server, stop=True):
+    """Serve using ``server`` in a thread until the block exits.
+
+    Yields the URI of the server. The server is stopped when the block exits
+    unless ``stop`` is false, in which case the block must stop it.
+    """
+    address = server.activate()
+    if server.server_port is None:
+        uri = 'unix://%s' % address
+    else:
+        uri = 'http://127.0.0.1:%s' % address
+    thread = threading.Thread(target=server.serve, kwargs={'log': False})
+    thread.start()
+    try:
+        yield uri
+    finally:
+        if stop:
+            server.stop()
+        thread.join()
+
+
+def with_asyncio(test_case):
+    """Return a copy of ``test_case`` with ``use_asyncio`` set to ``True``.
+
+    The test case must create its servers with ``use_asyncio`` set
+    according to that attribute.
+    """
+    variant = type(test_case.__name__ + 'WithAsyncio', (test_case,),
+                   {'use_asyncio': True, '__module__': test_case.__module__})
+    return unittest.skipUnless(contextvars, 'Requires Python 3.7.')(variant)
@@ -81,5 +81,58 @@ class TestArgs(unittest.TestCase):
         self.assertEquals(library.get_keyword_arguments(name), expected)
 
 
+class TestLibraryInformation(unittest.TestCase):
+
+    def test_library_information(self):
+        library = RemoteLibraryFactory(LibraryWithArgsAndDocs(None))
+        self.assertEquals(library.get_library_information(),
+                          {'__intro__': {'doc': 'Intro doc'},
+                           '__init__': {'doc': 'Init doc'},
+                           'keyword': {'args': ['k1', 'k2=2', '*k3'],
+                                       'doc': 'Keyword doc', 'tags': []},
+                           'no_doc_or_args': {'args': [], 'doc': '',
+                                              'tags': []}})
+
+    def test_library_information_from_module(self):
+        import test_argsdocs
+        info = RemoteLibraryFactory(test_argsdocs).get_library_information()
+        self.assertEquals(info['keyword_in_module'],
+                          {'args': ['m1', 'm2=3', '*m3'],
+                           'doc': 'Module keyword doc', 'tags': []})
+        self.assertEquals(info['__intro__'],
+                          {'doc': 'Module doc - used in tests'})
+
+
+class TestKeywordIndex(unittest.TestCase):
+
+    def test_index_is_built_at_initialization(self):
+        library = RemoteLibraryFactory(LibraryWithArgsAndDocs(None))
+        self.assertEquals(sorted(library._keywords),
+                          ['keyword', 'no_doc_or_args'])
+        info = library._keywords['keyword']
+        self.assertEquals(info.arguments, ('k1', 'k2=2', '*k3'))
+        self.assertEquals(info.documentation, 'Keyword doc')
+        self.assertEquals((info.varargs, info.kwargs), (True, False))
+
+    def test_lazy_index(self):
+        library = RemoteLibraryFactory(LibraryWithArgsAndDocs(None), lazy=True)
+        self.assertEquals(library._keywords, {})
+        self.assertEquals(library.get_keyword_documentation('keyword'),
+                          'Keyword doc')
+        self.assertEquals(list(library._keywords), ['keyword'])
+
+    def test_returned_lists_do_not_modify_index(self):
+        library = RemoteLibraryFactory(LibraryWithArgsAndDocs(None))
+        library.get_keyword_arguments('keyword').append('new')
+        self.assertEquals(library.get_keyword_arguments('keyword'),
+                          ['k1', 'k2=2', '*k3'])
+
+    def test_non_existing_keyword(self):
+        library = RemoteLibraryFactory(LibraryWithArgsAndDocs(None))
+        self.assertRaises(AttributeError, library.get_keyword_arguments,
+                          'nonex')
+        self.assertNotIn('nonex', library._keywords)
+
+
 if __name__ == '__main__':
     unittest.main()
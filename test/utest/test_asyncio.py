@@ -0,0 +1,104 @@
+import sys
+import threading
+import unittest
+
+from robotremoteserver import (Fault, RemoteClient, RemoteLibraryFactory,
+                               RobotRemoteServer)
+
+from serving import serving
+
+if sys.version_info < (3,):
+    from xmlrpclib import ServerProxy
+else:
+    from xmlrpc.client import ServerProxy
+
+try:
+    import contextvars
+except ImportError:
+    contextvars = None
+
+try:
+    from AsyncLibrary import AsyncLibrary
+except SyntaxError:
+    AsyncLibrary = None
+
+
+@unittest.skipUnless(AsyncLibrary and contextvars, 'Requires Python 3.7.')
+class TestAsyncioServer(unittest.TestCase):
+
+    def setUp(self):
+        self.library = AsyncLibrary()
+        self.server = RobotRemoteServer(self.library, port=0, serve=False,
+                                        use_asyncio=True, threads=2)
+
+    def test_coroutine_keywords_run_concurrently(self):
+        with serving(self.server) as uri:
+            results = self._run_concurrently(uri, [('sleeping', [str(i)])
+                                                   for i in range(10)])
+        self.assertEqual(self.library.max_running, 10)
+        for index, result in enumerate(results):
+            self.assertEqual(result, {'status': 'PASS', 'return': str(index),
+                                      'output': 'Start %d\n*INFO* End %d'
+                                                % (index, index)})
+
+    def test_sync_keywords_run_in_executor(self):
+        with serving(self.server) as uri:
+            results = self._run_concurrently(uri, [('blocking', []),
+                                                   ('sleeping', ['x'])])
+        self.assertEqual(results[0], {'status': 'PASS', 'return': 'done',
+                                      'output': 'Blocked\n'})
+        self.assertEqual(results[1]['return'], 'x')
+
+    def test_failing_coroutine_keyword(self):
+        with serving(self.server) as uri:
+            result = ServerProxy(uri).run_keyword('failing', ['Oh no!'])
+        self.assertEqual(result['status'], 'FAIL')
+        self.assertEqual(result['error'], 'Oh no!')
+        self.assertIn('raise AssertionError(message)', result['traceback'])
+
+    def test_output_that_cannot_be_returned(self):
+        with serving(self.server) as uri:
+            proxy = RemoteClient(uri, timeout=10)
+            self.assertRaises(Fault, proxy.run_keyword, 'printing',
+                              ['\x01\xe4'])
+            proxy.close()
+
+    def test_other_methods(self):
+        with serving(self.server) as uri:
+            proxy = ServerProxy(uri)
+            self.assertIn('sleeping', proxy.get_keyword_names())
+            self.assertEqual(proxy.get_keyword_arguments('sleeping'),
+                             ['name', 'seconds=0.2'])
+            self.assertRaises(Exception, proxy.non_existing)
+
+    def test_stop_remote_server(self):
+        with serving(self.server) as uri:
+            self.assertEqual(ServerProxy(uri).run_keyword('stop_remote_server',
+                                                          []),
+                             {'status': 'PASS', 'return': True})
+
+    def _run_concurrently(self, uri, calls):
+        results = [None] * len(calls)
+        def run(index, name, args):
+            results[index] = ServerProxy(uri).run_keyword(name, args)
+        threads = [threading.Thread(target=run, args=(index,) + call)
+                   for index, call in enumerate(calls)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+
+@unittest.skipUnless(AsyncLibrary, 'Requires Python 3.5.')
+class TestCoroutineKeywordsWithoutAsyncio(unittest.TestCase):
+
+    def test_coroutine_is_run_to_completion(self):
+        library = RemoteLibraryFactory(AsyncLibrary())
+        self.assertEqual(library.run_keyword('sleeping', ['x', '0']),
+                         {'status': 'PASS', 'return': 'x',
+                          'output': 'Start x\n*INFO* End x'})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,141 @@
+from contextlib import contextmanager
+import socket
+import threading
+import time
+import unittest
+
+from robotremoteserver import Fault, RemoteClient, RobotRemoteServer
+
+from serving import serving
+
+
+class Library(object):
+
+    def __init__(self):
+        self.sleeps = 0
+
+    def sleep(self, seconds):
+        self.sleeps += 1
+        time.sleep(seconds)
+
+    def greet(self, name='world'):
+        print('Hello, %s!' % name)
+        return name
+
+    def fail(self):
+        raise AssertionError('Expected failure')
+
+
+class TestRemoteClient(unittest.TestCase):
+
+    def test_run_keyword(self):
+        with self._serving() as client:
+            result = client.run_keyword('greet', ['you'])
+        self.assertEqual(result, {'status': 'PASS', 'return': 'you',
+                                  'output': 'Hello, you!\n'})
+
+    def test_run_keyword_with_kwargs(self):
+        with self._serving() as client:
+            result = client.run_keyword('greet', kwargs={'name': 'kw'})
+        self.assertEqual(result['return'], 'kw')
+
+    def test_call_methods_as_attributes(self):
+        with self._serving() as client:
+            names = client.get_keyword_names()
+            self.assertEqual(client.ping()['ready'], True)
+        self.assertEqual(sorted(names), ['fail', 'greet', 'sleep',
+                                        'stop_remote_server'])
+
+    def test_fault(self):
+        with self._serving() as client:
+            self.assertRaises(Fault, client.non_existing)
+
+    def test_multicall(self):
+        with self._serving() as client:
+            results = client.multicall([('run_keyword', ['greet', ['a']]),
+                                        ('non_existing', []),
+                                        ('run_keyword', ['fail', []])])
+        self.assertEqual(results[0]['return'], 'a')
+        self.assertTrue(isinstance(results[1], Fault))
+        self.assertEqual(results[2]['status'], 'FAIL')
+
+    def test_connections_are_reused(self):
+        with self._serving(keep_alive_timeout=60) as client:
+            client.ping()
+            connection = client._pool[0]
+            client.ping()
+            self.assertEqual(client._pool, [connection])
+
+    def test_connections_are_not_pooled_if_server_closes_them(self):
+        with self._serving() as client:
+            client.ping()
+            self.assertEqual(client._pool, [])
+
+    def test_idle_connection_closed_by_server(self):
+        with self._serving(keep_alive_timeout=0.1) as client:
+            client.ping()
+            time.sleep(0.5)
+            self.assertEqual(client.ping()['ready'], True)
+
+    def test_timed_out_calls_are_not_retried(self):
+        library = Library()
+        with self._serving(library, keep_alive_timeout=60) as client:
+            client.timeout = 0.2
+            client.ping()
+            self.assertRaises(socket.timeout, client.run_keyword, 'sleep',
+                              [0.5])
+            time.sleep(1)
+        self.assertEqual(library.sleeps, 1)
+
+    def test_pool_size(self):
+        with self._serving(keep_alive_timeout=60, threads=4) as client:
+            client.pool_size = 2
+            threads = [threading.Thread(target=lambda: client.ping())
+                       for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            self.assertLessEqual(len(client._pool), 2)
+
+    def test_retries_with_backoff(self):
+        client = RemoteClient(self._unused_uri(), retries=2, backoff=0.1)
+        start = time.time()
+        self.assertRaises(socket.error, client.ping)
+        self.assertGreaterEqual(time.time() - start, 0.3)
+
+    def test_timeout(self):
+        hung = socket.socket()
+        hung.bind(('127.0.0.1', 0))
+        hung.listen(1)
+        client = RemoteClient('http://127.0.0.1:%s' % hung.getsockname()[1],
+                              timeout=0.1)
+        try:
+            self.assertRaises(socket.timeout, client.ping)
+        finally:
+            hung.close()
+
+    def test_unsupported_scheme(self):
+        self.assertRaises(ValueError, RemoteClient, 'ftp://127.0.0.1')
+
+    @contextmanager
+    def _serving(self, library=None, **config):
+        server = RobotRemoteServer(library or Library(), port=0, serve=False,
+                                   **config)
+        with serving(server) as uri:
+            client = RemoteClient(uri, timeout=10)
+            try:
+                yield client
+            finally:
+                client.close()
+
+    def _unused_uri(self):
+        sock = socket.socket()
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+        sock.close()
+        return 'http://127.0.0.1:%s' % port
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,146 @@
+from contextlib import contextmanager
+import gzip
+import sys
+import unittest
+import zlib
+
+from robotremoteserver import RobotRemoteServer, accepts_gzip
+
+from serving import serving, with_asyncio
+
+if sys.version_info < (3,):
+    from httplib import HTTPConnection
+    from StringIO import StringIO as BytesIO
+    from xmlrpclib import dumps, loads
+else:
+    from http.client import HTTPConnection
+    from io import BytesIO
+    from xmlrpc.client import dumps, loads
+
+
+class Library(object):
+
+    def return_string(self, length):
+        return 'x' * int(length)
+
+
+class TestCompression(unittest.TestCase):
+    use_asyncio = False
+
+    def test_large_response_is_compressed(self):
+        with self._serving() as connection:
+            response, body = self._request(connection, 10000)
+            self.assertEqual(response.getheader('Content-Encoding'), 'gzip')
+            self._verify_result(self._gunzip(body), 10000)
+            self.assertLess(len(body), 1000)
+
+    def test_small_response_is_not_compressed(self):
+        with self._serving() as connection:
+            response, body = self._request(connection, 10)
+            self.assertEqual(response.getheader('Content-Encoding'), None)
+            self._verify_result(body, 10)
+
+    def test_custom_threshold(self):
+        with self._serving(compression_threshold=0) as connection:
+            response, body = self._request(connection, 10)
+            self.assertEqual(response.getheader('Content-Encoding'), 'gzip')
+            self._verify_result(self._gunzip(body), 10)
+
+    def test_compression_disabled(self):
+        with self._serving(compression_threshold=None) as connection:
+            response, body = self._request(connection, 10000)
+            self.assertEqual(response.getheader('Content-Encoding'), None)
+            self._verify_result(body, 10000)
+
+    def test_client_not_accepting_gzip(self):
+        with self._serving() as connection:
+            response, body = self._request(connection, 10000,
+                                           accept_encoding='deflate')
+            self.assertEqual(response.getheader('Content-Encoding'), None)
+            self._verify_result(body, 10000)
+
+    def test_gzip_request(self):
+        with self._serving() as connection:
+            response, body = self._request(connection, 10,
+                                           content_encoding='gzip')
+            self._verify_result(body, 10)
+
+    def test_deflate_request(self):
+        with self._serving() as connection:
+            response, body = self._request(connection, 10,
+                                           content_encoding='deflate')
+            self._verify_result(body, 10)
+
+    def test_invalid_request_content(self):
+        with self._serving() as connection:
+            connection.request('POST', '/RPC2', b'invalid',
+                               {'Content-Encoding': 'deflate'})
+            self.assertEqual(connection.getresponse().status, 400)
+
+    def test_unsupported_request_encoding(self):
+        with self._serving() as connection:
+            connection.request('POST', '/RPC2', b'invalid',
+                               {'Content-Encoding': 'br'})
+            self.assertEqual(connection.getresponse().status, 501)
+
+    @contextmanager
+    def _serving(self, **config):
+        server = RobotRemoteServer(Library(), port=0, serve=False,
+                                   use_asyncio=self.use_asyncio, **config)
+        with serving(server):
+            connection = HTTPConnection('127.0.0.1', server.server_port)
+            try:
+                yield connection
+            finally:
+                connection.close()
+
+    def _request(self, connection, length, accept_encoding='gzip',
+                 content_encoding=None):
+        body = dumps(('return_string', [str(length)]),
+                     'run_keyword').encode('UTF-8')
+        headers = {'Content-Type': 'text/xml',
+                   'Accept-Encoding': accept_encoding}
+        if content_encoding == 'gzip':
+            body = self._gzip(body)
+        if content_encoding == 'deflate':
+            body = zlib.compress(body)
+        if content_encoding:
+            headers['Content-Encoding'] = content_encoding
+        connection.request('POST', '/RPC2', body, headers)
+        response = connection.getresponse()
+        self.assertEqual(response.status, 200)
+        return response, response.read()
+
+    def _verify_result(self, body, length):
+        result = loads(body)[0][0]
+        self.assertEqual(result, {'status': 'PASS', 'return': 'x' * length})
+
+    def _gzip(self, data):
+        stream = BytesIO()
+        with gzip.GzipFile(fileobj=stream, mode='wb') as gz:
+            gz.write(data)
+        return stream.getvalue()
+
+    def _gunzip(self, data):
+        with gzip.GzipFile(fileobj=BytesIO(data)) as gz:
+            return gz.read()
+
+
+TestCompressionWithAsyncio = with_asyncio(TestCompression)
+
+
+class TestAcceptsGzip(unittest.TestCase):
+
+    def test_accepts(self):
+        for header in ['gzip', 'GZIP', 'deflate, gzip', 'gzip;q=0.5',
+                       'br, gzip ; q = 1']:
+            self.assertEqual(accepts_gzip(header), True, header)
+
+    def test_does_not_accept(self):
+        for header in ['', 'deflate', 'gzip;q=0', 'gzip;q=0.0', 'x-gzip',
+                       'gzip;q=invalid']:
+            self.assertEqual(accepts_gzip(header), False, header)
+
+
+if __name__ == '__main__':
+    unittest.main()
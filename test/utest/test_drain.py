@@ -0,0 +1,126 @@
+from contextlib import contextmanager
+import socket
+import sys
+import threading
+import time
+import unittest
+
+from robotremoteserver import RobotRemoteServer
+
+from serving import serving, with_asyncio
+
+if sys.version_info < (3,):
+    from xmlrpclib import ServerProxy
+else:
+    from xmlrpc.client import ServerProxy
+
+
+class Library(object):
+
+    def __init__(self):
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def block(self):
+        self.started.set()
+        self.release.wait(10)
+        return 'released'
+
+
+class TestDrain(unittest.TestCase):
+    use_asyncio = False
+
+    def setUp(self):
+        self.library = Library()
+        self.results = []
+
+    def tearDown(self):
+        self.library.release.set()
+
+    def test_calls_in_progress_are_finished(self):
+        with self._serving():
+            call = self._call_block()
+            self.server.stop()
+            self._wait_not_accepting()
+            self.library.release.set()
+        self._join(call)
+        self.assertEqual(self.results, ['released'])
+
+    def test_connections_are_closed_after_timeout(self):
+        with self._serving():
+            call = self._call_block()
+            start = time.time()
+            self.server.stop(timeout=0.2)
+        self._join(call)
+        self.assertLess(time.time() - start, 5)
+        self.assertEqual(len(self.results), 1)
+        self.assertTrue(isinstance(self.results[0], Exception))
+
+    def test_drain_timeout_is_used_by_default(self):
+        with self._serving(drain_timeout=0.2):
+            call = self._call_block()
+            self.server.stop()
+        self._join(call)
+        self.assertTrue(isinstance(self.results[0], Exception))
+
+    def test_second_signal_closes_connections(self):
+        with self._serving():
+            call = self._call_block()
+            self.server._stop_by_signal()
+            self._wait_not_accepting()
+            self.assertTrue(call.is_alive())
+            self.server._stop_by_signal()
+        self._join(call)
+        self.assertTrue(isinstance(self.results[0], Exception))
+
+    def test_stop_without_calls_in_progress(self):
+        with self._serving(drain_timeout=10):
+            start = time.time()
+            self.server.stop()
+        self.assertLess(time.time() - start, 5)
+
+    @contextmanager
+    def _serving(self, **config):
+        # Tests stop the server themselves.
+        self.server = RobotRemoteServer(self.library, port=0, serve=False,
+                                        threads=2,
+                                        use_asyncio=self.use_asyncio,
+                                        **config)
+        with serving(self.server, stop=False) as uri:
+            self.uri = uri
+            self.port = self.server.server_port
+            yield
+
+    def _call_block(self):
+        def call():
+            proxy = ServerProxy(self.uri)
+            try:
+                self.results.append(proxy.run_keyword('block', [])['return'])
+            except Exception as error:
+                self.results.append(error)
+        thread = threading.Thread(target=call)
+        thread.start()
+        self.assertTrue(self.library.started.wait(10))
+        return thread
+
+    def _wait_not_accepting(self):
+        max_time = time.time() + 5
+        while time.time() < max_time:
+            try:
+                socket.create_connection(('127.0.0.1', self.port), 1).close()
+            except socket.error:
+                return
+            time.sleep(0.05)
+        raise AssertionError('Server still accepts connections.')
+
+    def _join(self, *threads):
+        for thread in threads:
+            thread.join(10)
+            self.assertFalse(thread.is_alive())
+
+
+TestDrainWithAsyncio = with_asyncio(TestDrain)
+
+
+if __name__ == '__main__':
+    unittest.main()
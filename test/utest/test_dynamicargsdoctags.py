@@ -74,6 +74,16 @@ class TestOwnArgsDocTags(unittest.TestCase):
         self.assertEqual(self.lib.get_keyword_tags('keyword'),
                          ['keyword', 'tags'])
 
+    def test_library_information(self):
+        info = self.lib.get_library_information()
+        self.assertEqual(info['keyword'],
+                         {'args': ['a1', 'a2=keyword', '*args', '**kwargs'],
+                          'doc': 'The doc for keyword',
+                          'tags': ['keyword', 'tags']})
+        self.assertEqual(info['__intro__'], {'doc': 'The doc for __intro__'})
+        self.assertEqual(info['__init__'], {'doc': 'The doc for __init__'})
+        self.assertIs(self.lib.get_library_information(), info)
+
 
 class TestOwnArgsDocTagsWithCamelCaseNames(TestOwnArgsDocTags):
 
@@ -101,6 +111,13 @@ class TestNoArgsDocTags(unittest.TestCase):
     def test_tags(self):
         self.assertEqual(self.lib.get_keyword_tags('keyword'), [])
 
+    def test_library_information(self):
+        self.assertEqual(self.lib.get_library_information(),
+                         {'keyword': {'args': ['*varargs', '**kwargs'],
+                                      'doc': '', 'tags': []},
+                          '__intro__': {'doc': ''},
+                          '__init__': {'doc': ''}})
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,177 @@
+from contextlib import contextmanager
+import os
+import shutil
+import socket
+import sys
+import tempfile
+import time
+import unittest
+
+from robotremoteserver import (RobotRemoteServer, parse_args, print_summary,
+                               run_for_servers, stop_remote_server,
+                               test_remote_server)
+
+from serving import serving
+
+if sys.version_info < (3,):
+    from StringIO import StringIO
+else:
+    from io import StringIO
+
+
+class Library(object):
+
+    def kw(self):
+        pass
+
+
+class TestRunForServers(unittest.TestCase):
+
+    def test_test_many_servers(self):
+        with self._serving() as first:
+            with self._serving() as second:
+                uris = [first, self._unused_uri(), second]
+                results = run_for_servers(test_remote_server, uris)
+        self.assertEqual([uri for uri, _, _ in results], uris)
+        self.assertEqual([result for _, result, _ in results],
+                         [True, False, True])
+
+    def test_stop_many_servers(self):
+        with self._serving() as allowed:
+            with self._serving(allow_remote_stop=False) as denied:
+                results = run_for_servers(stop_remote_server,
+                                          [allowed, denied])
+                self.assertEqual([result for _, result, _ in results],
+                                 [True, False])
+                self.assertEqual(test_remote_server(allowed, log=False),
+                                 False)
+                self.assertEqual(test_remote_server(denied, log=False), True)
+
+    def test_timeout(self):
+        hung = socket.socket()
+        hung.bind(('127.0.0.1', 0))
+        hung.listen(1)
+        uri = 'http://127.0.0.1:%s' % hung.getsockname()[1]
+        try:
+            start = time.time()
+            results = run_for_servers(test_remote_server, [uri, uri],
+                                      timeout=0.2)
+            elapsed = time.time() - start
+        finally:
+            hung.close()
+        self.assertEqual([result for _, result, _ in results], [False, False])
+        self.assertLess(elapsed, 5)
+
+    def test_exceptions_are_returned(self):
+        def action(uri, log, timeout):
+            raise RuntimeError(uri)
+        uri, result, elapsed = run_for_servers(action, ['x'])[0]
+        self.assertTrue(isinstance(result, RuntimeError))
+        self.assertEqual(str(result), 'x')
+
+    def test_unsupported_scheme(self):
+        self.assertEqual(test_remote_server('ftp://127.0.0.1', log=False),
+                         False)
+        self.assertEqual(stop_remote_server('ftp://127.0.0.1', log=False),
+                         True)
+        results = run_for_servers(test_remote_server, ['ftp://127.0.0.1'])
+        self.assertEqual(results[0][1], False)
+
+    def test_no_servers(self):
+        self.assertEqual(run_for_servers(test_remote_server, []), [])
+
+    @contextmanager
+    def _serving(self, **config):
+        server = RobotRemoteServer(Library(), port=0, serve=False, **config)
+        with serving(server) as uri:
+            yield uri
+
+    def _unused_uri(self):
+        sock = socket.socket()
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+        sock.close()
+        return 'http://127.0.0.1:%s' % port
+
+
+class TestPrintSummary(unittest.TestCase):
+
+    def setUp(self):
+        self.stdout = sys.stdout
+        sys.stdout = StringIO()
+
+    def tearDown(self):
+        sys.stdout = self.stdout
+
+    def test_all_succeeded(self):
+        results = [('http://a', True, 0.1), ('http://bb', True, 0.25)]
+        self.assertEqual(print_summary(test_remote_server, results), True)
+        self.assertEqual(sys.stdout.getvalue().splitlines(),
+                         ['URI        Status       Time',
+                          'http://a   RUNNING      0.10s',
+                          'http://bb  RUNNING      0.25s',
+                          '2 servers, 2 succeeded, 0 failed.'])
+
+    def test_failures(self):
+        results = [('http://a', True, 0), ('http://b', False, 0),
+                   ('http://c', RuntimeError('oops'), 1)]
+        self.assertEqual(print_summary(stop_remote_server, results), False)
+        self.assertEqual(sys.stdout.getvalue().splitlines(),
+                         ['URI       Status       Time',
+                          'http://a  STOPPED      0.00s',
+                          'http://b  NOT ALLOWED  0.00s',
+                          'http://c  ERROR: oops  1.00s',
+                          '3 servers, 1 succeeded, 2 failed.'])
+
+
+class TestParseArgs(unittest.TestCase):
+
+    def setUp(self):
+        self.tempdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tempdir, 'uris.txt')
+        with open(self.path, 'w') as uri_file:
+            uri_file.write('# Servers\nhttp://a:8270\n\n  b:8271  \n')
+
+    def tearDown(self):
+        shutil.rmtree(self.tempdir)
+
+    def test_defaults(self):
+        self.assertEqual(parse_args('script', 'test'),
+                         (test_remote_server, ['http://127.0.0.1:8270'],
+                          None))
+
+    def test_uris_and_timeout(self):
+        self.assertEqual(parse_args('script', 'stop', '--timeout', '2.5',
+                                    'x:1', 'unix:///tmp/s.sock'),
+                         (stop_remote_server,
+                          ['http://x:1', 'unix:///tmp/s.sock'], 2.5))
+
+    def test_file(self):
+        self.assertEqual(parse_args('script', 'test', '--file', self.path),
+                         (test_remote_server,
+                          ['http://a:8270', 'http://b:8271'], None))
+
+    def test_file_and_positional_uris(self):
+        action, uris, timeout = parse_args('script', 'test', 'first',
+                                           '--file', self.path, 'last')
+        self.assertEqual(uris, ['http://first', 'http://a:8270',
+                                'http://b:8271', 'http://last'])
+
+    def test_invalid_arguments(self):
+        for args in [(), ('start',), ('test', '--timeout'),
+                     ('test', '--timeout', 'x'), ('stop', '--file')]:
+            self.assertRaises(SystemExit, parse_args, 'script', *args)
+
+    def test_usage(self):
+        try:
+            parse_args('/path/to/script.py')
+        except SystemExit as error:
+            self.assertEqual(str(error), 'Usage:  script.py {test|stop} '
+                                         '[--timeout seconds] [--file path] '
+                                         '[uri ...]')
+        else:
+            raise AssertionError('SystemExit not raised.')
+
+
+if __name__ == '__main__':
+    unittest.main()
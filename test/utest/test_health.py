@@ -0,0 +1,107 @@
+from contextlib import contextmanager
+import os
+import sys
+import threading
+import unittest
+
+from robotremoteserver import (RobotRemoteServer, json_loads,
+                               test_remote_server)
+
+from serving import serving, with_asyncio
+
+if sys.version_info < (3,):
+    from httplib import HTTPConnection
+    from xmlrpclib import ServerProxy
+else:
+    from http.client import HTTPConnection
+    from xmlrpc.client import ServerProxy
+
+
+class Library(object):
+
+    def __init__(self):
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.names_requested = 0
+
+    def get_keyword_names(self):
+        self.names_requested += 1
+        return ['block']
+
+    def run_keyword(self, name, args):
+        self.started.set()
+        self.release.wait(10)
+
+
+class TestHealth(unittest.TestCase):
+    use_asyncio = False
+
+    def test_ping(self):
+        with self._serving() as (proxy, connection):
+            health = proxy.ping()
+        self.assertEqual(health['ready'], True)
+        self.assertEqual(health['calls_in_progress'], 0)
+        self.assertEqual(health['pid'], os.getpid())
+        self.assertGreaterEqual(health['uptime'], 0)
+
+    def test_get_health(self):
+        with self._serving() as (proxy, connection):
+            connection.request('GET', '/health')
+            response = connection.getresponse()
+            health = json_loads(response.read())
+        self.assertEqual(response.status, 200)
+        self.assertEqual(response.getheader('Content-Type'),
+                         'application/json')
+        self.assertEqual(health['ready'], True)
+        self.assertEqual(health['calls_in_progress'], 0)
+
+    def test_calls_in_progress(self):
+        with self._serving(threads=2) as (proxy, connection):
+            thread = threading.Thread(
+                target=lambda: proxy.run_keyword('block', []))
+            thread.start()
+            self.library.started.wait(10)
+            connection.request('GET', '/health')
+            health = json_loads(connection.getresponse().read())
+            ping = ServerProxy(self.uri).ping()
+            self.library.release.set()
+            thread.join()
+        self.assertEqual(health['calls_in_progress'], 1)
+        self.assertEqual(ping['calls_in_progress'], 1)
+
+    def test_unknown_path(self):
+        with self._serving() as (proxy, connection):
+            connection.request('GET', '/nonex')
+            self.assertEqual(connection.getresponse().status, 404)
+
+    def test_test_remote_server_does_not_use_library(self):
+        with self._serving() as (proxy, connection):
+            requested = self.library.names_requested
+            self.assertEqual(test_remote_server(self.uri, log=False), True)
+            self.assertEqual(self.library.names_requested, requested)
+
+    def test_not_ready_when_not_serving(self):
+        server = RobotRemoteServer(Library(), port=0, serve=False,
+                                   use_asyncio=self.use_asyncio)
+        self.assertEqual(server.ping()['ready'], False)
+        self.assertEqual(server.ping()['uptime'], 0)
+
+    @contextmanager
+    def _serving(self, **config):
+        self.library = Library()
+        server = RobotRemoteServer(self.library, port=0, serve=False,
+                                   use_asyncio=self.use_asyncio, **config)
+        with serving(server) as uri:
+            self.uri = uri
+            connection = HTTPConnection('127.0.0.1', server.server_port)
+            try:
+                yield ServerProxy(self.uri), connection
+            finally:
+                connection.close()
+
+
+TestHealthWithAsyncio = with_asyncio(TestHealth)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+from robotremoteserver import IntrospectionCache, RemoteLibraryFactory
+
+
+LIBRARY = '''
+class CachedLibrary(object):
+    ROBOT_LIBRARY_VERSION = '1.0'
+
+    def keyword(self, arg, default=1, *varargs, **kwargs):
+        """Keyword doc."""
+        return arg
+
+    def tagged(self):
+        pass
+    tagged.robot_name = 'Custom name'
+    tagged.robot_tags = ['tag']
+'''
+
+
+class TestIntrospectionCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tempdir = tempfile.mkdtemp()
+        self.cache_path = os.path.join(self.tempdir, 'cache.json')
+        self.module_path = os.path.join(self.tempdir, 'cachedlibrary.py')
+        sys.path.insert(0, self.tempdir)
+        with open(self.module_path, 'w') as module:
+            module.write(LIBRARY)
+
+    def tearDown(self):
+        sys.path.remove(self.tempdir)
+        sys.modules.pop('cachedlibrary', None)
+        shutil.rmtree(self.tempdir)
+
+    def test_cache_is_written_and_used(self):
+        original = self._create_library()
+        self.assertTrue(os.path.exists(self.cache_path))
+        cached = self._create_library()
+        self.assertEqual(cached._keywords, {})
+        self.assertEqual(cached.get_keyword_names(),
+                         original.get_keyword_names())
+        for name in 'keyword', 'Custom name':
+            self.assertEqual(cached.get_keyword_arguments(name),
+                             original.get_keyword_arguments(name))
+            self.assertEqual(cached.get_keyword_documentation(name),
+                             original.get_keyword_documentation(name))
+            self.assertEqual(cached.get_keyword_tags(name),
+                             original.get_keyword_tags(name))
+        self.assertEqual(cached.get_keyword_arguments('keyword'),
+                         ['arg', 'default=1', '*varargs', '**kwargs'])
+        self.assertEqual(cached.get_keyword_tags('Custom name'), ['tag'])
+        self.assertEqual(cached.run_keyword('keyword', ['x']),
+                         {'status': 'PASS', 'return': 'x'})
+
+    def test_cache_is_rebuilt_when_version_changes(self):
+        self._create_library()
+        self.assertNotEqual(self._create_library('2.0')._keywords, {})
+        self.assertEqual(self._create_library('2.0')._keywords, {})
+
+    def test_cache_is_rebuilt_when_source_changes(self):
+        self._create_library()
+        mtime = os.path.getmtime(self.module_path)
+        os.utime(self.module_path, (mtime + 10, mtime + 10))
+        self.assertNotEqual(self._create_library()._keywords, {})
+
+    def test_invalid_cache_file_is_ignored(self):
+        with open(self.cache_path, 'w') as cache:
+            cache.write('invalid')
+        self.assertNotEqual(self._create_library()._keywords, {})
+        self.assertEqual(self._create_library()._keywords, {})
+
+    def _create_library(self, version='1.0'):
+        library = __import__('cachedlibrary').CachedLibrary()
+        library.ROBOT_LIBRARY_VERSION = version
+        cache = IntrospectionCache(self.cache_path, library)
+        return RemoteLibraryFactory(library, cache=cache)
+
+
+if __name__ == '__main__':
+    unittest.main()
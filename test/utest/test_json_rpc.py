@@ -0,0 +1,235 @@
+from contextlib import contextmanager
+import os
+import shutil
+import socket
+import sys
+import tempfile
+import time
+import unittest
+
+from robotremoteserver import (Binary, Fault, JsonRpcProxy, RemoteClient,
+                               RobotRemoteServer, json_dumps, json_loads,
+                               json_rpc_dumps, json_rpc_loads)
+
+from serving import serving, with_asyncio
+
+if sys.version_info < (3,):
+    from httplib import HTTPConnection
+else:
+    from http.client import HTTPConnection
+
+
+class Library(object):
+
+    def __init__(self):
+        self.sleeps = 0
+
+    def sleep(self, seconds):
+        self.sleeps += 1
+        time.sleep(seconds)
+
+    def greet(self, name):
+        print('Hello, %s!' % name)
+        return 'Hello, %s!' % name
+
+    def return_binary(self):
+        return b'\x00\x01'
+
+    def return_arguments(self, *args):
+        return list(args)
+
+    def fail(self, message):
+        raise AssertionError(message)
+
+
+class TestJsonRpc(unittest.TestCase):
+    use_asyncio = False
+
+    def test_run_keyword(self):
+        with self._serving() as proxy:
+            self.assertEqual(proxy.run_keyword('greet', ['you']),
+                             {'status': 'PASS', 'return': 'Hello, you!',
+                              'output': 'Hello, you!\n'})
+
+    def test_failing_keyword(self):
+        with self._serving() as proxy:
+            result = proxy.run_keyword('fail', ['Oh no!'])
+        self.assertEqual(result['status'], 'FAIL')
+        self.assertEqual(result['error'], 'Oh no!')
+
+    def test_binary(self):
+        with self._serving() as proxy:
+            result = proxy.run_keyword('return_binary', [])
+            self.assertEqual(result['return'], Binary(b'\x00\x01'))
+            result = proxy.run_keyword('return_arguments',
+                                       [Binary(b'\xff'), [1, 2.5, True]])
+            self.assertEqual(result['return'], [Binary(b'\xff'),
+                                                [1, 2.5, True]])
+
+    def test_other_methods(self):
+        with self._serving() as proxy:
+            self.assertEqual(proxy.get_keyword_arguments('greet'), ['name'])
+            self.assertIn('greet', proxy.get_keyword_names())
+            self.assertEqual(proxy.system.multicall(
+                [{'methodName': 'get_keyword_arguments',
+                  'params': ['fail']}]), [[['message']]])
+
+    def test_xml_rpc_works_on_same_server(self):
+        with self._serving() as proxy:
+            self.assertEqual(proxy.get_keyword_arguments('greet'), ['name'])
+            xmlrpc = RemoteClient('http://127.0.0.1:%s'
+                                  % self.server.server_port)
+            self.assertEqual(xmlrpc.get_keyword_arguments('greet'), ['name'])
+            xmlrpc.close()
+
+    def test_connection_is_reused(self):
+        with self._serving(keep_alive_timeout=10) as proxy:
+            proxy.get_keyword_names()
+            sock = proxy._connection.sock
+            self.assertIsNotNone(sock)
+            proxy.get_keyword_names()
+            self.assertIs(proxy._connection.sock, sock)
+
+    def test_reconnect_after_server_closes_connection(self):
+        with self._serving(keep_alive_timeout=10,
+                           keep_alive_max_requests=1) as proxy:
+            for _ in range(3):
+                self.assertEqual(proxy.get_keyword_arguments('greet'),
+                                 ['name'])
+
+    def test_reconnect_after_idle_connection_is_closed(self):
+        with self._serving(keep_alive_timeout=0.3) as proxy:
+            proxy.get_keyword_names()
+            self.assertIsNotNone(proxy._connection.sock)
+            time.sleep(0.6)
+            self.assertEqual(proxy.get_keyword_arguments('greet'), ['name'])
+
+    def test_timed_out_calls_are_not_retried(self):
+        library = Library()
+        with self._serving(library, keep_alive_timeout=10) as proxy:
+            proxy._connection.timeout = 0.2
+            proxy.get_keyword_names()
+            self.assertRaises(socket.timeout, proxy.run_keyword, 'sleep',
+                              [0.5])
+            time.sleep(1)
+        self.assertEqual(library.sleeps, 1)
+
+    def test_method_not_found(self):
+        with self._serving() as proxy:
+            self._verify_fault(proxy.nonex, -32601,
+                               'Method not found: nonex')
+
+    def test_invalid_requests(self):
+        with self._serving():
+            for body, code in [(b'invalid', -32700), (b'[]', -32600),
+                               (b'{"method": "get_keyword_names", '
+                                b'"params": {}}', -32602),
+                               (b'{"method": 1}', -32601),
+                               (b'{"method": []}', -32000)]:
+                response = self._post(body)
+                self.assertEqual(response['error']['code'], code)
+                self.assertEqual(response['id'], None)
+            health = self._post(b'{"id": 1, "method": "ping"}')['result']
+            self.assertEqual(health['calls_in_progress'], 0)
+
+    def test_server_error(self):
+        with self._serving() as proxy:
+            self._verify_fault(lambda: proxy.get_keyword_arguments(),
+                               -32000, None)
+
+    def test_large_response_is_compressed(self):
+        with self._serving(compression_threshold=0) as proxy:
+            connection = HTTPConnection('127.0.0.1', self.server.server_port)
+            connection.request('POST', '/', b'{"id": 1, "method": '
+                               b'"get_keyword_names"}',
+                               {'Content-Type': 'application/json',
+                                'Accept-Encoding': 'gzip'})
+            response = connection.getresponse()
+            response.read()
+            connection.close()
+            self.assertEqual(response.getheader('Content-Encoding'), 'gzip')
+            self.assertEqual(response.getheader('Content-Type'),
+                             'application/json')
+            self.assertIn('greet', proxy.get_keyword_names())
+
+    def _verify_fault(self, method, code, message):
+        try:
+            method()
+        except Fault as fault:
+            self.assertEqual(fault.faultCode, code)
+            if message:
+                self.assertEqual(fault.faultString, message)
+        else:
+            raise AssertionError('Fault not raised.')
+
+    def _post(self, body):
+        connection = HTTPConnection('127.0.0.1', self.server.server_port,
+                                    timeout=10)
+        try:
+            connection.request('POST', '/RPC2', body,
+                               {'Content-Type': 'application/json'})
+            response = connection.getresponse()
+            self.assertEqual(response.status, 200)
+            return json_loads(response.read())
+        finally:
+            connection.close()
+
+    @contextmanager
+    def _serving(self, library=None, **config):
+        self.server = RobotRemoteServer(library or Library(), port=0,
+                                        serve=False,
+                                        use_asyncio=self.use_asyncio,
+                                        **config)
+        with serving(self.server) as uri:
+            proxy = JsonRpcProxy(uri, timeout=10)
+            try:
+                yield proxy
+            finally:
+                proxy.close()
+
+
+TestJsonRpcWithAsyncio = with_asyncio(TestJsonRpc)
+
+
+@unittest.skipUnless(hasattr(socket, 'AF_UNIX'), 'Requires Unix sockets.')
+class TestJsonRpcWithUnixSocket(unittest.TestCase):
+
+    def test_run_keyword(self):
+        tempdir = tempfile.mkdtemp()
+        path = os.path.join(tempdir, 'remote.sock')
+        server = RobotRemoteServer(Library(), serve=False, unix_socket=path)
+        try:
+            with serving(server) as uri:
+                proxy = JsonRpcProxy(uri)
+                try:
+                    result = proxy.run_keyword('greet', ['you'])
+                finally:
+                    proxy.close()
+        finally:
+            shutil.rmtree(tempdir)
+        self.assertEqual(result['return'], 'Hello, you!')
+
+
+class TestJsonRpcMessages(unittest.TestCase):
+
+    def test_loads(self):
+        data = json_dumps({'jsonrpc': '2.0', 'id': 3, 'method': 'x',
+                           'params': [1, Binary(b'\x00')]})
+        self.assertEqual(json_rpc_loads(data, {'x': None}),
+                         (3, 'x', [1, Binary(b'\x00')]))
+
+    def test_dumps(self):
+        self.assertEqual(json_loads(json_rpc_dumps(1, {'a': b'\x01'})),
+                         {'jsonrpc': '2.0', 'id': 1,
+                          'result': {'a': Binary(b'\x01')}})
+        self.assertEqual(json_loads(json_rpc_dumps(2, error=Fault(3, 'x'))),
+                         {'jsonrpc': '2.0', 'id': 2,
+                          'error': {'code': 3, 'message': 'x'}})
+
+    def test_unserializable_result(self):
+        response = json_loads(json_rpc_dumps(1, object()))
+        self.assertEqual(response['error']['code'], -32000)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+from contextlib import contextmanager
+import sys
+import time
+import unittest
+
+from robotremoteserver import RobotRemoteServer
+
+from serving import serving, with_asyncio
+
+if sys.version_info < (3,):
+    from httplib import HTTPConnection
+    from xmlrpclib import dumps, loads
+else:
+    from http.client import HTTPConnection
+    from xmlrpc.client import dumps, loads
+
+
+class Library(object):
+
+    def passing(self):
+        pass
+
+
+class TestKeepAlive(unittest.TestCase):
+    use_asyncio = False
+
+    def test_multiple_requests_using_one_connection(self):
+        with self._serving() as connection:
+            for _ in range(3):
+                response = self._request(connection)
+                self.assertEqual(response.version, 11)
+                self.assertEqual(response.getheader('Connection'), None)
+            self.assertNotEqual(connection.sock, None)
+
+    def test_idle_connection_does_not_block_other_clients(self):
+        with self._serving(keep_alive_timeout=60) as connection:
+            self._request(connection)
+            other = HTTPConnection('127.0.0.1', self.server.server_port)
+            start = time.time()
+            try:
+                self._request(other)
+            finally:
+                other.close()
+            self.assertLess(time.time() - start, 5)
+
+    def test_idle_connections_do_not_stall_clients_when_threads_are_used(
+            self):
+        if self.use_asyncio:
+            raise unittest.SkipTest('Threads are not used with asyncio.')
+        with self._serving(keep_alive_timeout=60, threads=2) as connection:
+            self._request(connection)
+            others = [HTTPConnection('127.0.0.1', self.server.server_port)
+                      for _ in range(3)]
+            start = time.time()
+            try:
+                for other in others:
+                    self._request(other)
+            finally:
+                for other in others:
+                    other.close()
+            self.assertLess(time.time() - start, 5)
+
+    def test_max_requests(self):
+        with self._serving(keep_alive_max_requests=2) as connection:
+            self._request(connection)
+            response = self._request(connection)
+            self.assertEqual(response.getheader('Connection'), 'close')
+
+    def test_idle_timeout(self):
+        with self._serving(keep_alive_timeout=0.1) as connection:
+            self._request(connection)
+            time.sleep(0.5)
+            self._assert_closed(connection)
+
+    def test_stop_closes_idle_connections(self):
+        with self._serving(keep_alive_timeout=60) as connection:
+            self._request(connection)
+            start = time.time()
+            self.server.stop()
+            self._assert_closed(connection)
+            self.assertLess(time.time() - start, 5)
+
+    def test_disabled_by_default(self):
+        with self._serving(keep_alive_timeout=0) as connection:
+            response = self._request(connection)
+            self.assertEqual(response.version, 10)
+            self.assertEqual(connection.sock, None)
+
+    @contextmanager
+    def _serving(self, keep_alive_timeout=5, keep_alive_max_requests=100,
+                 **config):
+        self.server = RobotRemoteServer(
+            Library(), port=0, serve=False, use_asyncio=self.use_asyncio,
+            keep_alive_timeout=keep_alive_timeout,
+            keep_alive_max_requests=keep_alive_max_requests, **config
+        )
+        with serving(self.server):
+            connection = HTTPConnection('127.0.0.1', self.server.server_port)
+            try:
+                yield connection
+            finally:
+                connection.close()
+
+    def _request(self, connection):
+        body = dumps(('passing', []), 'run_keyword')
+        connection.request('POST', '/RPC2', body,
+                           {'Content-Type': 'text/xml'})
+        response = connection.getresponse()
+        result = loads(response.read())[0][0]
+        self.assertEqual(result, {'status': 'PASS'})
+        return response
+
+    def _assert_closed(self, connection):
+        connection.sock.settimeout(5)
+        self.assertEqual(connection.sock.recv(1), b'')
+
+
+TestKeepAliveWithAsyncio = with_asyncio(TestKeepAlive)
+
+
+if __name__ == '__main__':
+    unittest.main()
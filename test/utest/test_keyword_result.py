@@ -0,0 +1,250 @@
+from array import array
+from collections import OrderedDict, defaultdict, namedtuple
+from itertools import count
+import sys
+import unittest
+
+try:
+    from collections.abc import Mapping
+except ImportError:     # Python 2
+    from collections import Mapping
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+if sys.version_info < (3,):
+    from xmlrpclib import dumps
+else:
+    from xmlrpc.client import dumps
+
+from robotremoteserver import (Binary, KeywordResult, ResultLimits,
+                               RobotRemoteServer)
+
+PY3 = sys.version_info >= (3,)
+Point = namedtuple('Point', 'x y')
+
+
+class ListSubclass(list):
+    pass
+
+
+class CustomMapping(Mapping):
+
+    def __init__(self, **items):
+        self.d = items
+
+    def __getitem__(self, key):
+        return self.d[key]
+
+    def __iter__(self):
+        return iter(self.d)
+
+    def __len__(self):
+        return len(self.d)
+
+
+class TestReturnValues(unittest.TestCase):
+
+    def test_strings(self):
+        for value in [u'', u'Hello, world!', u'Hyv\xe4', u'\u2603',
+                      u'Tab\tand\r\nnewlines', u'\u2028']:
+            for length in 1, 1000:
+                self._verify(value * length, value * length)
+
+    def test_binary(self):
+        for value in [u'\x00', u'\x01\x02', u'Bell\x07', u'\x1f\n']:
+            for length in 1, 1000:
+                string = value * length
+                self._verify(string, Binary(string.encode('ASCII')))
+
+    def test_control_character_at_end_of_long_string(self):
+        value = u'x' * 10000 + u'\x00'
+        self._verify(value, Binary(value.encode('ASCII')))
+
+    def test_unrepresentable_binary(self):
+        for value in [u'\x00\xe4', u'\u2603' * 1000 + u'\x00']:
+            self.assertRaises(ValueError, KeywordResult().set_return, value)
+
+    def test_bytes(self):
+        self._verify(b'\x00\x01', Binary(b'\x00\x01'))
+        if PY3:
+            self._verify(b'ASCII', Binary(b'ASCII'))
+        else:
+            self._verify(b'ASCII' * 1000, b'ASCII' * 1000)
+            self._verify(b'\xe4', Binary(b'\xe4'))
+            self._verify(b'x' * 1000 + b'\xff', Binary(b'x' * 1000 + b'\xff'))
+
+    def test_containers(self):
+        self._verify([u'a', 1, [u'\x00']], [u'a', 1, [Binary(b'\x00')]])
+        self._verify({u'a': {1: u'\x01'}, None: 2.5},
+                     {u'a': {u'1': Binary(b'\x01')}, u'': 2.5})
+
+    def test_nested_containers(self):
+        self._verify([[[1]], [[u'a', [None]], 2], (3, {u'k': [4]})],
+                     [[[1]], [[u'a', [u'']], 2], (3, {u'k': [4]})])
+        self._verify({u'a': [{u'b': {u'c': [None]}}]},
+                     {u'a': [{u'b': {u'c': [u'']}}]})
+
+    def test_other_iterables_and_mappings(self):
+        self._verify(set([1]), [1])
+        self._verify((i for i in range(3)), [0, 1, 2])
+        self._verify(OrderedDict([(u'a', 1), (2, None)]),
+                     {u'a': 1, u'2': u''})
+
+    def test_container_subclasses_are_converted_to_lists_and_dicts(self):
+        for value, expected in [
+                (Point(1, 2), [1, 2]),
+                (ListSubclass([1, None]), [1, u'']),
+                (OrderedDict([(u'a', 1)]), {u'a': 1}),
+                (defaultdict(list, a=1), {u'a': 1}),
+                (CustomMapping(a=1), {u'a': 1}),
+                (CustomMapping(a=[Point(1, 2)]), {u'a': [[1, 2]]})]:
+            self._verify(value, expected)
+            self._verify([value], [expected])
+            self._verify({u'key': [value]}, {u'key': [expected]})
+            dumps((self._convert([value]),))
+
+    def test_deeply_nested_container_subclasses(self):
+        value = expected = None
+        for index in range(100):
+            value = [Point(index, value)]
+            expected = [[index, expected if index else u'']]
+        self._verify(value, expected)
+
+    def test_unchanged_containers_are_not_copied(self):
+        value = [(u'row', 1, 2.5, True), {u'key': [u'value']}]
+        result = self._convert(value)
+        self.assertIs(result, value)
+        self.assertIs(result[1], value[1])
+
+    def test_only_changed_containers_are_copied(self):
+        unchanged = [1, 2]
+        value = [unchanged, [1, None]]
+        result = self._convert(value)
+        self.assertIsNot(result, value)
+        self.assertIs(result[0], unchanged)
+        self.assertEqual(result, [[1, 2], [1, u'']])
+
+    @unittest.skipUnless(tracemalloc, 'Requires Python 3.4.')
+    def test_converting_rows_does_not_allocate_memory_per_row(self):
+        rows = 10000
+        # Changed rows must be copied, but that must be the only cost.
+        for value, max_bytes_per_row in [
+                ([(i, u'row', 2.5) for i in range(rows)], 2),
+                ([{u'index': i} for i in range(rows)], 2),
+                ([[i, None] for i in range(rows)], 150)]:
+            tracemalloc.start()
+            try:
+                self._convert(value)
+                peak = tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+            self.assertLess(peak, rows * max_bytes_per_row)
+
+    def test_deeply_nested(self):
+        value = None
+        for _ in range(sys.getrecursionlimit() * 2):
+            value = [value]
+        result = self._convert(value)
+        for _ in range(sys.getrecursionlimit() * 2):
+            self.assertEqual(len(result), 1)
+            result = result[0]
+        self.assertEqual(result, u'')
+
+    def test_shared_containers(self):
+        shared = [None]
+        result = self._convert([shared, {u'a': shared}, [shared]])
+        self.assertEqual(result, [[u''], {u'a': [u'']}, [[u'']]])
+
+    def test_reference_to_itself(self):
+        value = [1, 2]
+        value.append(value)
+        self._verify_error(value, 'Return value contains a reference to '
+                                  'itself.')
+        value = {u'a': [1]}
+        value[u'a'].append(value)
+        self._verify_error(value, 'Return value contains a reference to '
+                                  'itself.')
+
+    def test_max_depth(self):
+        limits = ResultLimits(max_return_depth=2)
+        self._verify([[1], {u'a': 2}], [[1], {u'a': 2}], limits)
+        self._verify_error([[[1]]], 'Return value is nested more than 2 '
+                                    'levels deep.', limits)
+        self._verify_error([{u'a': {}}], 'Return value is nested more than '
+                                         '2 levels deep.', limits)
+
+    def test_max_items(self):
+        limits = ResultLimits(max_return_items=4)
+        self._verify([1, [2, 3]], [1, [2, 3]], limits)
+        self._verify_error([1, [2, 3], 4], 'Return value contains more than '
+                                           '4 items.', limits)
+        self._verify_error(count(), 'Return value contains more than 4 '
+                                    'items.', limits)
+
+    def test_limits_are_configured_using_server(self):
+        class Library(object):
+            def keyword(self):
+                return [[1], 2]
+        server = RobotRemoteServer(Library(), serve=False, max_return_depth=1)
+        self.assertEqual(server.run_keyword('keyword', []),
+                         {'status': 'FAIL',
+                          'error': 'ValueError: Return value is nested more '
+                                   'than 1 levels deep.'})
+
+    def test_buffers_are_iterated_by_default(self):
+        self._verify(bytearray(b'ab'), [97, 98])
+
+    def test_buffers_as_binary(self):
+        limits = ResultLimits(buffer_conversion='binary')
+        self._verify(bytearray(b'\x00\xff'), Binary(b'\x00\xff'), limits)
+        self._verify(memoryview(b'abc')[1:], Binary(b'bc'), limits)
+        self._verify([bytearray(b'a'), {u'b': bytearray(b'b')}],
+                     [Binary(b'a'), {u'b': Binary(b'b')}], limits)
+        self._verify([1, u'x'], [1, u'x'], limits)
+
+    @unittest.skipIf(not PY3, 'array does not support new buffer protocol')
+    def test_arrays_as_binary(self):
+        limits = ResultLimits(buffer_conversion='binary')
+        value = array('B', [1, 2, 3])
+        self._verify(value, Binary(b'\x01\x02\x03'), limits)
+
+    def test_buffers_as_lists(self):
+        limits = ResultLimits(buffer_conversion='list')
+        self._verify(bytearray(b'ab'), Binary(b'ab'), limits)
+        self._verify(memoryview(bytearray(b'ab')), [97, 98], limits)
+
+    @unittest.skipIf(not PY3, 'array does not support new buffer protocol')
+    def test_arrays_as_lists(self):
+        limits = ResultLimits(buffer_conversion='list')
+        self._verify(array('d', [1.5, 2]), [1.5, 2.0], limits)
+        self._verify_error([array('i', [1, 2, 3])], 'Return value contains '
+                           'more than 3 items.',
+                           ResultLimits(max_return_items=3,
+                                        buffer_conversion='list'))
+
+    def test_invalid_buffer_conversion(self):
+        self.assertRaises(ValueError, ResultLimits, buffer_conversion='bad')
+
+    def _convert(self, value, limits=None):
+        result = KeywordResult(limits)
+        result.set_return(value)
+        return result.data.get('return', u'')
+
+    def _verify(self, value, expected, limits=None):
+        actual = self._convert(value, limits)
+        self.assertEqual(actual, expected)
+        self.assertEqual(type(actual), type(expected))
+
+    def _verify_error(self, value, error, limits=None):
+        try:
+            KeywordResult(limits).set_return(value)
+        except ValueError as err:
+            self.assertEqual(str(err), error)
+        else:
+            raise AssertionError('ValueError not raised.')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,147 @@
+from contextlib import contextmanager
+import re
+import sys
+import unittest
+
+from robotremoteserver import KeywordMetrics, RemoteClient, RobotRemoteServer
+
+from serving import serving, with_asyncio
+
+if sys.version_info < (3,):
+    from httplib import HTTPConnection
+else:
+    from http.client import HTTPConnection
+
+
+class Library(object):
+
+    def log(self, message):
+        print(message)
+
+    def fail(self):
+        raise AssertionError('Expected failure')
+
+
+class TestKeywordMetrics(unittest.TestCase):
+
+    def setUp(self):
+        self.metrics = KeywordMetrics()
+
+    def test_calls_and_failures(self):
+        self._run('Pass', {'status': 'PASS'})
+        self._run('Pass', {'status': 'PASS'})
+        self._run('Fail', {'status': 'FAIL'})
+        self._run('Error', None)
+        metrics = self._render()
+        self.assertIn('robot_remote_keyword_calls_total{keyword="Pass"} 2',
+                      metrics)
+        self.assertIn('robot_remote_keyword_failures_total{keyword="Pass"} 0',
+                      metrics)
+        self.assertIn('robot_remote_keyword_calls_total{keyword="Fail"} 1',
+                      metrics)
+        self.assertIn('robot_remote_keyword_failures_total{keyword="Fail"} 1',
+                      metrics)
+        self.assertIn('robot_remote_keyword_failures_total{keyword="Error"} 1',
+                      metrics)
+
+    def test_output_bytes(self):
+        self._run('KW', {'status': 'PASS', 'output': u'\xe4\n'})
+        self._run('KW', {'status': 'PASS'})
+        self.assertIn('robot_remote_keyword_output_bytes_total'
+                      '{keyword="KW"} 3', self._render())
+
+    def test_duration_histogram(self):
+        start = self.metrics.start()
+        self.metrics.end('KW', start - 0.2, {'status': 'PASS'})
+        metrics = self._render()
+        name = 'robot_remote_keyword_duration_seconds'
+        self.assertIn('%s_bucket{keyword="KW",le="0.1"} 0' % name, metrics)
+        self.assertIn('%s_bucket{keyword="KW",le="0.25"} 1' % name, metrics)
+        self.assertIn('%s_bucket{keyword="KW",le="+Inf"} 1' % name, metrics)
+        self.assertIn('%s_count{keyword="KW"} 1' % name, metrics)
+        self.assertTrue(re.search(r'%s_sum\{keyword="KW"\} 0\.2\d*' % name,
+                                  metrics))
+
+    def test_in_progress(self):
+        start = self.metrics.start()
+        self.assertIn('robot_remote_keywords_in_progress 1', self._render())
+        self.metrics.end('KW', start, {'status': 'PASS'})
+        self.assertIn('robot_remote_keywords_in_progress 0', self._render())
+
+    def test_response_sizes(self):
+        for size in 100, 1024, 5000:
+            self.metrics.response_sent(size)
+        metrics = self._render()
+        self.assertIn('robot_remote_response_bytes_bucket{le="1024"} 2',
+                      metrics)
+        self.assertIn('robot_remote_response_bytes_bucket{le="10240"} 3',
+                      metrics)
+        self.assertIn('robot_remote_response_bytes_sum 6124', metrics)
+        self.assertIn('robot_remote_response_bytes_count 3', metrics)
+
+    def test_keyword_names_are_escaped(self):
+        self._run('Quote " and \\ and\nnewline', {'status': 'PASS'})
+        self.assertIn('{keyword="Quote \\" and \\\\ and\\nnewline"}',
+                      self._render())
+
+    def _run(self, name, result):
+        self.metrics.end(name, self.metrics.start(), result)
+
+    def _render(self):
+        return self.metrics.render().decode('UTF-8')
+
+
+class TestMetricsEndpoint(unittest.TestCase):
+    use_asyncio = False
+
+    def test_metrics(self):
+        with self._serving(metrics=True) as (proxy, connection):
+            proxy.run_keyword('log', ['Hello!'])
+            proxy.run_keyword('fail', [])
+            connection.request('GET', '/metrics')
+            response = connection.getresponse()
+            body = response.read().decode('UTF-8')
+        self.assertEqual(response.status, 200)
+        self.assertEqual(response.getheader('Content-Type'),
+                         KeywordMetrics.content_type)
+        self.assertIn('robot_remote_keyword_calls_total{keyword="log"} 1',
+                      body)
+        self.assertIn('robot_remote_keyword_output_bytes_total'
+                      '{keyword="log"} 7', body)
+        self.assertIn('robot_remote_keyword_failures_total{keyword="fail"} 1',
+                      body)
+        self.assertIn('robot_remote_response_bytes_count 2', body)
+
+    def test_unknown_path(self):
+        with self._serving(metrics=True) as (proxy, connection):
+            connection.request('GET', '/nonex')
+            self.assertEqual(connection.getresponse().status, 404)
+
+    def test_metrics_disabled(self):
+        with self._serving() as (proxy, connection):
+            connection.request('GET', '/metrics')
+            self.assertEqual(connection.getresponse().status, 404)
+
+    def test_not_supported_with_processes(self):
+        self.assertRaises(RuntimeError, RobotRemoteServer, Library(),
+                          serve=False, metrics=True, processes=2)
+
+    @contextmanager
+    def _serving(self, **config):
+        server = RobotRemoteServer(Library(), port=0, serve=False,
+                                   use_asyncio=self.use_asyncio, **config)
+        with serving(server) as uri:
+            client = RemoteClient(uri)
+            connection = HTTPConnection('127.0.0.1', server.server_port)
+            try:
+                yield client, connection
+            finally:
+                client.close()
+                connection.close()
+
+
+TestMetricsEndpointWithAsyncio = with_asyncio(TestMetricsEndpoint)
+
+
+if __name__ == '__main__':
+    unittest.main()
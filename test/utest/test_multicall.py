@@ -0,0 +1,79 @@
+from contextlib import contextmanager
+import sys
+import unittest
+
+from robotremoteserver import RobotRemoteServer
+
+from serving import serving, with_asyncio
+
+if sys.version_info < (3,):
+    from xmlrpclib import Fault, MultiCall, ServerProxy
+else:
+    from xmlrpc.client import Fault, MultiCall, ServerProxy
+
+
+class Library(object):
+
+    def __init__(self):
+        self.calls = []
+
+    def logging(self, message):
+        self.calls.append(message)
+        print(message)
+        return message
+
+    def failing(self, message):
+        self.calls.append(message)
+        raise AssertionError(message)
+
+
+class TestMulticall(unittest.TestCase):
+    use_asyncio = False
+
+    def setUp(self):
+        self.library = Library()
+        self.server = RobotRemoteServer(self.library, port=0, serve=False,
+                                        use_asyncio=self.use_asyncio)
+
+    def test_multicall_run_keyword(self):
+        with self._serving() as proxy:
+            multicall = MultiCall(proxy)
+            multicall.run_keyword('logging', ['first'])
+            multicall.run_keyword('failing', ['second'])
+            multicall.run_keyword('logging', ['third'])
+            results = list(multicall())
+        self.assertEqual(self.library.calls, ['first', 'second', 'third'])
+        self.assertEqual(results[0], {'status': 'PASS', 'return': 'first',
+                                      'output': 'first\n'})
+        self.assertEqual(results[1]['status'], 'FAIL')
+        self.assertEqual(results[1]['error'], 'second')
+        self.assertEqual(results[2], {'status': 'PASS', 'return': 'third',
+                                      'output': 'third\n'})
+
+    def test_failing_call_does_not_abort_others(self):
+        with self._serving() as proxy:
+            multicall = MultiCall(proxy)
+            multicall.non_existing()
+            multicall.get_keyword_arguments('logging')
+            results = multicall()
+        self.assertRaises(Fault, results.__getitem__, 0)
+        self.assertEqual(results[1], ['message'])
+
+    def test_introspection(self):
+        with self._serving() as proxy:
+            methods = proxy.system.listMethods()
+        for name in ('run_keyword', 'get_keyword_names', 'system.multicall',
+                     'system.listMethods', 'system.methodHelp'):
+            self.assertIn(name, methods)
+
+    @contextmanager
+    def _serving(self):
+        with serving(self.server) as uri:
+            yield ServerProxy(uri)
+
+
+TestMulticallWithAsyncio = with_asyncio(TestMulticall)
+
+
+if __name__ == '__main__':
+    unittest.main()
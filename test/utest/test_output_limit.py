@@ -0,0 +1,112 @@
+import io
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+from robotremoteserver import BoundedOutput, RobotRemoteServer
+
+
+class Library(object):
+
+    def log(self, stdout, stderr='', count=1):
+        for _ in range(int(count)):
+            sys.stdout.write(stdout)
+            sys.stderr.write(stderr)
+
+
+class TestBoundedOutput(unittest.TestCase):
+
+    def test_output_within_limit(self):
+        output = self._write(10, 'abc', 'def', 'ghij')
+        self.assertEqual(output.getvalue(), 'abcdefghij')
+        self.assertEqual(output.removed, 0)
+
+    def test_head_and_tail_are_kept(self):
+        output = self._write(6, 'abc', 'def', 'ghij', 'kl')
+        self.assertEqual(output.getvalue(),
+                         'abc\n[ 6 characters removed ]\njkl')
+        self.assertEqual(output.removed, 6)
+
+    def test_long_single_write(self):
+        output = self._write(5, 'abcdefghijklmnopqrstuvwxyz')
+        self.assertEqual(output.getvalue(),
+                         'abc\n[ 21 characters removed ]\nyz')
+
+    def test_writes_after_removing(self):
+        output = self._write(4, 'ab', 'cd', 'ef', 'gh', 'ij')
+        self.assertEqual(output.getvalue(),
+                         'ab\n[ 6 characters removed ]\nij')
+
+    def test_zero_limit(self):
+        output = self._write(0, 'abc', 'def')
+        self.assertEqual(output.getvalue(), '\n[ 6 characters removed ]\n')
+
+    def test_spill_to_file(self):
+        directory = tempfile.mkdtemp()
+        try:
+            output = self._write(4, 'ab', 'cd', u'\xe4f', 'gh',
+                                 spill_dir=directory)
+            output.close()
+            self.assertEqual(os.path.dirname(output.file), directory)
+            with io.open(output.file, encoding='UTF-8') as spill:
+                self.assertEqual(spill.read(), u'abcd\xe4fgh')
+            self.assertEqual(output.getvalue(),
+                             'ab\n[ 4 characters removed, full output in %s ]'
+                             '\ngh' % output.file)
+        finally:
+            shutil.rmtree(directory)
+
+    def test_no_file_if_limit_not_exceeded(self):
+        output = self._write(4, 'ab', 'cd', spill_dir=tempfile.gettempdir())
+        self.assertEqual(output.file, None)
+
+    def _write(self, max_size, *data, **config):
+        output = BoundedOutput(max_size, **config)
+        output.extend(data)
+        return output
+
+
+class TestLimitingKeywordOutput(unittest.TestCase):
+
+    def test_limit(self):
+        server = RobotRemoteServer(Library(), serve=False, max_output_size=10)
+        result = server.run_keyword('log', ['0123456789'], {'count': '3'})
+        self.assertEqual(result, {
+            'status': 'PASS',
+            'output': '01234\n[ 20 characters removed ]\n56789',
+            'output_removed': 20
+        })
+
+    def test_stdout_and_stderr_are_limited_separately(self):
+        server = RobotRemoteServer(Library(), serve=False, max_output_size=4)
+        result = server.run_keyword('log', ['out', 'error'], {'count': '2'})
+        self.assertEqual(result['output'],
+                         'ou\n[ 2 characters removed ]\nut\n'
+                         '*INFO* er\n[ 6 characters removed ]\nor')
+        self.assertEqual(result['output_removed'], 8)
+
+    def test_no_limit_by_default(self):
+        server = RobotRemoteServer(Library(), serve=False)
+        result = server.run_keyword('log', ['x' * 1000], {'count': '100'})
+        self.assertEqual(result['output'], 'x' * 100000)
+        self.assertNotIn('output_removed', result)
+
+    def test_spill_to_file(self):
+        directory = tempfile.mkdtemp()
+        try:
+            server = RobotRemoteServer(Library(), serve=False,
+                                       max_output_size=2,
+                                       output_spill_dir=directory)
+            result = server.run_keyword('log', ['abc'])
+            path, = result['output_files']
+            with open(path) as spill:
+                self.assertEqual(spill.read(), 'abc')
+            self.assertEqual(result['output_removed'], 1)
+        finally:
+            shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    unittest.main()
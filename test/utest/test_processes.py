@@ -0,0 +1,126 @@
+import os
+import signal
+import sys
+import threading
+import time
+import unittest
+
+from robotremoteserver import RobotRemoteServer
+
+if sys.version_info < (3,):
+    from xmlrpclib import ServerProxy
+else:
+    from xmlrpc.client import ServerProxy
+
+
+class PidLibrary(object):
+
+    def get_pid(self):
+        return os.getpid()
+
+    def hang(self):
+        self.sleep(30)
+    hang.robot_timeout = 0.1
+
+    def sleep(self, seconds):
+        # Signals interrupt `time.sleep` on Python 2.
+        end = time.time() + float(seconds)
+        while time.time() < end:
+            time.sleep(0.1)
+
+
+@unittest.skipUnless(hasattr(os, 'fork'), 'Requires os.fork.')
+class TestWorkerProcesses(unittest.TestCase):
+
+    def test_keywords_are_run_in_workers(self):
+        pids = self._serve_and_stop(
+            lambda: [self._get_pid() for _ in range(5)])
+        self.assertNotIn(os.getpid(), pids)
+
+    def test_crashed_worker_is_restarted(self):
+        def kill_worker_and_get_new_pid():
+            pid = self._get_pid()
+            os.kill(pid, signal.SIGKILL)
+            max_time = time.time() + 5
+            while time.time() < max_time:
+                new_pid = self._get_pid()
+                if new_pid != pid:
+                    return pid, new_pid
+            raise AssertionError('Killed worker was used.')
+        killed, new = self._serve_and_stop(kill_worker_and_get_new_pid)
+        self.assertNotEqual(killed, new)
+
+    def test_stop_method(self):
+        def get_pid_and_stop():
+            pid = self._get_pid()
+            self.server.stop()
+            return pid
+        self._serve_and_stop(get_pid_and_stop, stop_remotely=False)
+
+    def test_workers_are_killed_after_stop_timeout(self):
+        def call_sleep_and_stop():
+            results = []
+            call = threading.Thread(target=lambda: self._call_sleep(results))
+            call.start()
+            time.sleep(0.5)
+            self.server.stop(timeout=0.5)
+            call.join(10)
+            return results
+        start = time.time()
+        results = self._serve_and_stop(call_sleep_and_stop,
+                                       stop_remotely=False)
+        self.assertLess(time.time() - start, 10)
+        self.assertTrue(isinstance(results[0], Exception))
+
+    def test_worker_is_recycled_after_keyword_timeout(self):
+        def hang_and_get_pids():
+            pid = self._get_pid()
+            result = ServerProxy(self.uri).run_keyword('hang', [])
+            return pid, result, self._get_pid()
+        pid, result, new_pid = self._serve_and_stop(hang_and_get_pids,
+                                                    processes=1)
+        self.assertEqual(result['error'],
+                         'Keyword timeout 0.1 seconds exceeded.')
+        self.assertNotEqual(pid, new_pid)
+
+    def test_workers_exit_when_main_process_gets_sigterm(self):
+        def get_pids_and_terminate():
+            pids = set(self._get_pid() for _ in range(5))
+            os.kill(os.getpid(), signal.SIGTERM)
+            return pids
+        pids = self._serve_and_stop(get_pids_and_terminate,
+                                    stop_remotely=False)
+        self.assertTrue(pids)
+        for pid in pids:
+            self.assertRaises(OSError, os.kill, pid, 0)
+
+    def _call_sleep(self, results):
+        try:
+            results.append(ServerProxy(self.uri).run_keyword('sleep', [30]))
+        except Exception as error:
+            results.append(error)
+
+    def _serve_and_stop(self, client, stop_remotely=True, processes=2):
+        # Serving closes the listening socket, so nothing is left open.
+        self.server = RobotRemoteServer(PidLibrary(), port=0, serve=False,
+                                        processes=processes)
+        self.uri = 'http://127.0.0.1:%s' % self.server.activate()
+        results = []
+        def run_client():
+            try:
+                results.append(client())
+            finally:
+                if stop_remotely:
+                    ServerProxy(self.uri).stop_remote_server()
+        thread = threading.Thread(target=run_client)
+        thread.start()
+        self.server.serve(log=False)
+        thread.join()
+        return results[0]
+
+    def _get_pid(self):
+        return ServerProxy(self.uri).run_keyword('get_pid', [])['return']
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,183 @@
+import os
+import pstats
+import shutil
+import signal
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+from robotremoteserver import KeywordProfiler, RobotRemoteServer
+
+if sys.version_info < (3,):
+    from xmlrpclib import ServerProxy
+else:
+    from xmlrpc.client import ServerProxy
+
+try:
+    import contextvars
+except ImportError:
+    contextvars = None
+
+
+class Library(object):
+
+    def first_keyword(self):
+        return sum(range(1000))
+
+    def second_keyword(self):
+        return 'second'
+
+
+def get_functions(path):
+    return set(func[2] for func in pstats.Stats(path).stats)
+
+
+class TestKeywordProfiler(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.profiler = KeywordProfiler(self.directory)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_not_enabled_by_default(self):
+        self.assertFalse(self.profiler.enabled)
+        self.assertEqual(self.profiler.stop(), [])
+
+    def test_results_are_aggregated_per_keyword(self):
+        self.profiler.start()
+        for _ in range(3):
+            self._run('First Keyword', Library().first_keyword)
+        self._run('Second Keyword', Library().second_keyword)
+        paths = self.profiler.stop()
+        self.assertEqual([os.path.basename(p) for p in paths],
+                         ['First_Keyword-%d.pstats' % os.getpid(),
+                          'Second_Keyword-%d.pstats' % os.getpid()])
+        self.assertIn('first_keyword', get_functions(paths[0]))
+        first = [value for func, value in pstats.Stats(paths[0]).stats.items()
+                 if func[2] == 'first_keyword'][0]
+        self.assertEqual(first[1], 3)
+        self.assertIn('second_keyword', get_functions(paths[1]))
+        self.assertFalse(self.profiler.enabled)
+
+    def test_selected_keywords(self):
+        self.profiler.start(['first keyword'])
+        self._run('First_Keyword', Library().first_keyword)
+        self._run('Second Keyword', Library().second_keyword)
+        paths = self.profiler.stop()
+        self.assertEqual(len(paths), 1)
+        self.assertIn('First_Keyword', paths[0])
+
+    def test_calls_without_keywords_are_not_stored(self):
+        self.profiler.start()
+        self.assertEqual(self.profiler.run(lambda: 42), 42)
+        self.assertEqual(self.profiler.stop(), [])
+
+    def _run(self, name, keyword):
+        def dispatch():
+            self.profiler.keyword_called(name)
+            return keyword()
+        return self.profiler.run(dispatch)
+
+
+class TestProfilingServer(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        os.environ.pop('ROBOT_REMOTE_SERVER_PROFILE', None)
+        shutil.rmtree(self.directory)
+
+    def test_remote_methods(self):
+        def client(proxy):
+            proxy.start_profiling(['first_keyword'])
+            proxy.run_keyword('first_keyword', [])
+            proxy.run_keyword('second_keyword', [])
+            return proxy.stop_profiling()
+        paths = self._serve(client)
+        self.assertEqual(len(paths), 1)
+        functions = get_functions(paths[0])
+        self.assertIn('first_keyword', functions)
+        self.assertIn('dumps', functions)
+        self.assertIn('loads', functions)
+
+    def test_keyword_timeout(self):
+        def client(proxy):
+            proxy.start_profiling()
+            proxy.run_keyword('first_keyword', [])
+            return proxy.stop_profiling()
+        paths = self._serve(client, keyword_timeout=5)
+        self.assertEqual(len(paths), 1)
+        self.assertIn('first_keyword', get_functions(paths[0]))
+
+    def test_environment_variable(self):
+        os.environ['ROBOT_REMOTE_SERVER_PROFILE'] = 'first_keyword, *'
+        def client(proxy):
+            proxy.run_keyword('first_keyword', [])
+            proxy.run_keyword('second_keyword', [])
+            return proxy.stop_profiling()
+        self.assertEqual(len(self._serve(client)), 2)
+
+    def test_environment_variable_with_names(self):
+        os.environ['ROBOT_REMOTE_SERVER_PROFILE'] = 'First Keyword'
+        def client(proxy):
+            proxy.run_keyword('first_keyword', [])
+            proxy.run_keyword('second_keyword', [])
+            return proxy.stop_profiling()
+        self.assertEqual(len(self._serve(client)), 1)
+
+    @unittest.skipUnless(hasattr(signal, 'SIGUSR1'), 'Requires SIGUSR1.')
+    def test_signal(self):
+        self._test_signal()
+
+    @unittest.skipUnless(hasattr(signal, 'SIGUSR1') and hasattr(os, 'fork'),
+                         'Requires SIGUSR1 and os.fork.')
+    def test_signal_with_processes(self):
+        self._test_signal(processes=2)
+
+    def _test_signal(self, processes=0):
+        def client(proxy):
+            proxy.get_keyword_names()    # Wait until server is running.
+            os.kill(os.getpid(), signal.SIGUSR1)
+            time.sleep(1)
+            proxy.run_keyword('first_keyword', [])
+            os.kill(os.getpid(), signal.SIGUSR1)
+            max_time = time.time() + 10
+            while time.time() < max_time:
+                paths = os.listdir(self.directory)
+                if paths:
+                    return paths
+                time.sleep(0.1)
+            raise AssertionError('Profiling results not written.')
+        paths = self._serve(client, processes=processes)
+        self.assertEqual(len(paths), 1)
+        self.assertTrue(paths[0].startswith('first_keyword-'))
+
+    @unittest.skipUnless(contextvars, 'Requires Python 3.7.')
+    def test_not_supported_with_asyncio(self):
+        server = RobotRemoteServer(Library(), serve=False, use_asyncio=True)
+        self.assertRaises(RuntimeError, server.start_profiling)
+
+    def _serve(self, client, **config):
+        server = RobotRemoteServer(Library(), port=0, serve=False,
+                                   profile_dir=self.directory, **config)
+        proxy = ServerProxy('http://127.0.0.1:%s' % server.activate())
+        results = []
+        def run_client():
+            try:
+                results.append(client(proxy))
+            finally:
+                proxy.stop_remote_server()
+        thread = threading.Thread(target=run_client)
+        thread.start()
+        server.serve(log=False)
+        thread.join()
+        return results[0]
+
+
+if __name__ == '__main__':
+    unittest.main()
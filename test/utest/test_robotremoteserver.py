@@ -3,7 +3,9 @@
 import unittest
 import sys
 
-from robotremoteserver import RobotRemoteServer, RemoteLibraryFactory
+from robotremoteserver import (RobotRemoteServer, RemoteLibraryFactory,
+                               StandardStreamCapture,
+                               StandardStreamInterceptor)
 
 
 class NonServingRemoteServer(RobotRemoteServer):
@@ -108,6 +110,11 @@ class TestStaticApi(unittest.TestCase):
             self.assertEquals(self._run('returning_keyword', ret),
                               {'status': 'PASS', 'return': ret})
 
+    def test_returning_generator(self):
+        self.assertEquals(self._run('returning_keyword',
+                                    (i for i in range(3))),
+                          {'status': 'PASS', 'return': [0, 1, 2]})
+
     def test_run_failing_keyword(self):
         ret = self._run('failing_keyword', ValueError)
         self._verify_failed(ret, 'ValueError: Hello, world!')
@@ -142,6 +149,24 @@ class TestStaticApi(unittest.TestCase):
         ret = self._run('logging_keyword', 'out', 'err')
         self._verify_logged(ret, 'out\n*INFO* err')
 
+    def test_logging_non_string_fails(self):
+        ret = self._run('logging_keyword', 42, '')
+        self._verify_failed(ret, "TypeError: string argument expected, "
+                                 "got 'int'")
+
+    def test_library_information(self):
+        info = self.server.get_library_information()
+        self.assertEquals(sorted(info),
+                          ['__init__', '__intro__', 'failing_keyword',
+                           'logging_keyword', 'passing_keyword',
+                           'returning_keyword', 'stop_remote_server'])
+        args = self.server.get_keyword_arguments('returning_keyword')
+        self.assertEquals(info['returning_keyword']['args'], args)
+        self.assertEquals(info['stop_remote_server'],
+                          {'args': [], 'tags': [],
+                           'doc': self.server.get_keyword_documentation(
+                               'stop_remote_server')})
+
     def _run(self, kw, *args, **kwargs):
         return self.server.run_keyword(kw, args, kwargs)
 
@@ -175,5 +200,41 @@ class TestDynamicApiWithoutKwargs(TestStaticApi):
         return self.server.run_keyword(kw, args)
 
 
+class TestStandardStreamInterceptor(unittest.TestCase):
+
+    def test_no_output(self):
+        with StandardStreamInterceptor() as interceptor:
+            pass
+        self.assertEquals(interceptor.output, '')
+
+    def test_writelines_and_isatty(self):
+        with StandardStreamInterceptor() as interceptor:
+            sys.stdout.writelines(['a', 'b'])
+            sys.stdout.flush()
+            self.assertEquals(sys.stdout.isatty(), False)
+        self.assertEquals(interceptor.output, 'ab')
+
+    def test_nested(self):
+        with StandardStreamInterceptor() as outer:
+            sys.stdout.write('outer ')
+            with StandardStreamInterceptor() as inner:
+                sys.stdout.write('inner')
+            sys.stdout.write('again')
+        self.assertEquals(inner.output, 'inner')
+        self.assertEquals(outer.output, 'outer again')
+
+    def test_streams_are_not_replaced_when_capture_is_active(self):
+        with StandardStreamCapture():
+            stdout, stderr = sys.stdout, sys.stderr
+            with StandardStreamInterceptor() as interceptor:
+                self.assertIs(sys.stdout, stdout)
+                self.assertIs(sys.stderr, stderr)
+                sys.stderr.write('*WARN* Hello!')
+            self.assertIs(sys.stdout, stdout)
+            self.assertFalse(stdout.closed)
+        self.assertEquals(interceptor.output, '*WARN* Hello!')
+        self.assertTrue(stdout.closed)
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -6,8 +6,13 @@ import unittest
 
 from robot.libraries.Remote import Remote
 
-from robotremoteserver import (RobotRemoteServer, StringIO,
-                               stop_remote_server, test_remote_server)
+from robotremoteserver import (RobotRemoteServer, stop_remote_server,
+                               test_remote_server)
+
+if sys.version_info < (3,):
+    from StringIO import StringIO
+else:
+    from io import StringIO
 
 
 class Library(object):
@@ -0,0 +1,137 @@
+from contextlib import contextmanager
+import sys
+import time
+import unittest
+
+from robotremoteserver import (Binary, CallTimer, JsonRpcProxy,
+                               RobotRemoteServer, SlowCallLog)
+
+from serving import serving
+
+if sys.version_info < (3,):
+    from xmlrpclib import ServerProxy
+else:
+    from xmlrpc.client import ServerProxy
+
+try:
+    import contextvars
+except ImportError:
+    contextvars = None
+
+
+PHASES = set(['read', 'parse', 'arguments', 'keyword', 'return', 'output',
+              'marshal', 'write'])
+
+
+class Library(object):
+
+    def sleep(self, seconds, data=None):
+        print('Sleeping %s seconds.' % seconds)
+        time.sleep(float(seconds))
+        return data
+
+
+class TestSlowCallLog(unittest.TestCase):
+
+    def test_calls_below_threshold_are_ignored(self):
+        log = SlowCallLog(0.1)
+        log.record(self._timer(0.05))
+        log.record(self._timer(0.2))
+        calls = log.get_calls()
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(calls[0]['phases'], {'keyword': 0.2})
+        self.assertEqual(calls[0]['elapsed'], 0.2)
+
+    def test_oldest_calls_are_discarded(self):
+        log = SlowCallLog(0, size=2)
+        for elapsed in 1, 2, 3:
+            log.record(self._timer(elapsed))
+        self.assertEqual([call['elapsed'] for call in log.get_calls()],
+                         [2, 3])
+
+    def _timer(self, elapsed):
+        timer = CallTimer()
+        timer._start = timer._previous = 0
+        timer._clock = lambda: elapsed
+        timer.mark('keyword')
+        return timer
+
+
+class TestCallTimer(unittest.TestCase):
+
+    def test_phases_are_accumulated(self):
+        times = iter([0, 1, 3, 6])
+        timer = CallTimer()
+        timer._clock = lambda: next(times)
+        timer._start = timer._previous = next(times)
+        timer.mark('parse')
+        timer.mark('keyword')
+        timer.mark('parse')
+        self.assertEqual(timer.phases, {'parse': 4, 'keyword': 2})
+        self.assertEqual(timer.elapsed, 6)
+
+    def test_dispatched(self):
+        timer = CallTimer()
+        timer.dispatched('run_keyword', ['Keyword', []])
+        timer.dispatched('other', [])
+        self.assertEqual(timer.to_dict()['method'], 'run_keyword')
+        self.assertEqual(timer.to_dict()['keyword'], 'Keyword')
+
+
+class TestSlowCallsServer(unittest.TestCase):
+
+    def test_slow_keyword_is_recorded(self):
+        with self._serving(slow_call_threshold=0.1) as proxy:
+            proxy.run_keyword('sleep', ['0.01'])
+            proxy.run_keyword('sleep', ['0.2', Binary(b'\x00')])
+            proxy.get_keyword_names()
+            calls = proxy.get_slow_calls()
+        self.assertEqual(len(calls), 1)
+        call = calls[0]
+        self.assertEqual(call['method'], 'run_keyword')
+        self.assertEqual(call['keyword'], 'sleep')
+        self.assertGreaterEqual(call['elapsed'], 0.2)
+        self.assertEqual(set(call['phases']), PHASES)
+        self.assertGreaterEqual(call['phases']['keyword'], 0.2)
+        self.assertAlmostEqual(sum(call['phases'].values()), call['elapsed'],
+                               places=6)
+
+    def test_json_rpc(self):
+        with self._serving(slow_call_threshold=0) as proxy:
+            json = JsonRpcProxy(self.uri)
+            json.run_keyword('sleep', ['0'])
+            json.close()
+            calls = proxy.get_slow_calls()
+        self.assertEqual(calls[0]['keyword'], 'sleep')
+        self.assertEqual(set(calls[0]['phases']), PHASES)
+
+    def test_other_methods(self):
+        with self._serving(slow_call_threshold=0) as proxy:
+            proxy.get_keyword_names()
+            calls = proxy.get_slow_calls()
+        self.assertEqual(calls[0]['method'], 'get_keyword_names')
+        self.assertNotIn('keyword', calls[0])
+        self.assertEqual(set(calls[0]['phases']),
+                         set(['read', 'parse', 'marshal', 'write']))
+
+    def test_disabled_by_default(self):
+        with self._serving() as proxy:
+            proxy.run_keyword('sleep', ['0'])
+            self.assertEqual(proxy.get_slow_calls(), [])
+
+    @unittest.skipUnless(contextvars, 'Requires Python 3.7.')
+    def test_not_supported_with_asyncio(self):
+        self.assertRaises(RuntimeError, RobotRemoteServer, Library(),
+                          serve=False, use_asyncio=True,
+                          slow_call_threshold=1)
+
+    @contextmanager
+    def _serving(self, **config):
+        server = RobotRemoteServer(Library(), port=0, serve=False, **config)
+        with serving(server) as uri:
+            self.uri = uri
+            yield ServerProxy(uri)
+
+
+if __name__ == '__main__':
+    unittest.main()
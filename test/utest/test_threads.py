@@ -0,0 +1,164 @@
+from contextlib import contextmanager
+import sys
+import threading
+import time
+import unittest
+
+from robotremoteserver import CapturingStream, RobotRemoteServer
+
+if sys.version_info < (3,):
+    from xmlrpclib import ServerProxy
+else:
+    from xmlrpc.client import ServerProxy
+
+
+class BlockingLibrary(object):
+
+    def __init__(self):
+        self.started = []
+        self.release = threading.Event()
+
+    def blocking(self, name):
+        print('Start %s' % name)
+        self.started.append(name)
+        self.release.wait(5)
+        sys.stderr.write('End %s' % name)
+        return name
+
+    def passing(self):
+        pass
+
+    def in_helper_thread(self, message):
+        thread = threading.Thread(target=sys.stdout.write,
+                                  args=[message + '\n'])
+        thread.start()
+        thread.join()
+
+
+class TestThreadedServer(unittest.TestCase):
+
+    def setUp(self):
+        self.library = BlockingLibrary()
+        self.server = RobotRemoteServer(self.library, port=0, serve=False,
+                                        threads=3)
+
+    def test_concurrent_keywords(self):
+        with self._serving() as uri:
+            results = {}
+            callers = [self._call_in_thread(uri, name, results)
+                       for name in ('first', 'second')]
+            self._wait_until(lambda: len(self.library.started) == 2)
+            proxy = ServerProxy(uri)
+            self.assertEqual(proxy.run_keyword('passing', []),
+                             {'status': 'PASS'})
+            self.library.release.set()
+            for caller in callers:
+                caller.join()
+        for name in 'first', 'second':
+            self.assertEqual(results[name],
+                             {'status': 'PASS', 'return': name,
+                              'output': 'Start %s\n*INFO* End %s'
+                                        % (name, name)})
+
+    def test_stop_waits_for_running_keywords(self):
+        results = {}
+        with self._serving() as uri:
+            caller = self._call_in_thread(uri, 'running', results)
+            self._wait_until(lambda: self.library.started)
+            self.server.stop()
+            time.sleep(0.1)
+            self.library.release.set()
+        caller.join()
+        self.assertEqual(results['running']['return'], 'running')
+
+    def test_stop_when_all_threads_are_used(self):
+        self.server = RobotRemoteServer(self.library, port=0, serve=False,
+                                        threads=1)
+        results = {}
+        with self._serving() as uri:
+            first = self._call_in_thread(uri, 'first', results)
+            self._wait_until(lambda: self.library.started)
+            second = self._call_in_thread(uri, 'second', results)
+            time.sleep(0.2)
+            self.server.stop()
+            time.sleep(0.2)
+            self.library.release.set()
+        first.join()
+        second.join()
+        self.assertEqual(results['first']['return'], 'first')
+        self.assertEqual(self.library.started, ['first'])
+
+    def test_streams_are_restored(self):
+        origout, origerr = sys.stdout, sys.stderr
+        with self._serving() as uri:
+            self.library.release.set()
+            ServerProxy(uri).run_keyword('blocking', ['x'])
+        self.assertIs(sys.stdout, origout)
+        self.assertIs(sys.stderr, origerr)
+
+    def test_streams_are_replaced_only_once(self):
+        self.library.release.set()
+        origout = sys.stdout
+        with self._serving() as uri:
+            proxy = ServerProxy(uri)
+            proxy.run_keyword('blocking', ['first'])
+            stdout = sys.stdout
+            self.assertIsInstance(stdout, CapturingStream)
+            self.assertIs(stdout.stream, origout)
+            result = proxy.run_keyword('blocking', ['second'])
+            self.assertIs(sys.stdout, stdout)
+            self.assertEqual(result['output'],
+                             'Start second\n*INFO* End second')
+        self.assertIs(sys.stdout, origout)
+        self.assertTrue(stdout.closed)
+
+    @contextmanager
+    def _serving(self):
+        port = self.server.activate()
+        thread = threading.Thread(target=self.server.serve,
+                                  kwargs={'log': False})
+        thread.start()
+        try:
+            yield 'http://127.0.0.1:%s' % port
+        finally:
+            self.library.release.set()
+            self.server.stop()
+            thread.join()
+
+    def _call_in_thread(self, uri, name, results):
+        def call():
+            try:
+                results[name] = ServerProxy(uri).run_keyword('blocking',
+                                                             [name])
+            except Exception:
+                results[name] = sys.exc_info()[1]
+        thread = threading.Thread(target=call)
+        thread.start()
+        return thread
+
+    def _wait_until(self, condition, timeout=5):
+        max_time = time.time() + timeout
+        while not condition():
+            if time.time() > max_time:
+                raise AssertionError('Condition not met in %s seconds.'
+                                     % timeout)
+            time.sleep(0.01)
+
+
+class TestSerialServer(unittest.TestCase):
+
+    def test_output_of_helper_threads_is_captured(self):
+        server = RobotRemoteServer(BlockingLibrary(), port=0, serve=False)
+        uri = 'http://127.0.0.1:%s' % server.activate()
+        thread = threading.Thread(target=server.serve, kwargs={'log': False})
+        thread.start()
+        try:
+            result = ServerProxy(uri).run_keyword('in_helper_thread', ['hi'])
+        finally:
+            server.stop()
+            thread.join()
+        self.assertEqual(result['output'], 'hi\n')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,176 @@
+import sys
+import threading
+import time
+import unittest
+
+from robotremoteserver import RobotRemoteServer
+
+try:
+    from StringIO import StringIO
+except ImportError:
+    from io import StringIO
+
+if sys.version_info < (3,):
+    from xmlrpclib import ServerProxy
+else:
+    from xmlrpc.client import ServerProxy
+
+try:
+    import contextvars
+except ImportError:
+    contextvars = None
+
+try:
+    from AsyncLibrary import AsyncLibrary
+except SyntaxError:
+    AsyncLibrary = None
+
+
+class Library(object):
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.threads = []
+
+    def hang(self):
+        self.threads.append(threading.current_thread())
+        print('Hanging...')
+        self.release.wait(10)
+    hang.robot_timeout = 0.1
+
+    def hang_without_timeout(self):
+        self.release.wait(0.5)
+    hang_without_timeout.robot_timeout = 0
+
+    def passing(self, arg):
+        print(arg)
+        return arg
+    passing.robot_timeout = 5
+
+    def failing(self):
+        raise AssertionError('Expected')
+    failing.robot_timeout = 5
+
+    def default(self):
+        self.threads.append(threading.current_thread())
+        self.release.wait(10)
+
+
+class TestTimeouts(unittest.TestCase):
+
+    def setUp(self):
+        self.library = Library()
+        self.server = RobotRemoteServer(self.library, port=0, serve=False)
+
+    def tearDown(self):
+        # Abandoned keywords restore standard streams when they finish.
+        self.library.release.set()
+        for thread in self.library.threads:
+            thread.join()
+
+    def test_timeout(self):
+        start = time.time()
+        result = self.server.run_keyword('hang', [])
+        self.assertLess(time.time() - start, 5)
+        self.assertEqual(result, {'status': 'FAIL',
+                                  'error': 'Keyword timeout 0.1 seconds '
+                                           'exceeded.'})
+
+    def test_timed_out_keywords_are_counted(self):
+        threads = [threading.Thread(target=self.server.run_keyword,
+                                    args=('hang', [])) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(self.server._limits.timed_out, 5)
+
+    def test_passing_keyword(self):
+        self.assertEqual(self.server.run_keyword('passing', ['x']),
+                         {'status': 'PASS', 'return': 'x', 'output': 'x\n'})
+
+    def test_failing_keyword(self):
+        result = self.server.run_keyword('failing', [])
+        self.assertEqual(result['status'], 'FAIL')
+        self.assertEqual(result['error'], 'Expected')
+
+    def test_default_timeout(self):
+        server = RobotRemoteServer(self.library, port=0, serve=False,
+                                   keyword_timeout=0.1)
+        result = server.run_keyword('default', [])
+        self.assertEqual(result['error'], 'Keyword timeout 0.1 seconds '
+                                          'exceeded.')
+        self.assertEqual(server.run_keyword('passing', ['x'])['status'],
+                         'PASS')
+
+    def test_zero_disables_default_timeout(self):
+        server = RobotRemoteServer(self.library, port=0, serve=False,
+                                   keyword_timeout=0.1)
+        result = server.run_keyword('hang_without_timeout', [])
+        self.assertEqual(result['status'], 'PASS')
+
+    def test_server_continues_serving_after_timeout(self):
+        port = self.server.activate()
+        thread = threading.Thread(target=self.server.serve,
+                                  kwargs={'log': False})
+        thread.start()
+        try:
+            proxy = ServerProxy('http://127.0.0.1:%s' % port)
+            self.assertEqual(proxy.run_keyword('hang', [])['status'], 'FAIL')
+            self.assertEqual(proxy.run_keyword('passing', ['x'])['return'],
+                             'x')
+        finally:
+            self.server.stop()
+            thread.join()
+
+    def test_output_is_not_captured_by_timed_out_keyword(self):
+        stdout = sys.stdout
+        sys.stdout = output = StringIO()
+        port = self.server.activate()
+        thread = threading.Thread(target=self.server.serve,
+                                  kwargs={'log': False})
+        thread.start()
+        try:
+            proxy = ServerProxy('http://127.0.0.1:%s' % port)
+            self.assertEqual(proxy.run_keyword('hang', [])['status'], 'FAIL')
+            print('Not captured')
+            self.assertEqual(proxy.run_keyword('passing', ['x'])['output'],
+                             'x\n')
+        finally:
+            self.server.stop()
+            thread.join()
+            sys.stdout = stdout
+        self.assertEqual(output.getvalue(), 'Not captured\n')
+
+
+@unittest.skipUnless(AsyncLibrary and contextvars, 'Requires Python 3.7.')
+class TestTimeoutsWithAsyncio(unittest.TestCase):
+
+    def setUp(self):
+        self.library = AsyncLibrary()
+        self.server = RobotRemoteServer(self.library, port=0, serve=False,
+                                        use_asyncio=True)
+        self.proxy = ServerProxy('http://127.0.0.1:%s'
+                                 % self.server.activate())
+        self.thread = threading.Thread(target=self.server.serve,
+                                       kwargs={'log': False})
+        self.thread.start()
+
+    def tearDown(self):
+        self.server.stop()
+        self.thread.join()
+
+    def test_coroutine_is_cancelled(self):
+        result = self.proxy.run_keyword('timing_out', [])
+        self.assertEqual(result['status'], 'FAIL')
+        self.assertEqual(result['error'], 'Keyword timeout 0.1 seconds '
+                                          'exceeded.')
+        self.assertTrue(self.library.cancelled)
+
+    def test_coroutine_finishing_in_time(self):
+        result = self.proxy.run_keyword('timing_out', [0])
+        self.assertEqual(result['return'], 'done')
+
+
+if __name__ == '__main__':
+    unittest.main()
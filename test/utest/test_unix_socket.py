@@ -0,0 +1,71 @@
+import os
+import shutil
+import socket
+import tempfile
+import unittest
+
+from robotremoteserver import (RemoteClient, RobotRemoteServer,
+                               stop_remote_server, test_remote_server)
+
+from serving import serving, with_asyncio
+
+
+class Library(object):
+
+    def greet(self, name):
+        print('Hello, %s!' % name)
+
+
+@unittest.skipUnless(hasattr(socket, 'AF_UNIX'), 'Requires Unix sockets.')
+class TestUnixSocket(unittest.TestCase):
+    use_asyncio = False
+
+    def setUp(self):
+        self.tempdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tempdir, 'remote.sock')
+        self.uri = 'unix://' + self.path
+        self.port_file = os.path.join(self.tempdir, 'port.txt')
+        self.server = RobotRemoteServer(Library(), serve=False,
+                                        unix_socket=self.path,
+                                        port_file=self.port_file,
+                                        use_asyncio=self.use_asyncio)
+
+    def tearDown(self):
+        shutil.rmtree(self.tempdir)
+
+    def test_run_keyword(self):
+        with serving(self.server):
+            client = RemoteClient(self.uri)
+            result = client.run_keyword('greet', ['you'])
+            client.close()
+        self.assertEqual(result, {'status': 'PASS', 'output': 'Hello, you!\n'})
+
+    def test_address(self):
+        self.assertEqual(self.server.activate(), self.path)
+        self.assertEqual(self.server.server_address, self.path)
+        self.assertEqual(self.server.server_port, None)
+        with serving(self.server):
+            test_remote_server(self.uri, log=False)
+            with open(self.port_file) as port_file:
+                self.assertEqual(port_file.read(), self.path)
+
+    def test_test_and_stop_remote_server(self):
+        with serving(self.server, stop=False):
+            self.assertEqual(test_remote_server(self.uri, log=False), True)
+            self.assertEqual(stop_remote_server(self.uri, log=False), True)
+        self.assertEqual(test_remote_server(self.uri, log=False), False)
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_stale_socket_file_is_removed(self):
+        stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        stale.bind(self.path)
+        stale.close()
+        with serving(self.server):
+            self.assertEqual(test_remote_server(self.uri, log=False), True)
+
+
+TestUnixSocketWithAsyncio = with_asyncio(TestUnixSocket)
+
+
+if __name__ == '__main__':
+    unittest.main()